@@ -1,3 +1,18 @@
+import argparse
+import sys
+
+if __name__ == "__main__" and "--headless" in sys.argv:
+    # Headless mode streams the bar's data sources as JSON lines; dispatch
+    # before any widget import so GTK is never loaded.
+    from services.exporter import main
+
+    sys.exit(main(sys.argv[1:]))
+
+import gi
+
+gi.require_version("Gdk", "3.0")
+from gi.repository import Gdk, GLib
+
 from fabric import Application
 from fabric.widgets.box import Box
 from fabric.widgets.centerbox import CenterBox
@@ -5,16 +20,40 @@ from fabric.system_tray.widgets import SystemTray
 from fabric.widgets.wayland import WaylandWindow as Window
 
 from modules.audio import VolumeWidget
+from modules.audio import AUDIO_WIDGET
+from modules.battery import Battery
+from modules.battery import BATTERY_WIDGET
 from modules.media import MediaWidget
 from modules.media import MEDIA_WIDGET
 from modules.time import Time
 from modules.cpu import Cpu
+from modules.cpu_cores import CpuCores
 from modules.gpu import Gpu
+from modules.gpu import GPU_WIDGET
+from modules.io import Io
+from modules.pressure import Pressure
+from modules.pressure import PRESSURE_WIDGET
 from modules.tags import Tags
 from modules.layout import Layout
 from modules.uptime import Uptime
+from modules.window_title import WindowTitle
 from modules.theme_switcher import ThemeSwitcher
+from services.mango import MangoService, match_output, read_output_heads
+from services.memory import (
+    IdleCollector,
+    install_report_signal,
+    mark_baseline,
+    start_tracing,
+)
+from services.soak import SOAK_SPEED, SoakDriver, SoakMonitor
 from services.theme_manager import ThemeManager
+from services.trace import install_replayer, start_recording, start_replay
+
+# Monitor index to pin a single bar to, or None for one bar per monitor
+MONITOR = None
+
+# Freeze the startup heap and run full GC passes only in idle time
+IDLE_GC = True
 
 
 class StatusBar(Window):
@@ -22,6 +61,7 @@ class StatusBar(Window):
         self,
         monitor,
         theme_manager,
+        output=None,
     ):
         super().__init__(
             name="mangobar",
@@ -35,6 +75,11 @@ class StatusBar(Window):
             visible=False,
         )
 
+        # Compositor state is per output; system, GPU, audio and media
+        # sampling is shared by every bar in the process.
+        self.mango = MangoService(monitor=output)
+        self.connect("destroy", lambda *_: self.mango.stop())
+
         self.children = CenterBox(
             name="bar-inner",
             orientation="v",
@@ -45,8 +90,9 @@ class StatusBar(Window):
                 h_align="center",
                 spacing=5,
                 children=[
-                    Layout(theme_manager=theme_manager),
-                    Tags(),
+                    Layout(theme_manager=theme_manager, service=self.mango),
+                    Tags(service=self.mango),
+                    WindowTitle(service=self.mango),
                 ],
             ),
             center_children=Box(
@@ -55,8 +101,11 @@ class StatusBar(Window):
                 h_align="center",
                 children=[
                     Cpu(),
+                    CpuCores(),
                     Time(),
-                    Gpu(),
+                    Gpu() if GPU_WIDGET else None,
+                    Io(),
+                    Pressure() if PRESSURE_WIDGET else None,
                 ],
             ),
             end_children=Box(
@@ -67,7 +116,8 @@ class StatusBar(Window):
                 children=[
                     MediaWidget() if MEDIA_WIDGET else None,
                     SystemTray(name="system-tray", spacing=4, orientation="v"),
-                    VolumeWidget(),
+                    VolumeWidget() if AUDIO_WIDGET else None,
+                    Battery() if BATTERY_WIDGET else None,
                     # icon_size options: 28, 32 (default), 36, 40
                     ThemeSwitcher(theme_manager, icon_size=32),
                     Uptime(),
@@ -78,17 +128,196 @@ class StatusBar(Window):
         return self.show_all()
 
 
+class BarManager:
+    """Creates one StatusBar per Gdk monitor and follows monitor hotplug."""
+
+    def __init__(self, theme_manager, monitor=None):
+        self.theme_manager = theme_manager
+        self.display = Gdk.Display.get_default()
+        self.bars = {}
+
+        if monitor is not None:
+            self.add_bar(self.display.get_monitor(monitor))
+            return
+
+        for i in range(self.display.get_n_monitors()):
+            self.add_bar(self.display.get_monitor(i))
+
+        self.display.connect("monitor-added", lambda _, m: self.add_bar(m))
+        self.display.connect("monitor-removed", lambda _, m: self.remove_bar(m))
+
+    def _monitor_index(self, gdk_monitor):
+        for i in range(self.display.get_n_monitors()):
+            if self.display.get_monitor(i) == gdk_monitor:
+                return i
+        return None
+
+    def _output_name(self, gdk_monitor, index):
+        """Map a Gdk monitor to the Mango output name (e.g. "DP-3")."""
+        # On Wayland the plug name is the xdg_output connector name, which
+        # GTK 3.24 leaves unset on compositors without xdg-output v2
+        name = Gdk.Screen.get_default().get_monitor_plug_name(index)
+        if name:
+            return name
+
+        # Otherwise find the output at the monitor's position; output order
+        # is not stable across hotplug, so it is never used to pair them
+        outputs = MangoService.list_outputs()
+        if len(outputs) == 1 and self.display.get_n_monitors() == 1:
+            return outputs[0]
+        rect = gdk_monitor.get_geometry()
+        return match_output(
+            (rect.x, rect.y, rect.width, rect.height),
+            gdk_monitor.get_model(),
+            read_output_heads(),
+            names=outputs or None,
+        )
+
+    def add_bar(self, gdk_monitor):
+        index = self._monitor_index(gdk_monitor)
+        if gdk_monitor is None or index is None or gdk_monitor in self.bars:
+            return
+
+        output = self._output_name(gdk_monitor, index)
+        print(f"Creating bar on monitor {index} ({output})")
+        self.bars[gdk_monitor] = StatusBar(index, self.theme_manager, output=output)
+
+    def remove_bar(self, gdk_monitor):
+        bar = self.bars.pop(gdk_monitor, None)
+        if bar is not None:
+            print("Monitor removed, destroying its bar")
+            bar.destroy()
+
+    def replug(self):
+        """Destroy and recreate every bar, as if each monitor was replugged."""
+        for gdk_monitor in list(self.bars):
+            self.remove_bar(gdk_monitor)
+            self.add_bar(gdk_monitor)
+
+
 if __name__ == "__main__":
-    monitor = 1
+    parser = argparse.ArgumentParser(description="MangoBar status bar")
+    parser.add_argument(
+        "--monitor",
+        type=int,
+        default=MONITOR,
+        help="only show a bar on this monitor index (default: every monitor)",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without GTK and stream metrics as JSON lines "
+        "(see --headless --help)",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="TRACE",
+        help="log every data source reading to a binary trace file",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="TRACE",
+        help="drive the bar from a recorded trace instead of live services",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        help="replay or soak speed multiplier "
+        f"(default: 1.0 for --replay, {SOAK_SPEED} for --soak)",
+    )
+    parser.add_argument(
+        "--soak",
+        type=float,
+        metavar="SECONDS",
+        help="drive the bar from fake backends at an accelerated rate for "
+        "SECONDS, then exit non-zero if RSS, GObjects, fds or temp files grew",
+    )
+    parser.add_argument(
+        "--soak-interval",
+        type=int,
+        default=10,
+        metavar="SECONDS",
+        help="seconds between soak samples (default: 10)",
+    )
+    parser.add_argument(
+        "--trace-malloc",
+        action="store_true",
+        help="trace allocations so the memory report (kill -USR1) can "
+        "attribute growth to modules",
+    )
+    args = parser.parse_args()
+
+    if args.trace_malloc:
+        start_tracing()
+
+    replayer = None
+    if args.soak:
+        # Fake backends stand in for every live source, like a replay
+        replayer = install_replayer(SoakDriver(speed=args.speed or SOAK_SPEED))
+    elif args.replay:
+        # Must happen before any service is created
+        replayer = start_replay(args.replay, speed=args.speed or 1.0)
+    elif args.record:
+        start_recording(args.record)
+
+    if replayer is not None:
+        GPU_WIDGET = GPU_WIDGET or replayer.has_channel("sampler:gpu")
+        MEDIA_WIDGET = MEDIA_WIDGET or replayer.has_channel("media")
+        BATTERY_WIDGET = BATTERY_WIDGET or replayer.has_channel("power")
+        PRESSURE_WIDGET = PRESSURE_WIDGET or replayer.has_channel("pressure")
+
     app = Application("mangobar")
 
     # Create ThemeManager before StatusBar
     theme_manager = ThemeManager(app)
 
-    # Create StatusBar with theme_manager
-    bar = StatusBar(monitor, theme_manager)
+    # Create a StatusBar per monitor with theme_manager
+    bars = BarManager(theme_manager, monitor=args.monitor)
 
     # Load saved theme (or default)
     theme_manager.load_saved_theme()
 
+    soak = None
+    if args.soak:
+        soak = SoakMonitor(replayer, interval=args.soak_interval)
+        themes = theme_manager.available_themes
+
+        def cycle_theme(n):
+            # load_theme, not next_theme: a soak never writes the config
+            if themes:
+                theme_manager.load_theme(themes[n % len(themes)])
+
+        replayer.attach("soak:theme", cycle_theme)
+        replayer.attach("soak:hotplug", lambda _: bars.replug())
+
+        def finish_soak():
+            replayer.stop()
+            soak.stop()
+            soak.sample()
+            soak.report()
+            app.quit()
+            return False
+
+        GLib.timeout_add(int(args.soak * 1000), finish_soak)
+
+    if replayer is not None:
+        replayer.start()
+
+    collector = IdleCollector() if IDLE_GC else None
+
+    def on_started():
+        # Everything built so far lives for the whole session
+        mark_baseline()
+        if collector is not None:
+            collector.start()
+        if soak is not None:
+            soak.start()
+        return False
+
+    GLib.idle_add(on_started, priority=GLib.PRIORITY_LOW)
+    install_report_signal(collector=collector)
+
     app.run()
+
+    if soak is not None:
+        sys.exit(0 if soak.passed else 1)
@@ -1,78 +1,70 @@
-from fabric.core.fabricator import Fabricator
+from gi.repository import Gdk
 from fabric.widgets.box import Box
-from fabric.widgets.image import Image
-from fabric.widgets.overlay import Overlay
 from fabric.widgets.eventbox import EventBox
-from fabric.widgets.circularprogressbar import CircularProgressBar
-from fabric.widgets.label import Label
 
-from widgets.animated_circular_progress_bar import AnimatedCircularProgressBar
+from services.capabilities import probe
+from services.sampler import connect_while_alive
+from services.volume import VolumeControl
+from widgets.gauge import Gauge
 
 AUDIO_WIDGET = True
 
 if AUDIO_WIDGET is True:
-    try:
+    AUDIO_WIDGET, reason = probe("audio")
+    if AUDIO_WIDGET:
         from fabric.audio.service import Audio
-    except Exception as e:
-        AUDIO_WIDGET = False
-        print(e)
+    else:
+        print(f"Audio widget disabled: {reason}")
 
+_audio = None
 
-class VolumeWidget(Box):
-    def __init__(self, **kwargs):
-        self.label = Label(label="0%")
 
-        self.progress_bar = AnimatedCircularProgressBar(
-            name="volume-progress-bar",
-            pie=False,
-            child=self.label,
-            size=34,
-        )
+def get_audio():
+    """Return the Audio service shared by every VolumeWidget in the process."""
+    global _audio
+    if _audio is None:
+        _audio = Audio()
+    return _audio
 
-        self.progress_back = CircularProgressBar(
-            name="circle-progress-back",
-            pie=False,
-            size=34,
-        )
 
-        self.overlay = Overlay(
-            child=self.progress_back,
-            overlays=self.progress_bar,
-        )
+class VolumeWidget(Box):
+    def __init__(self, **kwargs):
+        self.gauge = Gauge(name="volume-progress-bar", label="0%", size=34)
 
-        self.audio = Audio(notify_speaker=self.on_speaker_changed)
+        self.audio = get_audio()
+        # Coalesces scrolling and follows the default speaker; the gauge
+        # draws its own label, so it is updated directly
+        self.control = VolumeControl(
+            self.audio, self.add_tick_callback, self.show_volume
+        )
 
         super().__init__(
             children=EventBox(
-                events="scroll", child=self.overlay, on_scroll_event=self.on_scroll
+                events=["scroll", "smooth-scroll"],
+                child=self.gauge,
+                on_scroll_event=self.on_scroll,
             ),
             **kwargs,
         )
 
+        connect_while_alive(
+            self, self.audio, "notify::speaker", self.control.on_speaker_changed
+        )
+        self.connect("destroy", lambda *_: self.control.destroy())
+        # The shared service may already have a speaker from an earlier bar
+        self.control.on_speaker_changed()
+
     def on_scroll(self, _, event):
         match event.direction:
-            case 0:
-                self.audio.speaker.volume += 8
-            case 1:
-                self.audio.speaker.volume -= 8
-        return
+            case Gdk.ScrollDirection.UP:
+                self.control.scroll(1)
+            case Gdk.ScrollDirection.DOWN:
+                self.control.scroll(-1)
+            case Gdk.ScrollDirection.SMOOTH:
+                _, _, delta_y = event.get_scroll_deltas()
+                self.control.scroll(-delta_y)
+        return True
 
-    def on_speaker_changed(self):
-        if not self.audio.speaker:
-            return
-
-        self.progress_bar.animate_value(self.audio.speaker.volume / 100)
-        self.label.set_label(str(int(self.audio.speaker.volume)) + "%")
-        self.audio.speaker.bind(
-            "volume",
-            "value",
-            self.progress_bar,
-            lambda _, v: self.progress_bar.animate_value(v / 100),
-        )
-        self.audio.speaker.bind(
-            "volume",
-            "label",
-            self.label,
-            lambda _, v: self.label.set_label(str(int(v)) + "%"),
-        )
-        return
+    def show_volume(self, volume):
+        self.gauge.animate_value(volume / 100)
+        self.gauge.set_label(str(int(volume)) + "%")
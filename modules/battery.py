@@ -0,0 +1,77 @@
+from fabric.widgets.box import Box
+
+from services.capabilities import probe
+from services.filters import MetricFilter
+from services.power import get_power_service
+from services.sampler import connect_while_alive
+from widgets.gauge import Gauge
+
+BATTERY_WIDGET = True
+
+if BATTERY_WIDGET is True:
+    BATTERY_WIDGET = probe("battery").available
+
+# Capacity at or below which the gauge gets the "low" style class
+LOW_CAPACITY = 15
+
+
+def format_duration(seconds):
+    hours, minutes = divmod(round(seconds / 60), 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m"
+
+
+def format_power_tooltip(state):
+    if not state.get("present"):
+        return "On AC power" if state.get("ac") else "No battery"
+    text = f"{state['status']}, {state['capacity']}%"
+    if state.get("seconds"):
+        left = "until full" if state["status"] == "Charging" else "left"
+        text += f" ({format_duration(state['seconds'])} {left})"
+    if state.get("ac"):
+        text += "\nOn AC power"
+    return text
+
+
+class Battery(Box):
+    """Battery capacity gauge with charging/low states from kernel uevents."""
+
+    def __init__(self, **kwargs):
+        self.gauge = Gauge(name="battery-progress-bar", size=34)
+        self.service = get_power_service()
+
+        super().__init__(name="battery", children=self.gauge, **kwargs)
+
+        # Uevents often repeat the same capacity; only redraw real changes
+        self.capacity_filter = MetricFilter(
+            self.update_capacity,
+            lambda capacity: f"{capacity}%",
+        )
+        self.tooltip_filter = MetricFilter(
+            lambda _, text: self.set_tooltip_text(text), format_power_tooltip
+        )
+
+        connect_while_alive(self, self.service, "changed", self.on_changed)
+        self.on_changed(self.service, self.service.state)
+
+    def on_changed(self, _service, state):
+        self.tooltip_filter(state)
+        if not state.get("present"):
+            return
+        self.capacity_filter(state["capacity"])
+        self.set_style_class(self.gauge, "charging", state["status"] == "Charging")
+        self.set_style_class(
+            self.gauge,
+            "low",
+            state["status"] != "Charging" and state["capacity"] <= LOW_CAPACITY,
+        )
+
+    @staticmethod
+    def set_style_class(widget, name, enabled):
+        if enabled:
+            widget.add_style_class(name)
+        else:
+            widget.remove_style_class(name)
+
+    def update_capacity(self, capacity, label):
+        self.gauge.set_label(label)
+        self.gauge.animate_value(capacity / 100)
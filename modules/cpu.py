@@ -1,13 +1,13 @@
 import fabric
-import psutil
 from fabric.widgets.label import Label
 from fabric.widgets.box import Box
 from fabric.widgets.centerbox import CenterBox
-from fabric.widgets.circularprogressbar import CircularProgressBar
-from fabric.widgets.overlay import Overlay
-from fabric import Fabricator
 
-from widgets.animated_circular_progress_bar import AnimatedCircularProgressBar
+from services.filters import metric_filter, percent_label, temperature_label
+from services.system import get_history, get_sampler, has_source, subscribe_history
+from widgets.gauge import Gauge
+from widgets.process_popover import attach_process_popover
+from widgets.sparkline import Sparkline, attach_history_tooltip
 
 
 class Cpu(Box):
@@ -28,104 +28,29 @@ class Cpu(Box):
             end_children=[Label(label="---")],
         )
 
-        self.usage = Box(
-            orientation="v",
-            children=[
-                Overlay(
-                    child=[
-                        CircularProgressBar(
-                            name="circle-progress-back",
-                            pie=False,
-                            size=34,
-                            # line_width=4,
-                            value=100,
-                        ),
-                    ],
-                    overlays=[
-                        AnimatedCircularProgressBar(
-                            name="cpu-progress-bar",
-                            pie=False,
-                            size=34,
-                            # line_width=4,
-                            child=Label(
-                                name="cpu",
-                            ).build(
-                                lambda progress: Fabricator(
-                                    interval=1000,
-                                    poll_from=lambda f: psutil.cpu_percent(),
-                                    on_changed=lambda _, value: progress.set_label(
-                                        f"{str(int(value))}%"
-                                    ),
-                                )
-                            ),
-                        ).build(
-                            lambda progress: Fabricator(
-                                interval=1000,
-                                poll_from=lambda f: psutil.cpu_percent() / 100,
-                                on_changed=lambda _, value: progress.animate_value(
-                                    value
-                                ),
-                            )
-                        )
-                    ],
-                )
-            ],
+        self.usage = Gauge(
+            name="cpu-progress-bar", size=34, line_width=4, h_align="center"
         )
-
-        self.ram = Box(
-            orientation="v",
-            children=[
-                Overlay(
-                    child=[
-                        CircularProgressBar(
-                            name="circle-progress-back",
-                            pie=False,
-                            size=34,
-                            line_width=4,
-                            value=100,
-                        ),
-                    ],
-                    overlays=[
-                        AnimatedCircularProgressBar(
-                            name="ram-progress-bar",
-                            pie=False,
-                            size=34,
-                            line_width=4,
-                            child=Label(
-                                name="ram",
-                            ).build(
-                                lambda progress: Fabricator(
-                                    interval=1000,
-                                    poll_from=lambda f: psutil.virtual_memory().percent,
-                                    on_changed=lambda _, value: progress.set_label(
-                                        f"{str(int(value))}%"
-                                    ),
-                                )
-                            ),
-                        ).build(
-                            lambda progress: Fabricator(
-                                interval=1000,
-                                poll_from=lambda f: psutil.virtual_memory().percent
-                                / 100,
-                                on_changed=lambda _, value: progress.animate_value(
-                                    value
-                                ),
-                            )
-                        )
-                    ],
-                )
-            ],
+        self.ram = Gauge(
+            name="ram-progress-bar", size=34, line_width=4, h_align="center"
         )
 
-        self.temp = Label(
-            name="temp",
-        ).build(
-            lambda temp: Fabricator(
-                interval=1000,
-                poll_from=lambda f: self.getCpuTemp(),
-                on_changed=lambda _, value: temp.set_label(f"{str(value)}°C"),
-            )
+        # Only built when a CPU temperature sensor was found at startup
+        self.temp = Label(name="temp") if has_source("cpu-temp") else None
+
+        # Last minute of CPU usage; hover either gauge for min/avg/max/p95
+        self.sparkline = Sparkline(
+            history=get_history("cpu"),
+            name="cpu-sparkline",
+            size=(34, 14),
+            h_align="center",
         )
+        subscribe_history("cpu", lambda _: self.sparkline.queue_draw(), self.sparkline)
+        attach_history_tooltip(self.usage, "CPU", get_history("cpu"))
+        attach_history_tooltip(self.ram, "RAM", get_history("ram"))
+        # Click for the processes behind the numbers
+        attach_process_popover(self.usage, "cpu")
+        attach_process_popover(self.ram, "rss")
 
         self.children = Box(
             orientation="v",
@@ -133,13 +58,41 @@ class Cpu(Box):
             children=[
                 self.ram,
                 self.usage,
+                self.sparkline,
                 self.temp,
                 self.title,
             ],
         )
 
-    def getCpuTemp(self):
-        sensors = psutil.sensors_temperatures()
-        temp = sensors["k10temp"][0][1]
+        # Samplers are shared by every bar in the process; the subscriptions
+        # are dropped when this widget is destroyed. Filters only let through
+        # readings that change what is displayed.
+        get_sampler("cpu").subscribe(
+            metric_filter(
+                "cpu",
+                lambda value, label: self.update_gauge(self.usage, value, label),
+                percent_label,
+            ),
+            self,
+        )
+        get_sampler("ram").subscribe(
+            metric_filter(
+                "ram",
+                lambda value, label: self.update_gauge(self.ram, value, label),
+                percent_label,
+            ),
+            self,
+        )
+        if self.temp is not None:
+            get_sampler("cpu-temp").subscribe(
+                metric_filter(
+                    "cpu-temp",
+                    lambda _, label: self.temp.set_label(label),
+                    temperature_label,
+                ),
+                self,
+            )
 
-        return int(temp)
+    def update_gauge(self, gauge, value, label):
+        gauge.set_label(label)
+        gauge.animate_value(value / 100)
@@ -0,0 +1,46 @@
+from fabric.widgets.box import Box
+from fabric.widgets.label import Label
+
+from services.cells import core_cells
+from services.filters import MetricFilter
+from services.system import get_sampler
+from widgets.heatmap import Heatmap
+
+
+class CpuCores(Box):
+    """Per-core utilization (top) and frequency (bottom) heatmaps.
+
+    Shows single-thread saturation that the aggregate CPU gauge averages away.
+    """
+
+    def __init__(self, columns=8, cell_size=4, **kwargs):
+        super().__init__(
+            name="cpu-cores",
+            orientation="v",
+            h_align="center",
+            v_align="center",
+            spacing=4,
+            **kwargs,
+        )
+        self.columns = columns
+
+        self.heatmap = Heatmap(
+            name="cpu-cores-heatmap",
+            columns=columns,
+            cell_size=cell_size,
+            h_align="center",
+        )
+        self.children = [self.heatmap, Label(label="CORE")]
+
+        self.tooltip_filter = MetricFilter(
+            lambda _, text: self.set_tooltip_text(text),
+            lambda usage: f"{len(usage)} cores, "
+            f"busiest at {max(usage, default=0) * 100:.0f}%",
+        )
+
+        get_sampler("cpu-cores").subscribe(self.update_cores, self)
+
+    def update_cores(self, value):
+        usage, freqs = value
+        self.heatmap.set_values(core_cells(usage, freqs, self.columns))
+        self.tooltip_filter(usage)
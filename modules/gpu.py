@@ -1,18 +1,19 @@
 import fabric
 from fabric.widgets.box import Box
-from fabric.widgets.circularprogressbar import CircularProgressBar
 from fabric.widgets.centerbox import CenterBox
-from fabric.widgets.overlay import Overlay
 from fabric.widgets.label import Label
-from fabric import Fabricator
-from widgets.animated_circular_progress_bar import AnimatedCircularProgressBar
-from pynvml import (
-    nvmlDeviceGetHandleByIndex,
-    nvmlDeviceGetUtilizationRates,
-    nvmlDeviceGetTemperature,
-    nvmlInit,
-    nvmlShutdown,
-)
+from services.capabilities import probe
+from services.filters import metric_filter, percent_label, temperature_label
+from services.system import get_history, get_sampler, subscribe_history
+from widgets.gauge import Gauge
+from widgets.sparkline import Sparkline, attach_history_tooltip
+
+GPU_WIDGET = True
+
+if GPU_WIDGET is True:
+    GPU_WIDGET, reason = probe("nvml")
+    if not GPU_WIDGET:
+        print(f"GPU widget disabled: {reason}")
 
 
 class Gpu(Box):
@@ -33,104 +34,28 @@ class Gpu(Box):
             end_children=[Label(label="---")],
         )
 
-        self.usage = Box(
-            orientation="v",
-            children=[
-                Overlay(
-                    child=[
-                        CircularProgressBar(
-                            name="circle-progress-back",
-                            pie=False,
-                            size=34,
-                            line_width=4,
-                            value=100,
-                        ),
-                    ],
-                    overlays=[
-                        AnimatedCircularProgressBar(
-                            name="gpu-progress-bar",
-                            pie=False,
-                            size=34,
-                            line_width=4,
-                            child=Label(
-                                name="gpu",
-                            ).build(
-                                lambda progress: Fabricator(
-                                    interval=1000,
-                                    poll_from=lambda f: self.getGpuPercent(),
-                                    on_changed=lambda _, value: progress.set_label(
-                                        f"{str(int(value))}%"
-                                    ),
-                                )
-                            ),
-                        ).build(
-                            lambda progress: Fabricator(
-                                interval=1000,
-                                poll_from=lambda f: int(self.getGpuPercent()) / 100,
-                                on_changed=lambda _, value: progress.animate_value(
-                                    value
-                                ),
-                            )
-                        )
-                    ],
-                )
-            ],
+        self.usage = Gauge(
+            name="gpu-progress-bar", size=34, line_width=4, h_align="center"
         )
-
-        self.vram = Box(
-            orientation="v",
-            children=[
-                Overlay(
-                    child=[
-                        CircularProgressBar(
-                            name="circle-progress-back",
-                            pie=False,
-                            size=34,
-                            line_width=4,
-                            value=100,
-                        ),
-                    ],
-                    overlays=[
-                        AnimatedCircularProgressBar(
-                            name="vram-progress-bar",
-                            pie=False,
-                            size=34,
-                            line_width=4,
-                            child=Label(
-                                name="vram",
-                            ).build(
-                                lambda progress: Fabricator(
-                                    interval=1000,
-                                    poll_from=lambda f: self.getVramPercent(),
-                                    on_changed=lambda _, value: progress.set_label(
-                                        f"{str(int(value))}%"
-                                    ),
-                                )
-                            ),
-                        ).build(
-                            lambda progress: Fabricator(
-                                interval=1000,
-                                poll_from=lambda f: int(self.getVramPercent()) / 100,
-                                on_changed=lambda _, value: progress.animate_value(
-                                    value
-                                ),
-                            )
-                        )
-                    ],
-                )
-            ],
+        self.vram = Gauge(
+            name="vram-progress-bar", size=34, line_width=4, h_align="center"
         )
 
         self.temp = Label(
             name="temp",
-        ).build(
-            lambda temp: Fabricator(
-                interval=1000,
-                poll_from=lambda f: self.getGpuTemp(),
-                on_changed=lambda _, value: temp.set_label(f"{str(value)}°C"),
-            )
         )
 
+        # Last minute of GPU usage; hover either gauge for min/avg/max/p95
+        self.sparkline = Sparkline(
+            history=get_history("gpu"),
+            name="gpu-sparkline",
+            size=(34, 14),
+            h_align="center",
+        )
+        subscribe_history("gpu", lambda _: self.sparkline.queue_draw(), self.sparkline)
+        attach_history_tooltip(self.usage, "GPU", get_history("gpu"))
+        attach_history_tooltip(self.vram, "VRAM", get_history("vram"))
+
         self.children = Box(
             orientation="v",
             spacing=8,
@@ -138,33 +63,36 @@ class Gpu(Box):
                 self.title,
                 self.temp,
                 self.usage,
+                self.sparkline,
                 self.vram,
             ],
         )
 
-    def getGpuPercent(self):
-        nvmlInit()
-        handle = nvmlDeviceGetHandleByIndex(0)
-        usage = nvmlDeviceGetUtilizationRates(handle)
-
-        # print(usage.gpu)
-        nvmlShutdown()
-        return usage.gpu
-
-    def getVramPercent(self):
-        nvmlInit()
-        handle = nvmlDeviceGetHandleByIndex(0)
-        usage = nvmlDeviceGetUtilizationRates(handle)
+        # Filters only let through readings that change what is displayed
+        self.usage_filter = metric_filter(
+            "gpu",
+            lambda value, label: self.update_gauge(self.usage, value, label),
+            percent_label,
+        )
+        self.vram_filter = metric_filter(
+            "vram",
+            lambda value, label: self.update_gauge(self.vram, value, label),
+            percent_label,
+        )
+        self.temp_filter = metric_filter(
+            "gpu-temp",
+            lambda _, label: self.temp.set_label(label),
+            temperature_label,
+        )
 
-        # print(usage.memory)
-        nvmlShutdown()
-        return usage.memory
+        # One NVML read per tick feeds all three readouts on every bar
+        get_sampler("gpu").subscribe(self.update_stats, self)
 
-    def getGpuTemp(self):
-        nvmlInit()
-        handle = nvmlDeviceGetHandleByIndex(0)
-        temp = nvmlDeviceGetTemperature(handle, 0)
+    def update_stats(self, stats):
+        self.usage_filter(stats["usage"])
+        self.vram_filter(stats["vram"])
+        self.temp_filter(stats["temp"])
 
-        # print(temp)
-        nvmlShutdown()
-        return str(temp)
+    def update_gauge(self, gauge, value, label):
+        gauge.set_label(label)
+        gauge.animate_value(value / 100)
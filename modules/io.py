@@ -0,0 +1,112 @@
+import math
+
+from fabric.widgets.box import Box
+from fabric.widgets.centerbox import CenterBox
+from fabric.widgets.label import Label
+
+from services.filters import metric_filter, rate_label
+from services.system import get_sampler
+from widgets.gauge import Gauge
+
+# Rates that fill a gauge: 1 Gbit/s for network, 1 GiB/s for disks. The arc
+# is logarithmic so a few KiB/s of background traffic still shows.
+NET_CEILING = 125_000_000
+DISK_CEILING = 2**30
+
+
+def rate_fraction(rate, ceiling):
+    return min(math.log1p(max(rate, 0.0)) / math.log1p(ceiling), 1.0)
+
+
+def format_io_tooltip(rates):
+    lines = ["Network (down / up)"]
+    for name, (rx, tx) in sorted(rates["interfaces"].items()):
+        lines.append(f"  {name}: {rate_label(rx)}/s / {rate_label(tx)}/s")
+    lines.append("Disk (read / write)")
+    for name, (read, write, read_iops, write_iops) in sorted(
+        rates["devices"].items()
+    ):
+        lines.append(
+            f"  {name}: {rate_label(read)}/s / {rate_label(write)}/s, "
+            f"{read_iops:.0f} / {write_iops:.0f} IOPS"
+        )
+    return "\n".join(lines)
+
+
+class Io(Box):
+    """Network down/up and disk read/write throughput gauges."""
+
+    def __init__(
+        self,
+    ):
+        super().__init__(
+            name="io",
+            orientation="v",
+            h_align="center",
+            v_align="center",
+        )
+
+        self.rx = self._make_gauge("net-rx-progress-bar")
+        self.tx = self._make_gauge("net-tx-progress-bar")
+        self.read = self._make_gauge("disk-read-progress-bar")
+        self.write = self._make_gauge("disk-write-progress-bar")
+
+        self.children = Box(
+            orientation="v",
+            spacing=8,
+            children=[
+                self._make_title("NET"),
+                self.rx,
+                self.tx,
+                self._make_title("DISK"),
+                self.read,
+                self.write,
+            ],
+        )
+
+        # Per-interface and per-device rates are only formatted on hover
+        self.rates = None
+        self.set_has_tooltip(True)
+        self.connect("query-tooltip", self.on_query_tooltip)
+
+        # Filters only let through readings that change the displayed rate
+        self.filters = [
+            (key, metric_filter(name, self._updater(gauge, ceiling), rate_label))
+            for key, name, gauge, ceiling in (
+                ("rx", "net-rx", self.rx, NET_CEILING),
+                ("tx", "net-tx", self.tx, NET_CEILING),
+                ("read", "disk-read", self.read, DISK_CEILING),
+                ("write", "disk-write", self.write, DISK_CEILING),
+            )
+        ]
+
+        get_sampler("io").subscribe(self.update_rates, self)
+
+    def _make_gauge(self, name):
+        return Gauge(name=name, size=34, line_width=4, h_align="center")
+
+    def _make_title(self, text):
+        return CenterBox(
+            orientation="v",
+            start_children=[Label(label="---")],
+            center_children=[Label(label=text)],
+            end_children=[Label(label="---")],
+        )
+
+    def _updater(self, gauge, ceiling):
+        def update(value, label):
+            gauge.set_label(label)
+            gauge.animate_value(rate_fraction(value, ceiling))
+
+        return update
+
+    def update_rates(self, rates):
+        self.rates = rates
+        for key, rate_filter in self.filters:
+            rate_filter(rates[key])
+
+    def on_query_tooltip(self, _widget, _x, _y, _keyboard, tooltip):
+        if self.rates is None:
+            return False
+        tooltip.set_text(format_io_tooltip(self.rates))
+        return True
@@ -1,38 +1,30 @@
-import os
-import subprocess
-import tempfile
-
 from fabric.widgets.box import Box
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
 from fabric.widgets.eventbox import EventBox
+from services.assets import get_asset_store, set_image_source
 from services.mango import MangoService
+from services.sampler import connect_while_alive
+from services.tags import layout_label, layout_name
 
 
 class Layout(Box):
-    # Theme color mapping for icons (same as ThemeSwitcher)
-    THEME_COLORS = {
-        "tokyo-night-storm": "#9d7cd8",
-        "dracula": "#bd93f9",
-        "nord": "#81a1c1",
-        "catppuccin-mocha": "#cba6f7",
-        "gruvbox": "#d3869b",
-    }
-
     def __init__(
-        self, monitor="DP-3", use_icons=True, icon_size=24, theme_manager=None, **kwargs
+        self,
+        monitor="DP-3",
+        use_icons=True,
+        icon_size=24,
+        theme_manager=None,
+        service=None,
+        **kwargs,
     ):
-        self.service = MangoService(monitor=monitor)
+        self.service = service or MangoService(monitor=monitor)
         self.use_icons = use_icons
         self.icon_size = icon_size
         self.theme_manager = theme_manager
 
-        # Get the base directory (parent of modules/)
-        self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.icons_dir = os.path.join(self.base_dir, "assets", "layouts")
-
-        # Create temp directory for colored icons
-        self.temp_dir = tempfile.mkdtemp(prefix="mangobar_layouts_")
+        # Icons recolored per theme, from the compiled asset bundle
+        self.assets = get_asset_store()
 
         # Layout abbreviation mapping (from mmsg) to SVG files
         self.layout_map = {
@@ -52,16 +44,19 @@ class Layout(Box):
 
         if self.use_icons:
             self.image = Image(
-                image_file=self._get_icon_path(self.service.layout),
                 pixel_size=self.icon_size,
                 name="layout-image",
             )
+            # Fixed footprint so a missing or odd-sized icon never resizes the bar
+            self.image.set_size_request(self.icon_size, self.icon_size)
             self.display_widget = self.image
         else:
             self.label = Label(
                 label=self.service.layout or "Unknown",
                 name="layout-label",
             )
+            # Abbreviations are always two characters wide
+            self.label.set_width_chars(2)
             self.display_widget = self.label
 
         self.event_box = EventBox(
@@ -78,75 +73,38 @@ class Layout(Box):
             **kwargs,
         )
 
+        self._icon_path = None
+        self._label_text = None
         self.update_display()
         self.service.connect("layout-changed", self.update_display)
+        self.service.connect("command-finished", self.on_command_finished)
 
         # Listen for theme changes to update icon color
         if self.theme_manager:
-            self.theme_manager.connect("theme-changed", self._on_theme_changed)
-
-    def _get_colored_icon_path(self, svg_filename, theme_name=None):
-        """Get path to a dynamically colored icon."""
-        if not svg_filename:
-            return None
-
-        # Get theme color
-        if theme_name is None and self.theme_manager:
-            theme_name = self.theme_manager.get_current_theme()
-
-        color = self.THEME_COLORS.get(theme_name, "#9d7cd8")
-
-        # Template path
-        template_path = os.path.join(self.icons_dir, svg_filename)
-        if not os.path.exists(template_path):
-            return None
-
-        # Colored icon path
-        colored_filename = f"{svg_filename[:-4]}_{theme_name}.svg"
-        colored_path = os.path.join(self.temp_dir, colored_filename)
-
-        # Create colored version if not exists or outdated
-        try:
-            with open(template_path, "r") as f:
-                svg_content = f.read()
-
-            # Replace currentColor with theme color
-            colored_svg = svg_content.replace("currentColor", color)
-
-            with open(colored_path, "w") as f:
-                f.write(colored_svg)
-
-            return colored_path
+            connect_while_alive(
+                self, self.theme_manager, "theme-changed", self._on_theme_changed
+            )
 
-        except Exception as e:
-            print(f"Error creating colored icon: {e}")
-            return template_path  # Fallback to template
+    def _get_icon_path(self, layout):
+        """Get the layout icon in the current theme's accent.
 
-    def _get_icon_path(self, layout_name):
-        """Get the full path to the layout icon SVG file (colored version)."""
-        if not layout_name:
+        Returns a `resource://` URI, or a file path without the bundle.
+        """
+        name = layout_name(layout)
+        if not name:
             return None
 
-        # Extract layout name (handle "monitor layout" format)
-        if " " in layout_name:
-            name = layout_name.split()[-1]
-        else:
-            name = layout_name
-
         # Convert to lowercase and get SVG filename
         layout_key = name.lower()
         svg_file = self.layout_map.get(layout_key)
 
-        if svg_file and self.use_icons and self.theme_manager:
-            # Return colored icon path
-            return self._get_colored_icon_path(svg_file)
-        elif svg_file:
-            # Return regular icon path (fallback if no theme manager)
-            icon_path = os.path.join(self.icons_dir, svg_file)
-            if os.path.exists(icon_path):
-                return icon_path
+        if not svg_file:
+            return None
 
-        return None
+        theme_name = None
+        if self.theme_manager:
+            theme_name = self.theme_manager.get_current_theme()
+        return self.assets.icon(f"layouts/{svg_file}", theme_name)
 
     def _on_theme_changed(self, manager, theme_name):
         """Update icon color when theme changes."""
@@ -159,22 +117,22 @@ class Layout(Box):
 
         if self.use_icons:
             icon_path = self._get_icon_path(layout)
-            if icon_path:
-                self.image.set_from_file(icon_path)
+            # Reloading the same file still re-decodes the SVG and queues a resize
+            if icon_path and icon_path != self._icon_path:
+                self._icon_path = icon_path
+                set_image_source(self.image, icon_path)
         else:
-            if " " in layout:
-                name = layout.split()[-1]
-            else:
-                name = layout
-            abbreviated = name[:2].upper() if name != "Unknown" else "UN"
-            self.label.set_label(abbreviated)
-
-        self.show_all()
-
-    def on_click(self, eventbox):
-        # Cycle to next layout (you can customize this command)
-        cmd = ["mmsg"]
-        if self.service.monitor:
-            cmd.extend(["-o", self.service.monitor])
-        cmd.extend(["-l", "next"])
-        subprocess.run(cmd, check=False)
+            abbreviated = layout_label(layout)
+            if abbreviated != self._label_text:
+                self._label_text = abbreviated
+                self.label.set_label(abbreviated)
+
+    def on_click(self, *args):
+        # Cycle to next layout; the next layout isn't known until the
+        # compositor reports it, so mark the icon as pending meanwhile
+        self.event_box.add_style_class("pending")
+        self.service.next_layout()
+
+    def on_command_finished(self, service, kind):
+        if kind == "layout":
+            self.event_box.remove_style_class("pending")
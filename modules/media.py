@@ -1,42 +1,28 @@
-import os
-
-import gi
-from fabric.core.fabricator import Fabricator
+from gi.repository import Gtk
 from fabric.widgets.box import Box
 from fabric.widgets.image import Image
 from fabric.widgets.overlay import Overlay
 from fabric.widgets.eventbox import EventBox
-from fabric.widgets.circularprogressbar import CircularProgressBar
-
-from widgets.animated_circular_progress_bar import AnimatedCircularProgressBar
 
-gi.require_version("Playerctl", "2.0")
+from services.capabilities import probe
+from services.filters import MetricFilter, metric_filter
+from services.media import get_media_service
+from services.sampler import connect_while_alive
+from widgets.gauge import Gauge
 
 MEDIA_WIDGET = True
+# Tint the progress ring and status icon with the album art's dominant color
+ART_TINT = True
 
-try:
-    from gi.repository import Playerctl
-
-    test_manager = Playerctl.PlayerManager()
-except Exception as e:
-    MEDIA_WIDGET = False
-    print(f"Playerctl not available: {e}")
+if MEDIA_WIDGET is True:
+    MEDIA_WIDGET, reason = probe("playerctl")
+    if not MEDIA_WIDGET:
+        print(f"Media widget disabled: {reason}")
 
 
 class MediaWidget(Box):
     def __init__(self, **kwargs):
-        self.progress_bar = AnimatedCircularProgressBar(
-            name="media-progress-bar",
-            pie=False,
-            size=34,
-        )
-
-        self.progress_back = CircularProgressBar(
-            name="circle-progress-back",
-            pie=False,
-            size=34,
-            value=100,
-        )
+        self.progress_bar = Gauge(name="media-progress-bar", size=34)
 
         self.thumbnail = Image(
             name="media-thumbnail",
@@ -50,13 +36,33 @@ class MediaWidget(Box):
             icon_size=12,
         )
 
+        # Sits above the theme palette for these two widgets only
+        self.tint_provider = Gtk.CssProvider()
+        self._tint = None
+        for widget in (self.progress_bar, self.status_icon):
+            widget.get_style_context().add_provider(
+                self.tint_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER + 2
+            )
+
         self.overlay = Overlay(
             child=self.thumbnail,
-            overlays=[self.progress_back, self.progress_bar, self.status_icon],
+            overlays=[self.progress_bar, self.status_icon],
         )
 
-        self.player = None
-        self.manager = None
+        # Player tracking is shared by all bars; this widget only renders it
+        self.service = get_media_service()
+
+        # The service reports status and position every second; only touch
+        # the widgets when the icon or the drawn arc would change
+        self.status_filter = MetricFilter(
+            lambda _, icon: self.status_icon.set_from_icon_name(icon, 12),
+            self.get_status_icon_name,
+        )
+        self.progress_filter = metric_filter(
+            "media-progress",
+            lambda progress, _: self.progress_bar.animate_value(progress),
+            lambda progress: round(progress * 200),
+        )
 
         super().__init__(
             name="media-widget",
@@ -69,199 +75,102 @@ class MediaWidget(Box):
             **kwargs,
         )
 
-        self.fabricator = Fabricator(
-            interval=1000,
-            poll_from=lambda f: self.update_position(),
-        )
-
         # Set no_show_all to prevent show_all() from making widget visible
         self.set_no_show_all(True)
 
-        self.setup_manager()
-
-    def setup_manager(self):
-        try:
-            self.manager = Playerctl.PlayerManager()
-            self.manager.connect("name-appeared", self.on_player_appeared)
-            self.manager.connect("player-vanished", self.on_player_vanished)
-
-            # Check for existing Spotify players
-            for player_name in self.manager.props.player_names:
-                if "spotify" in player_name.name.lower():
-                    self.init_player(player_name)
-        except Exception as e:
-            print(f"Error setting up PlayerManager: {e}")
+        connect_while_alive(
+            self, self.service, "player-changed", self.on_player_changed
+        )
+        connect_while_alive(
+            self, self.service, "art-changed", lambda *_: self.update_thumbnail()
+        )
+        connect_while_alive(
+            self, self.service, "status-changed", self.on_status_changed
+        )
+        connect_while_alive(
+            self, self.service, "position-changed", self.on_position_changed
+        )
 
-    def on_player_appeared(self, manager, player_name):
-        # Only accept Spotify players
-        if "spotify" not in player_name.name.lower():
-            print(f"Ignoring non-Spotify player: {player_name.name}")
-            return
-        print(f"Spotify player appeared: {player_name.name}")
-        self.init_player(player_name)
+        self.update_all()
 
-    def on_player_vanished(self, manager, player):
-        # Only care about Spotify players
-        if "spotify" not in player.props.player_name.lower():
-            return
-        print(f"Spotify player vanished: {player.props.player_name}")
-        if self.player == player:
-            self.player = None
-            self.set_visible(False)
+    def on_player_changed(self, *_):
+        self.update_all()
 
-    def init_player(self, player_name):
+    def on_status_changed(self, service, status):
         try:
-            # Double-check this is Spotify
-            if "spotify" not in player_name.name.lower():
-                return
-
-            player = Playerctl.Player.new_from_name(player_name)
-            player.connect("metadata", self.on_metadata_changed)
-            player.connect("playback-status", self.on_status_changed)
-            player.connect("exit", self.on_player_exit)
-
-            # Set as active player if we don't have one
-            if self.player is None:
-                self.player = player
-                self.update_all()
-                print(f"Initialized Spotify player: {player.props.player_name}")
-        except Exception as e:
-            print(f"Error initializing player: {e}")
-
-    def on_metadata_changed(self, player, metadata):
-        if player != self.player:
-            return
-        self.update_thumbnail()
-        self.update_position()
-
-    def on_status_changed(self, player, status):
-        if player != self.player:
-            return
-        try:
-            is_running = self.player is not None
-            self.set_visible(is_running)
+            is_running = self.service.player is not None
+            if self.get_visible() != is_running:
+                self.set_visible(is_running)
             self.update_status_icon(status)
         except Exception as e:
             print(f"Error in status change handler: {e}")
 
-    def on_player_exit(self, player):
-        if player == self.player:
-            print(f"Player exited: {player.props.player_name}")
-            self.set_visible(False)
-            self.player = None
+    def on_position_changed(self, service, progress):
+        self.progress_filter(progress)
 
     def on_click(self, widget, event):
-        if self.player:
-            try:
-                self.player.play_pause()
-            except Exception as e:
-                print(f"Error toggling playback: {e}")
-
-    def update_position(self):
-        if not self.player:
-            # Ensure widget is hidden when no player exists
-            if self.get_visible():
-                self.set_visible(False)
-            return
-
-        try:
-            metadata = self.player.props.metadata
-            if not metadata:
-                return
-
-            position = self.player.get_position()
-            length = (
-                metadata["mpris:length"] if "mpris:length" in metadata.keys() else None
-            )
-
-            if length and length > 0:
-                progress = position / length
-                self.progress_bar.animate_value(progress)
-
-            status = self.player.props.status
-            is_running = self.player is not None
-            if self.get_visible() != is_running:
-                self.set_visible(is_running)
-            self.update_status_icon(status)
-        except Exception as e:
-            print(f"Error updating position: {e}")
+        self.service.play_pause()
 
     def update_thumbnail(self):
-        if not self.player:
-            return
-
+        self.update_tint()
         try:
-            metadata = self.player.props.metadata
-            if not metadata:
+            # Decoded once by the service, already at thumbnail size
+            if self.service.art_pixbuf:
+                self.thumbnail.set_from_pixbuf(self.service.art_pixbuf)
+                return
+            if self.service.art_file:
+                self.thumbnail.set_from_file(self.service.art_file)
                 return
-
-            art_url = (
-                metadata["mpris:artUrl"] if "mpris:artUrl" in metadata.keys() else None
-            )
-
-            if art_url:
-                art_url_str = str(art_url)
-                # Handle local files
-                if art_url_str.startswith("file://"):
-                    art_path = art_url_str.replace("file://", "")
-                    if os.path.exists(art_path):
-                        self.thumbnail.set_from_file(art_path)
-                        return
-                # Handle remote URLs (http/https)
-                elif art_url_str.startswith("http://") or art_url_str.startswith(
-                    "https://"
-                ):
-                    # GTK Image can load from URIs directly
-                    self.thumbnail.set_from_pixbuf(None)  # Clear old image
-                    # Use fabric's Image widget to load from URL
-                    try:
-                        import urllib.request
-                        import tempfile
-                        from gi.repository import GdkPixbuf
-
-                        # Download and cache the image
-                        with urllib.request.urlopen(art_url_str) as response:
-                            with tempfile.NamedTemporaryFile(
-                                delete=False, suffix=".jpg"
-                            ) as tmp_file:
-                                tmp_file.write(response.read())
-                                tmp_path = tmp_file.name
-
-                        # Load the pixbuf and scale it
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(
-                            tmp_path, 34, 34
-                        )
-                        self.thumbnail.set_from_pixbuf(pixbuf)
-                        os.unlink(tmp_path)  # Clean up temp file
-                        return
-                    except Exception as e:
-                        print(f"Error loading remote album art: {e}")
 
             self.thumbnail.set_from_icon_name("multimedia-player", 34)
         except Exception as e:
             print(f"Error updating thumbnail: {e}")
             self.thumbnail.set_from_icon_name("multimedia-player", 34)
 
+    def update_tint(self):
+        color = self.service.art_color if ART_TINT else None
+        if color == self._tint:
+            return
+        self._tint = color
+        css = ""
+        if color is not None:
+            # The symbolic status icon follows `color`
+            css = (
+                f"#media-progress-bar {{ border-color: {color}; }}\n"
+                f"#media-status-icon {{ color: {color}; "
+                "-gtk-icon-style: symbolic; }\n"
+            )
+        try:
+            self.tint_provider.load_from_data(css.encode())
+        except Exception as e:
+            print(f"Error tinting media widget: {e}")
+
+    def get_status_icon_name(self, status):
+        icon_map = {
+            "Playing": "media-playback-start",
+            "Paused": "media-playback-pause",
+            "Stopped": "media-playback-stop",
+        }
+        return icon_map.get(status, "media-playback-stop")
+
     def update_status_icon(self, status):
         try:
-            icon_map = {
-                "Playing": "media-playback-start",
-                "Paused": "media-playback-pause",
-                "Stopped": "media-playback-stop",
-            }
-            icon = icon_map.get(status, "media-playback-stop")
-            self.status_icon.set_from_icon_name(icon, 12)
+            self.status_filter(status)
         except Exception as e:
             print(f"Error updating status icon: {e}")
 
     def update_all(self):
-        if not self.player:
+        if not self.service.player:
             self.set_visible(False)
             return
 
         try:
             self.update_thumbnail()
-            self.update_position()
+            # A new player must always be rendered in full
+            self.status_filter.reset()
+            self.progress_filter.reset()
+            self.progress_filter(self.service.progress)
+            self.update_status_icon(self.service.status)
             self.set_visible(True)
         except Exception as e:
             print(f"Error updating widget: {e}")
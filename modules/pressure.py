@@ -0,0 +1,83 @@
+from fabric.widgets.box import Box
+from fabric.widgets.label import Label
+
+from services.capabilities import probe
+from services.filters import MetricFilter
+from services.pressure import PRESSURE_RESOURCES, get_pressure_service
+from services.sampler import connect_while_alive
+
+PRESSURE_WIDGET = True
+
+if PRESSURE_WIDGET is True:
+    PRESSURE_WIDGET = probe("pressure").available
+
+SHORT_NAMES = {"cpu": "CPU", "memory": "MEM", "io": "IO"}
+
+
+def format_pressure_tooltip(state):
+    lines = ["Pressure stall (10s / 60s / 300s)"]
+    for name in PRESSURE_RESOURCES:
+        entry = state.get(name)
+        if entry is None:
+            continue
+        lines.append(
+            f"{SHORT_NAMES[name]}: {entry['avg10']:.1f}% / "
+            f"{entry['avg60']:.1f}% / {entry['avg300']:.1f}%"
+        )
+    return "\n".join(lines)
+
+
+class Pressure(Box):
+    """CPU, memory and I/O stall indicators, shown only while stalling.
+
+    Driven by PSI triggers, so a stall appears as soon as the kernel
+    reports it and nothing is redrawn while the machine is fine.
+    """
+
+    def __init__(self, **kwargs):
+        self.service = get_pressure_service()
+        self.labels = {
+            name: Label(name="pressure-label", label=SHORT_NAMES[name])
+            for name in PRESSURE_RESOURCES
+        }
+
+        super().__init__(
+            name="pressure",
+            orientation="v",
+            spacing=2,
+            children=list(self.labels.values()),
+            visible=False,
+            **kwargs,
+        )
+        # Visibility follows the stall state, not show_all()
+        self.set_no_show_all(True)
+        for label in self.labels.values():
+            label.set_no_show_all(True)
+
+        self.label_filters = {
+            name: MetricFilter(
+                lambda _, text, label=label: label.set_label(text),
+                lambda avg10, name=name: f"{SHORT_NAMES[name]}\n{avg10:.0f}%",
+            )
+            for name, label in self.labels.items()
+        }
+        self.tooltip_filter = MetricFilter(
+            lambda _, text: self.set_tooltip_text(text), format_pressure_tooltip
+        )
+
+        connect_while_alive(self, self.service, "changed", self.on_changed)
+        self.on_changed(self.service, self.service.state)
+
+    def on_changed(self, _service, state):
+        any_stalled = False
+        for name, label in self.labels.items():
+            entry = state.get(name)
+            stalled = entry is not None and entry["stalled"]
+            if stalled:
+                self.label_filters[name](entry["avg10"])
+            if label.get_visible() != stalled:
+                label.set_visible(stalled)
+            any_stalled = any_stalled or stalled
+        self.tooltip_filter(state)
+        if self.get_visible() != any_stalled:
+            self.set_visible(any_stalled)
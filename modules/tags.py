@@ -1,55 +1,132 @@
+from gi.repository import Gtk, Pango
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
-from fabric.widgets.eventbox import EventBox
-from services.mango import MangoService
-import subprocess
+from fabric.widgets.image import Image
+from fabric.widgets.label import Label
+from services.icons import resolve_app_icon
+from services.mango import MangoService, TagClients
+from services.tags import changed_tags, tag_states
+
+# Apps listed in a tag preview
+PREVIEW_APPS = 8
+PREVIEW_TITLE_CHARS = 32
 
 
 class Tags(Box):
-    def __init__(self, monitor="DP-3", **kwargs):
-        self.service = MangoService(monitor=monitor)
+    def __init__(self, monitor="DP-3", service=None, **kwargs):
+        # A bar passes its per-output service so Tags and Layout share one poller
+        self.service = service or MangoService(monitor=monitor)
         self.buttons = []
+        # (active, occupied) currently applied to each button
+        self._states = []
+        # Hover previews: apps per tag, fetched only when a tag is hovered
+        self.clients = TagClients()
+        self._fetching = False
+        # tag -> preview widget, valid until the tags change
+        self._previews = {}
 
         super().__init__(orientation="v", spacing=4, **kwargs)
 
-        self.update_buttons()
-        self.service.connect("tags-changed", self.update_buttons)
+        self.build_buttons()
+        self.service.connect("tags-changed", self.on_tags_changed)
+        self.service.connect("client-changed", self.on_client_changed)
+
+    def on_client_changed(self, service):
+        self.clients.note_focus(service.active_tags, service.focused_client)
 
-    def update_buttons(self, *args):
-        # clear existing
+    def on_tags_changed(self, *args):
+        self.clients.invalidate()
+        self._previews.clear()
+        # Buttons only need rebuilding when the compositor's tag count changes
+        if len(self.buttons) != len(self.service.available_tags):
+            self.build_buttons()
+        else:
+            self.update_styles()
+
+    def build_buttons(self):
         for child in self.get_children():
-            self.remove(child)
+            child.destroy()
 
         self.buttons = []
+        self._states = []
         for i in self.service.available_tags:
             btn = Button(
                 label="",
                 name="tag-button",
                 on_clicked=self.on_tag_click,
-                tooltip_text=f"Tag {i}",
             )
             btn.tag_num = i
+            btn.set_has_tooltip(True)
+            btn.connect("query-tooltip", self.on_query_tooltip)
+            # Made visible once here; updates only toggle style classes
+            btn.show()
             self.buttons.append(btn)
+            self._states.append((False, False))
             self.add(btn)
 
         self.update_styles()
 
     def update_styles(self):
-        for i, btn in enumerate(self.buttons, 1):
-            btn.remove_style_class("active")
-            btn.remove_style_class("occupied")
-            if i in self.service.active_tags:
-                btn.add_style_class("active")
-            if i in self.service.occupied_tags:
-                btn.add_style_class("occupied")
+        states = tag_states(
+            [btn.tag_num for btn in self.buttons],
+            self.service.active_tags,
+            self.service.occupied_tags,
+        )
+        for index in changed_tags(self._states, states):
+            btn = self.buttons[index]
+            self._states[index] = states[index]
+            active, occupied = states[index]
+            (btn.add_style_class if active else btn.remove_style_class)("active")
+            (btn.add_style_class if occupied else btn.remove_style_class)("occupied")
+
+    def on_query_tooltip(self, btn, _x, _y, _keyboard, tooltip):
+        if not self.clients.fresh:
+            self.request_clients()
+        preview = self._previews.get(btn.tag_num)
+        if preview is None:
+            preview = self.build_preview(btn.tag_num)
+            if self.clients.fresh:
+                self._previews[btn.tag_num] = preview
+        tooltip.set_custom(preview)
+        return True
+
+    def request_clients(self):
+        if self._fetching:
+            return
+        self._fetching = True
+        try:
+            self.service.fetch_tag_clients(self.on_tag_clients)
+        except Exception as e:
+            # on_tag_clients will never run; let the next hover ask again
+            self._fetching = False
+            print(f"Error fetching tag clients: {e}")
+
+    def on_tag_clients(self, counts):
+        self._fetching = False
+        self.clients.set_counts(counts)
+        self._previews.clear()
+        # Refresh a preview that is already showing
+        if self.buttons:
+            self.buttons[0].trigger_tooltip_query()
+
+    def build_preview(self, tag):
+        count, apps = self.clients.clients(tag)
+        header = f"Tag {tag}"
+        if count is not None:
+            header += f": {count} window{'' if count == 1 else 's'}"
+        preview = Box(name="tag-preview", orientation="v", spacing=4)
+        preview.add(Label(label=header, h_align="start"))
 
-        self.show_all()
+        for app_id, title in apps[:PREVIEW_APPS]:
+            icon = Image()
+            icon.set_from_gicon(resolve_app_icon(app_id), Gtk.IconSize.MENU)
+            label = Label(label=title or app_id, h_align="start")
+            label.set_ellipsize(Pango.EllipsizeMode.END)
+            label.set_max_width_chars(PREVIEW_TITLE_CHARS)
+            preview.add(Box(spacing=6, children=[icon, label]))
+        preview.show_all()
+        return preview
 
     def on_tag_click(self, btn):
-        tag_num = btn.tag_num
-        # switch to tag
-        cmd = ["mmsg"]
-        if self.service.monitor:
-            cmd.extend(["-o", self.service.monitor])
-        cmd.extend(["-t", str(tag_num)])
-        subprocess.run(cmd, check=False)
+        # switch to tag; the button is highlighted before mmsg returns
+        self.service.view_tag(btn.tag_num)
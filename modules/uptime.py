@@ -1,8 +1,8 @@
-import time
-import psutil
 from fabric.widgets.label import Label
 from fabric.widgets.box import Box
-from fabric import Fabricator
+
+from services.filters import MetricFilter
+from services.system import get_sampler
 
 
 class Uptime(Box):
@@ -26,25 +26,31 @@ class Uptime(Box):
             self.seconds_label,
         ]
 
-        # Update uptime every second
-        self.fabricator = Fabricator(
-            interval=1000,
-            poll_from=lambda f: self.get_uptime(),
-            on_changed=lambda _, value: self.update_display(value),
-        )
+        # Each label is only touched when its own text changes, so most
+        # ticks update just the seconds
+        self.filters = [
+            MetricFilter(
+                lambda _, text: self.days_label.set_label(text),
+                lambda s: f"{int(s // 86400)}d",
+            ),
+            MetricFilter(
+                lambda _, text: self.hours_label.set_label(text),
+                lambda s: f"{int((s % 86400) // 3600):02d}h",
+            ),
+            MetricFilter(
+                lambda _, text: self.minutes_label.set_label(text),
+                lambda s: f"{int((s % 3600) // 60):02d}m",
+            ),
+            MetricFilter(
+                lambda _, text: self.seconds_label.set_label(text),
+                lambda s: f"{int(s % 60):02d}s",
+            ),
+        ]
 
-    def get_uptime(self):
-        """Get system uptime in seconds"""
-        return time.time() - psutil.boot_time()
+        # Update uptime every second (shared across bars)
+        get_sampler("uptime").subscribe(self.update_display, self)
 
     def update_display(self, uptime_seconds):
         """Update display with formatted uptime"""
-        days = int(uptime_seconds // 86400)
-        hours = int((uptime_seconds % 86400) // 3600)
-        minutes = int((uptime_seconds % 3600) // 60)
-        seconds = int(uptime_seconds % 60)
-
-        self.days_label.set_label(f"{days}d")
-        self.hours_label.set_label(f"{hours:02d}h")
-        self.minutes_label.set_label(f"{minutes:02d}m")
-        self.seconds_label.set_label(f"{seconds:02d}s")
+        for label_filter in self.filters:
+            label_filter(uptime_seconds)
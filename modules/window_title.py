@@ -0,0 +1,81 @@
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+from fabric.widgets.box import Box
+from fabric.widgets.image import Image
+from fabric.widgets.label import Label
+
+from services.icons import resolve_app_icon
+from services.mango import MangoService
+from services.sampler import Throttle
+
+# Browsers and terminals can retitle many times per second
+TITLE_THROTTLE_MS = 250
+
+
+def truncate_title(title, max_chars):
+    """Cut `title` to `max_chars` characters, ending in an ellipsis if cut."""
+    if len(title) <= max_chars:
+        return title
+    return title[: max_chars - 1].rstrip() + "\u2026"
+
+
+class WindowTitle(Box):
+    """App icon and vertical, ellipsized title of the focused client."""
+
+    def __init__(
+        self,
+        monitor="DP-3",
+        service=None,
+        icon_size=24,
+        max_title_chars=24,
+        **kwargs,
+    ):
+        self.service = service or MangoService(monitor=monitor)
+        self.icon_size = icon_size
+        self.max_title_chars = max_title_chars
+
+        self.icon = Image(name="window-title-icon")
+        self.icon.set_pixel_size(icon_size)
+
+        self.title = Label(name="window-title-label")
+        # Read bottom-to-top along the bar. GTK ignores the angle of an
+        # ellipsizing label, so the text is truncated before it is set
+        self.title.set_angle(90)
+
+        super().__init__(
+            name="window-title",
+            orientation="v",
+            spacing=4,
+            h_align="center",
+            children=[self.icon, self.title],
+            **kwargs,
+        )
+
+        self._app_id = None
+        self._title = None
+
+        self.throttle = Throttle(self.update_client, TITLE_THROTTLE_MS)
+        self.service.connect(
+            "client-changed", lambda service: self.throttle(service.focused_client)
+        )
+        self.connect("destroy", lambda *_: self.throttle.cancel())
+        self.update_client(self.service.focused_client)
+
+    def update_client(self, client):
+        app_id = client["appid"] if client else ""
+        title = client["title"] if client else ""
+
+        if app_id != self._app_id:
+            self._app_id = app_id
+            if app_id:
+                self.icon.set_from_gicon(resolve_app_icon(app_id), Gtk.IconSize.BUTTON)
+                self.icon.set_pixel_size(self.icon_size)
+            else:
+                self.icon.clear()
+
+        if title != self._title:
+            self._title = title
+            self.title.set_label(truncate_title(title, self.max_title_chars))
+            self.set_tooltip_text(title or None)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Count gauge redraws per second at different refresh rates and animation caps.
+
+Simulates the frame clock of a 60 Hz and a 165 Hz monitor driving the
+bar's animated gauges (CPU, RAM, GPU, VRAM, volume, media), each
+retargeted once per second as new samples arrive. Every frame that
+advances an animation invalidates its gauge; frames skipped by the
+FrameLimiter do not. Reports redraws per second for each motion setting.
+
+Usage:
+    python scripts/bench_animation_fps.py [--gauges N] [--seconds N]
+"""
+
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.motion import LINEAR_DURATION, FrameLimiter  # noqa: E402
+
+# Gauge animation length in the "full" motion mode (see widgets/gauge.py)
+DURATION = 0.8
+
+# (label, max fps, animation duration or None to jump)
+SETTINGS = (
+    ("uncapped", 0, DURATION),
+    ("cap 60", 60, DURATION),
+    ("cap 30", 30, DURATION),
+    ("linear step", 60, LINEAR_DURATION),
+    ("jump", 0, None),
+)
+
+
+def redraws_per_second(refresh_hz, max_fps, duration, gauges, seconds):
+    frame = 1 / refresh_hz
+    redraws = 0
+    for gauge in range(gauges):
+        # Samples for different sources land at different points in the second
+        offset = gauge / gauges
+        limiter = FrameLimiter(max_fps)
+        for second in range(seconds):
+            start = second + offset
+            if duration is None:
+                redraws += 1
+                continue
+            limiter.reset()
+            # Ticks start on the first frame after the retarget
+            tick = (int(start / frame) + 1) * frame
+            while True:
+                if limiter.ready(tick):
+                    redraws += 1
+                    if tick - start >= duration:
+                        break  # final frame snaps to the target
+                tick += frame
+    return redraws / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--gauges", type=int, default=6)
+    parser.add_argument("--seconds", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"  {args.gauges} gauges, one retarget per gauge per second")
+    print(f"  {'setting':12s} {'60 Hz':>10s} {'165 Hz':>10s}")
+    for label, max_fps, duration in SETTINGS:
+        rates = [
+            redraws_per_second(hz, max_fps, duration, args.gauges, args.seconds)
+            for hz in (60, 165)
+        ]
+        print(f"  {label:12s} {rates[0]:8.0f}/s {rates[1]:8.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
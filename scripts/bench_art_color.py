@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Time dominant-color extraction for 640x640 album art, and a cache hit.
+
+Builds synthetic 640x640 RGB covers (a saturated subject on a muted
+gradient with noise) and times:
+
+    full      NumPy extraction over every pixel of the full-size image
+    sampled   NumPy extraction over the 64x64 image the art worker decodes
+    fallback  the pure-Python path over the same 64x64 image
+    cached    art_key() and a cache lookup, all a return to seen art costs
+
+The 64x64 image is box-filtered with NumPy here, standing in for the
+decode-at-size GdkPixbuf does on the worker thread.
+
+Requires NumPy.
+
+Usage:
+    python scripts/bench_art_color.py [--covers N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np  # noqa: E402
+
+from services import artcolor  # noqa: E402
+from services.artcolor import art_key, dominant_color  # noqa: E402
+
+SIZE = 640
+SAMPLE_SIZE = 64
+
+
+def make_cover(seed):
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:SIZE, 0:SIZE] / SIZE
+    base = rng.integers(40, 120, size=3)
+    image = base + 60 * np.stack([x, y, (x + y) / 2], axis=-1)
+    image += rng.normal(0, 12, size=image.shape)
+    # A saturated subject covering about a tenth of the cover
+    cx, cy = rng.uniform(0.3, 0.7, size=2)
+    subject = (x - cx) ** 2 + (y - cy) ** 2 < 0.03
+    image[subject] = rng.integers(0, 256, size=3) * [1, 0.3, 0.6]
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def downsample(image):
+    factor = SIZE // SAMPLE_SIZE
+    blocks = image.reshape(SAMPLE_SIZE, factor, SAMPLE_SIZE, factor, 3)
+    return blocks.mean(axis=(1, 3)).astype(np.uint8)
+
+
+def extract(image):
+    height, width, _ = image.shape
+    return dominant_color(image.tobytes(), width, height, width * 3)
+
+
+def timed(fn, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (repeat * len(items))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--covers", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    covers = [make_cover(seed) for seed in range(args.covers)]
+    samples = [downsample(cover) for cover in covers]
+
+    full = timed(extract, covers, args.repeat)
+    sampled = timed(extract, samples, args.repeat)
+
+    numpy = artcolor.np
+    artcolor.np = None
+    try:
+        fallback = timed(extract, samples, 1)
+    finally:
+        artcolor.np = numpy
+
+    urls = [f"https://i.scdn.co/image/cover{i:040d}" for i in range(args.covers)]
+    cache = OrderedDict((art_key(url), extract(s)) for url, s in zip(urls, samples))
+
+    def lookup(url):
+        key = art_key(url)
+        cache.move_to_end(key)
+        return cache[key]
+
+    cached = timed(lookup, urls, args.repeat * 100)
+
+    agree = sum(extract(c) == extract(s) for c, s in zip(covers, samples))
+    print(
+        f"  {args.covers} covers of {SIZE}x{SIZE}, "
+        f"sampled at {SAMPLE_SIZE}x{SAMPLE_SIZE}"
+    )
+    print(f"  full      {full * 1e3:8.2f} ms")
+    print(f"  sampled   {sampled * 1e3:8.2f} ms")
+    print(f"  fallback  {fallback * 1e3:8.2f} ms (pure Python, sampled)")
+    print(f"  cached    {cached * 1e6:8.2f} us")
+    print(f"  same color at full size and sampled: {agree}/{args.covers}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Count file I/O for theme and icon loading, loose files vs the GResource bundle.
+
+Replays what the bar does with assets at cold start (load style.css and
+the saved palette, then a layout and theme-switcher icon per bar) and on a full cycle
+through every theme, once reading loose files and once from the compiled
+bundle. Opens made from Python are counted with an audit hook; the image
+loader's own opens are counted as one per icon handed over as a file
+path. Read and write syscalls come from /proc/self/io (syscr, syscw) and
+cover the bar's own asset handling; the images are not decoded. Each run
+is a fresh subprocess so nothing is cached between modes.
+
+Requires PyGObject. Without glib-compile-resources the bundle cannot be
+built: only the loose files are measured and the bundle is skipped.
+
+Usage:
+    python scripts/bench_asset_io.py [--bars N]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+LAYOUT_ICON = "layouts/tile.svg"
+SWITCHER_ICON = "icons/theme-switcher.svg"
+
+
+def read_syscalls(fd):
+    """Read plus write syscalls this process has made, from /proc/self/io."""
+    fields = dict(line.split(b": ") for line in os.pread(fd, 4096, 0).splitlines())
+    return int(fields[b"syscr"]) + int(fields[b"syscw"])
+
+
+def run_child(mode, bars, bundle_path):
+    """Run in a subprocess: count opens and syscalls for startup and a cycle."""
+    opens = 0
+
+    def audit(event, _args):
+        nonlocal opens
+        if event == "open":
+            opens += 1
+
+    from services.assets import AssetStore, list_sources
+
+    themes, _ = list_sources()
+    io_fd = os.open("/proc/self/io", os.O_RDONLY)
+    sys.addaudithook(audit)
+
+    # Each read of the counters is itself one read syscall
+    syscalls = read_syscalls(io_fd) + 1
+    start = time.perf_counter()
+    store = AssetStore(bundle_path, use_bundle=mode != "files")
+    image_loads = 0
+
+    def load_theme(name):
+        nonlocal image_loads
+        store.theme_css(name)
+        for _ in range(bars):
+            for icon in (LAYOUT_ICON, SWITCHER_ICON):
+                if not store.icon(icon, name).startswith("resource://"):
+                    image_loads += 1
+
+    store.base_css()
+    load_theme(themes[0])
+    seconds = time.perf_counter() - start
+    startup_syscalls = read_syscalls(io_fd) - syscalls
+    startup = (opens, image_loads, startup_syscalls, seconds)
+    for name in themes[1:] + themes[:1]:
+        load_theme(name)
+    store.cleanup()
+    cycle = (
+        opens - startup[0],
+        image_loads - startup[1],
+        read_syscalls(io_fd) - syscalls - startup_syscalls - 1,
+    )
+    print(json.dumps({"startup": startup, "cycle": cycle, "themes": len(themes)}))
+
+
+def measure(mode, bars, bundle_path):
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--bars", str(bars)],
+        env={**os.environ, "MANGOBAR_BENCH_BUNDLE": bundle_path},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--bars", type=int, default=2)
+    parser.add_argument("--child", choices=("files", "bundle"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.bars, os.environ["MANGOBAR_BENCH_BUNDLE"])
+        return
+
+    compiler = shutil.which("glib-compile-resources")
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as cache:
+        bundle_path = os.path.join(cache, "assets.gresource")
+        results = {"loose files": measure("files", args.bars, bundle_path)}
+        if compiler:
+            # First bundle run builds it; the second is a normal cold start
+            measure("bundle", args.bars, bundle_path)
+            results["bundle"] = measure("bundle", args.bars, bundle_path)
+            size = os.path.getsize(bundle_path)
+
+    print(f"  {args.bars} bars")
+    for label, result in results.items():
+        opens, image_loads, syscalls, seconds = result["startup"]
+        cycle_opens, cycle_loads, cycle_syscalls = result["cycle"]
+        extra = " + 1 mmap of the bundle" if label == "bundle" else ""
+        print(f"  {label}:")
+        print(
+            f"    cold start:  {opens + image_loads} file opens{extra}, "
+            f"{syscalls} read/write syscalls ({seconds * 1e3:.1f} ms)"
+        )
+        print(
+            f"    cycle through {result['themes']} themes: "
+            f"{cycle_opens + cycle_loads} file opens, "
+            f"{cycle_syscalls} read/write syscalls"
+        )
+
+    if compiler:
+        print(f"  bundle of {size} bytes")
+    else:
+        print(
+            "  bundle: skipped, glib-compile-resources not found "
+            "(it ships with the GLib development tools)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Time the startup capability probes and list what this host would sample.
+
+Runs every probe in services/capabilities.py once, as the bar does at
+startup, and prints its result, reason and cost. Then lists the sampler
+sources registered in services/system.py, i.e. the 1 s readers the bar
+can run here; sources for missing hardware are absent rather than
+failing on every tick.
+
+Requires psutil (for services/system.py).
+
+Usage:
+    python scripts/bench_capabilities.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.capabilities import PROBES, probe  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.parse_args()
+
+    total = 0.0
+    for name in PROBES:
+        start = time.perf_counter()
+        available, reason = probe(name)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        state = "yes" if available else "no "
+        print(f"  {name:10} {state} {elapsed * 1e3:8.2f} ms  {reason}")
+    print(f"  all probes {total * 1e3:12.2f} ms")
+
+    # Imported last: it runs the probes itself, which would hide their cost
+    from services.system import SOURCES
+
+    print(f"  sources: {', '.join(SOURCES)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Measure tag-click-to-visual latency against a fake mmsg.
+
+A fake `mmsg` with a configurable response delay is put first on PATH.
+The old click path ran mmsg synchronously and then waited for the next 1 s
+MangoService poll before anything changed on screen; the new path updates
+the tag optimistically and re-polls as soon as mmsg returns.
+
+A check follows with a slow tag query: a poll starts, a tag is clicked
+and its command returns while the poll is still running, so the poll
+reports the tags from before the click. The script exits with status 1
+if that stale poll moves the highlight back to the old tag.
+
+Requires PyGObject (GLib/Gio).
+
+Usage:
+    python scripts/bench_click_latency.py [--delay MS] [--clicks N]
+"""
+
+import argparse
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+FAKE_MMSG = """#!{python}
+import os, sys, time
+state = os.path.join(os.path.dirname(os.path.abspath(__file__)), "active")
+args = sys.argv[1:]
+if "-o" in args:
+    i = args.index("-o")
+    del args[i : i + 2]
+active = int(open(state).read()) if os.path.exists(state) else 1
+if args == ["-T"]:
+    print(9)
+elif args == ["-g", "-t"]:
+    mask = format(1 << (active - 1), "09b")
+    time.sleep({query_delay})
+    print(f"FAKE-1 tags {{mask}} {{mask}} 0")
+elif args == ["-g", "-l"]:
+    print("t")
+elif args == ["-g", "-c"]:
+    print("bench fake")
+elif args[:1] == ["-t"]:
+    time.sleep({delay})
+    open(state, "w").write(args[1])
+elif args[:1] == ["-l"]:
+    time.sleep({delay})
+"""
+
+POLL_INTERVAL = 1.0
+
+
+def install_fake_mmsg(directory, delay_ms, query_delay_ms=0):
+    path = os.path.join(directory, "mmsg")
+    with open(path, "w") as f:
+        f.write(
+            FAKE_MMSG.format(
+                python=sys.executable,
+                delay=delay_ms / 1000,
+                query_delay=query_delay_ms / 1000,
+            )
+        )
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = directory + os.pathsep + os.environ["PATH"]
+
+
+def bench_sync(clicks):
+    """Old path: blocking mmsg, then on average half a poll interval."""
+    total = 0.0
+    for i in range(clicks):
+        start = time.perf_counter()
+        subprocess.run(["mmsg", "-o", "FAKE-1", "-t", str(i % 9 + 1)], check=False)
+        total += time.perf_counter() - start
+    blocked = total / clicks
+    return blocked, blocked + POLL_INTERVAL / 2
+
+
+def bench_async(clicks):
+    from gi.repository import GLib
+
+    from services.mango import MangoService
+
+    service = MangoService(monitor="FAKE-1")
+    service.stop()  # only the click path is measured
+    loop = GLib.MainLoop()
+    visual = []
+    confirmed = []
+    state = {}
+
+    def on_tags_changed(*_):
+        if "start" in state and "visual" not in state:
+            state["visual"] = time.perf_counter()
+
+    def on_finished(_, kind):
+        confirmed.append(time.perf_counter() - state["start"])
+        visual.append(state["visual"] - state["start"])
+        GLib.idle_add(click)
+
+    def click():
+        if len(confirmed) >= clicks:
+            loop.quit()
+            return False
+        state.clear()
+        state["start"] = time.perf_counter()
+        service.view_tag(len(confirmed) % 9 + 1)
+        return False
+
+    service.connect("tags-changed", on_tags_changed)
+    service.connect("command-finished", on_finished)
+    GLib.idle_add(click)
+    loop.run()
+    return sum(visual) / clicks, sum(confirmed) / clicks
+
+
+def check_stale_poll(delay_ms, query_delay_ms):
+    """Click while a slow poll runs; return the active tags seen after it."""
+    from gi.repository import GLib
+
+    from services.mango import MangoService
+
+    service = MangoService(monitor="FAKE-1")
+    service.stop()
+    loop = GLib.MainLoop()
+    seen = []
+
+    def run(ms):
+        GLib.timeout_add(ms, loop.quit)
+        loop.run()
+
+    # Let the first poll settle on tag 1
+    run(query_delay_ms + 500)
+    service.connect("tags-changed", lambda *_: seen.append(service.active_tags))
+
+    service.update()
+    # The tag command returns well before the poll's tag query does
+    GLib.timeout_add(query_delay_ms // 10, lambda: service.view_tag(5))
+    run(3 * query_delay_ms + delay_ms + 500)
+    return seen, service.active_tags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--delay", type=float, default=30, help="mmsg delay in ms")
+    parser.add_argument("--clicks", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mangobar_mmsg_") as directory:
+        install_fake_mmsg(directory, args.delay)
+
+        blocked, sync_visual = bench_sync(args.clicks)
+        print(
+            f"  sync:  main loop blocked {blocked * 1000:6.1f} ms, "
+            f"click-to-visual ~{sync_visual * 1000:6.1f} ms"
+        )
+        visual, confirmed = bench_async(args.clicks)
+        print(
+            f"  async: click-to-visual {visual * 1000:6.1f} ms, "
+            f"confirmed after {confirmed * 1000:6.1f} ms"
+        )
+
+    with tempfile.TemporaryDirectory(prefix="mangobar_mmsg_") as directory:
+        install_fake_mmsg(directory, args.delay, query_delay_ms=200)
+        open(os.path.join(directory, "active"), "w").write("1")
+        seen, final = check_stale_poll(args.delay, 200)
+    # After clicking tag 5 the highlight must never go back to tag 1
+    ok = [1] not in seen and final == [5]
+    print(f"  stale poll: active tags after the click {seen}, final {final}")
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
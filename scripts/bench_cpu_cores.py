@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-core CPU heatmap sampling against synthetic core counts.
+
+Builds a fake procfs/sysfs tree for each core count and times one sampling
+tick (/proc/stat, this tick's round-robin share of the per-core rows and
+scaling_cur_freq files, per-core deltas) and packing the heatmap pixels.
+Ticks of the different core counts are interleaved and the reported time
+is the median per tick, which keeps other load on the machine out of the
+comparison.
+
+Up to CORES_PER_TICK cores every row is parsed on every tick, so the cost
+grows with the core count. Past it the cost must stay flat: the script
+exits with status 1 if any larger count costs more than GROWTH_TOLERANCE
+times the cost at CORES_PER_TICK cores (measured too if not listed), or
+if the round-robin readings are wrong. The correctness check gives every
+core a fixed busy ratio, reads one full round-robin cycle, and compares.
+It then takes a core offline and expects a fresh start from all cores.
+
+Usage:
+    python scripts/bench_cpu_cores.py [--ticks N] [cores ...]
+
+Examples:
+    python scripts/bench_cpu_cores.py              # 8, 64 and 256 cores
+    python scripts/bench_cpu_cores.py 512 1024
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.cells import pack_cells  # noqa: E402
+from services.procfs import CORES_PER_TICK, CpuCoreReader, np  # noqa: E402
+
+# Largest allowed ratio of the per-tick cost past CORES_PER_TICK cores to
+# the cost at CORES_PER_TICK cores; /proc/stat itself still grows by about
+# 45 bytes per core, which the kernel formats and copies on every read
+GROWTH_TOLERANCE = 1.5
+
+
+def write_stat(path, cores, tick):
+    """Write a /proc/stat with `cores` per-core lines advanced by `tick`."""
+    rng = random.Random(tick)
+    lines = ["cpu  1 2 3 4 5 6 7 8 9 10"]
+    for core in range(cores):
+        base = 1_000_000 + tick * 100
+        busy = rng.randint(0, 100)
+        user = base + busy * tick
+        idle = base + (100 - busy) * tick
+        lines.append(f"cpu{core} {user} 0 {base} {idle} 10 0 5 0 0 0")
+    lines.append("intr 0")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def build_fake_root(root, cores):
+    os.makedirs(os.path.join(root, "proc"))
+    for core in range(cores):
+        cpufreq = os.path.join(
+            root, "sys", "devices", "system", "cpu", f"cpu{core}", "cpufreq"
+        )
+        os.makedirs(cpufreq)
+        with open(os.path.join(cpufreq, "scaling_cur_freq"), "w") as f:
+            f.write(f"{random.randint(800_000, 4_800_000)}\n")
+        with open(os.path.join(cpufreq, "cpuinfo_max_freq"), "w") as f:
+            f.write("4800000\n")
+
+    stat_path = os.path.join(root, "proc", "stat")
+    write_stat(stat_path, cores, 1)
+    return stat_path
+
+
+def bench(counts, ticks):
+    """Return {cores: (read us, pack us)}, median per tick.
+
+    Ticks of the different core counts are interleaved, so load from
+    elsewhere on the machine slows them all alike.
+    """
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        readers = {}
+        for cores in counts:
+            core_root = os.path.join(root, str(cores))
+            stat_path = build_fake_root(core_root, cores)
+            readers[cores] = (stat_path, CpuCoreReader(root=core_root))
+            readers[cores][1].read()
+
+        read_times = {cores: [] for cores in counts}
+        pack_times = {cores: [] for cores in counts}
+        for tick in range(ticks):
+            for cores, (stat_path, reader) in readers.items():
+                # Rewrite in place (outside the timing) so every tick has
+                # deltas; the reader keeps its handle open across rewrites
+                write_stat(stat_path, cores, tick + 2)
+                start = time.perf_counter()
+                usage, freqs = reader.read()
+                read_times[cores].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                pack_cells(list(usage) + list(freqs), (0.6, 0.5, 0.8), 8)
+                pack_times[cores].append(time.perf_counter() - start)
+
+    return {
+        cores: (
+            statistics.median(read_times[cores]) * 1e6,
+            statistics.median(pack_times[cores]) * 1e6,
+        )
+        for cores in counts
+    }
+
+
+def write_steady_stat(path, busy, tick):
+    """Write a /proc/stat where core N is busy[N] percent of every tick."""
+    lines = ["cpu  1 2 3 4 5 6 7 8 9 10"]
+    for core, percent in busy.items():
+        user = 1_000_000 + percent * tick
+        idle = 1_000_000 + (100 - percent) * tick
+        lines.append(f"cpu{core} {user} 0 0 {idle} 0 0 0 0 0 0")
+    lines.append("intr 0")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def check_windows(cores):
+    rng = random.Random(cores)
+    busy = {core: rng.randint(0, 100) for core in range(cores)}
+    cycle = -(-cores // CORES_PER_TICK)
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        stat_path = build_fake_root(root, cores)
+        tick = 1
+        write_steady_stat(stat_path, busy, tick)
+        reader = CpuCoreReader(root=root)
+        reader.read()
+        for _ in range(cycle):
+            tick += 1
+            write_steady_stat(stat_path, busy, tick)
+            usage, _ = reader.read()
+        wrong = sum(
+            abs(usage[i] - percent / 100) > 1e-6 for i, percent in busy.items()
+        )
+
+        # Core 3 goes offline: its row disappears from /proc/stat
+        del busy[3]
+        tick += 1
+        write_steady_stat(stat_path, busy, tick)
+        for _ in range(cycle + 1):
+            tick += 1
+            write_steady_stat(stat_path, busy, tick)
+            usage, _ = reader.read()
+        offline = len(usage) != cores - 1 or any(
+            abs(value - percent / 100) > 1e-6
+            for value, percent in zip(usage, busy.values())
+        )
+
+    print(
+        f"  windows: {cores} cores over {cycle} tick(s), {wrong} wrong; "
+        f"after a core went offline: {'wrong' if offline else 'ok'}"
+    )
+    return wrong == 0 and not offline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("cores", nargs="*", type=int, default=[8, 64, 256])
+    parser.add_argument("--ticks", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"NumPy: {'yes' if np is not None else 'no (pure Python fallback)'}")
+    counts = sorted(set(args.cores))
+    if counts[-1] > CORES_PER_TICK and CORES_PER_TICK not in counts:
+        counts = sorted(counts + [CORES_PER_TICK])
+    costs = {}
+    for cores, (read_us, pack_us) in bench(counts, args.ticks).items():
+        costs[cores] = read_us
+        print(
+            f"  {cores:5d} cores: read {read_us:8.1f} us/tick, "
+            f"pack {pack_us:7.1f} us/tick"
+        )
+
+    ok = True
+    if CORES_PER_TICK in costs:
+        growth = max(costs[c] for c in costs if c >= CORES_PER_TICK)
+        growth /= costs[CORES_PER_TICK]
+        print(
+            f"  growth past {CORES_PER_TICK} cores: {growth:.2f}x "
+            f"(tolerance {GROWTH_TOLERANCE:.1f}x)"
+        )
+        ok = growth <= GROWTH_TOLERANCE
+    ok = check_windows(max(counts[-1], 2 * CORES_PER_TICK + 5)) and ok
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Compare the old Overlay gauge stack against the single-widget Gauge.
+
+The old stack is Overlay + background CircularProgressBar + foreground
+CircularProgressBar + Label, as used by every gauge before widgets/gauge.py.
+Both are rendered offscreen with the bar's stylesheet; the script reports
+widgets per gauge and the mean time to draw one animation frame. That part
+requires the full GTK/Fabric stack and is skipped without it.
+
+Before it, a headless check animates a gauge through random sampler
+readings and compares the area each frame invalidates (services/arc.py)
+with the pixels that actually change, and with the whole widget that the
+Overlay stack redrew. Changed pixels are rendered with cairo when pycairo
+is installed; otherwise a pixel counts as changed when its center lies
+within half the line width plus half a pixel diagonal of the stroke that
+moved. The script exits with status 1 if any changed pixel falls outside
+the invalidated area.
+
+Usage:
+    python scripts/bench_gauge.py [--frames N] [--readings N]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.arc import START_ANGLE, redraw_area, value_angle  # noqa: E402
+
+try:
+    import cairo
+except ImportError:
+    cairo = None
+
+try:
+    import gi
+
+    gi.require_version("Gtk", "3.0")
+    gi.require_version("Gdk", "3.0")
+    from gi.repository import Gdk, Gtk
+    from fabric.widgets.circularprogressbar import CircularProgressBar
+    from fabric.widgets.label import Label
+    from fabric.widgets.overlay import Overlay
+
+    from widgets.gauge import Gauge
+except (ImportError, ValueError) as e:
+    Gtk = None
+    GTK_ERROR = e
+
+# Gauge.BEZIER_CURVE and Gauge.DURATION, animated at 60 Hz
+BEZIER_CURVE = (0.34, 1.56, 0.64, 1.0)
+DURATION = 0.8
+FPS = 60
+# (size, line width) of the gauges checked; 35 puts the center mid-pixel
+GAUGES = ((34, 4), (35, 3))
+
+
+def animation_frames(readings):
+    """Yield (old, new) values per frame while animating between readings."""
+    rng = random.Random(1)
+    value = 0.0
+    for _ in range(readings):
+        start, end = value, rng.choice((0.0, 1.0, rng.random()))
+        for frame in range(1, round(DURATION * FPS) + 1):
+            t = frame / (DURATION * FPS)
+            y1, y2 = BEZIER_CURVE[1], BEZIER_CURVE[3]
+            eased = 3 * (1 - t) ** 2 * t * y1 + 3 * (1 - t) * t**2 * y2 + t**3
+            new = start + (end - start) * eased
+            if new != value:
+                yield value, new
+            value = new
+
+
+def arc_distance(px, py, cx, cy, radius, start, end):
+    """Distance from a point to the arc between two angles (start <= end)."""
+    angle = math.atan2(py - cy, px - cx)
+    # Bring the point's angle into [start, start + 2 pi)
+    angle = start + (angle - start) % (2 * math.pi)
+    if angle <= end:
+        return abs(math.hypot(px - cx, py - cy) - radius)
+    return min(
+        math.hypot(px - cx - radius * math.cos(a), py - cy - radius * math.sin(a))
+        for a in (start, end)
+    )
+
+
+def changed_pixels_geometric(size, line_width, old, new):
+    cx = cy = size / 2
+    radius = (size - line_width) / 2
+    start, end = sorted((value_angle(old), value_angle(new)))
+    reach = line_width / 2 + math.sqrt(2) / 2
+    return {
+        (x, y)
+        for y in range(size)
+        for x in range(size)
+        if arc_distance(x + 0.5, y + 0.5, cx, cy, radius, start, end) <= reach
+    }
+
+
+def render_arc(size, line_width, value):
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, size, size)
+    if value > 0:
+        cr = cairo.Context(surface)
+        cr.set_line_width(line_width)
+        cr.set_line_cap(cairo.LINE_CAP_ROUND)
+        cr.arc(size / 2, size / 2, (size - line_width) / 2, START_ANGLE, value_angle(value))
+        cr.stroke()
+    surface.flush()
+    return bytes(surface.get_data()), surface.get_stride()
+
+
+def changed_pixels_cairo(size, line_width, old, new):
+    before, stride = render_arc(size, line_width, old)
+    after, _ = render_arc(size, line_width, new)
+    return {
+        (x, y)
+        for y in range(size)
+        for x in range(size)
+        if before[y * stride + 4 * x : y * stride + 4 * x + 4]
+        != after[y * stride + 4 * x : y * stride + 4 * x + 4]
+    }
+
+
+def check_redraw(readings):
+    changed_pixels = changed_pixels_cairo if cairo else changed_pixels_geometric
+    ok = True
+    for size, line_width in GAUGES:
+        frames = missed = 0
+        area = changed = 0
+        for old, new in animation_frames(readings):
+            x, y, w, h = redraw_area(
+                size / 2, size / 2, (size - line_width) / 2, line_width, old, new
+            )
+            pixels = changed_pixels(size, line_width, old, new)
+            missed += sum(
+                not (x <= px < x + w and y <= py < y + h) for px, py in pixels
+            )
+            # Only the part inside the widget is drawn
+            w = min(x + w, size) - max(x, 0)
+            h = min(y + h, size) - max(y, 0)
+            area += w * h
+            changed += len(pixels)
+            frames += 1
+
+        full = size * size
+        print(
+            f"  {size}px gauge, line {line_width}: {frames} frames, invalidated "
+            f"{area / frames / full:5.1%} of the widget per frame (the Overlay "
+            f"stack redrew 100%), pixels changed {changed / frames / full:5.1%}, "
+            f"{missed} changed pixel(s) outside"
+        )
+        ok = ok and missed == 0
+    print(f"  changed pixels from: {'cairo' if cairo else 'stroke geometry'}")
+    return ok
+
+
+def build_old():
+    label = Label(name="cpu", label="42%")
+    front = CircularProgressBar(
+        name="cpu-progress-bar", pie=False, size=34, line_width=4, child=label
+    )
+    # Styled only by defaults now that the stylesheet no longer targets it
+    back = CircularProgressBar(
+        name="circle-progress-back", pie=False, size=34, line_width=4, value=100
+    )
+    overlay = Overlay(child=back, overlays=[front])
+
+    def set_value(value):
+        front.set_value(value)
+        label.set_label(f"{int(value * 100)}%")
+
+    return overlay, set_value
+
+
+def build_new():
+    gauge = Gauge(name="cpu-progress-bar", label="42%", size=34, line_width=4)
+
+    def set_value(value):
+        gauge.set_value(value)
+        gauge.set_label(f"{int(value * 100)}%")
+
+    return gauge, set_value
+
+
+def count_widgets(widget):
+    count = 1
+    if isinstance(widget, Gtk.Container):
+        for child in widget.get_children():
+            count += count_widgets(child)
+    return count
+
+
+def bench(build, frames):
+    widget, set_value = build()
+    window = Gtk.OffscreenWindow()
+    window.add(widget)
+    window.show_all()
+    while Gtk.events_pending():
+        Gtk.main_iteration()
+
+    width = window.get_allocated_width()
+    height = window.get_allocated_height()
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        set_value((frame % 100) / 100)
+        cr = cairo.Context(surface)
+        window.draw(cr)
+    elapsed = time.perf_counter() - start
+
+    widgets = count_widgets(widget)
+    window.destroy()
+    return widgets, elapsed / frames * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--readings", type=int, default=60)
+    args = parser.parse_args()
+
+    ok = check_redraw(args.readings)
+    if Gtk is None:
+        print(f"  GTK draw time skipped: {GTK_ERROR}")
+        print("  PASS" if ok else "  FAIL")
+        sys.exit(0 if ok else 1)
+
+    provider = Gtk.CssProvider()
+    provider.load_from_path(os.path.join(BASE_DIR, "style.css"))
+    Gtk.StyleContext.add_provider_for_screen(
+        Gdk.Screen.get_default(), provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
+    )
+
+    for name, build in (("overlay stack", build_old), ("gauge", build_new)):
+        widgets, us_per_frame = bench(build, args.frames)
+        print(f"  {name:14s} {widgets} widget(s), {us_per_frame:7.1f} us/frame")
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark network/disk rate sampling against a fake procfs with many entries.
+
+Builds /proc/net/dev and /proc/diskstats with a few physical interfaces
+and disks plus hundreds of virtual interfaces (veth, docker, VPN tun) and
+partitions, then times one sampling tick with the default filters and
+with every entry matched. Counters advance between ticks and eth0's is
+reset every few ticks, as when an interface is re-created, so the delta
+path is exercised too.
+
+Three checks follow, and the script exits with status 1 if any fails:
+
+reset      eth0's readings through counter_delta: a reset must never
+           count as more than the traffic since the previous tick
+wrap       IoReader with wlan0 listed as a 32-bit interface whose rx
+           counter wraps at 2**32 every few ticks: wlan0's rate must equal
+           that of eth0 moving the same traffic on a 64-bit counter, and a
+           32-bit counter that drops implausibly far must count as a reset
+multipage  ProcFile against a real multi-page seq_file (/proc/kallsyms,
+           or /proc/self/smaps): the regular files above always come back
+           in one read, procfs returns about a page per read
+
+Usage:
+    python scripts/bench_io.py [--ticks N] [entries ...]
+
+Examples:
+    python scripts/bench_io.py              # 10, 100 and 500 virtual entries
+    python scripts/bench_io.py 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.procfs import IoReader, ProcFile, counter_delta  # noqa: E402
+
+NET_HEADER = (
+    "Inter-|   Receive                                                |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast"
+    "|bytes    packets errs drop fifo colls carrier compressed\n"
+)
+
+
+def interface_names(virtual):
+    names = ["lo", "eth0", "wlan0"]
+    for i in range(virtual):
+        names.append(("veth", "docker", "tun", "br-")[i % 4] + f"{i:x}")
+    return names
+
+
+def device_names(virtual):
+    names = ["nvme0n1", "nvme0n1p1", "nvme0n1p2", "sda", "sda1"]
+    names += [f"loop{i}" for i in range(virtual // 2)]
+    names += [f"dm-{i}" for i in range(virtual - virtual // 2)]
+    return names
+
+
+# eth0 moves this many bytes per tick and is re-created every few ticks,
+# restarting its 64-bit counter from zero while still below 2**32
+ETH0_PER_TICK = 1_000_000_000
+ETH0_RESET_EVERY = 4
+# Traffic per tick in the wrap check; wraps a 32-bit counter every 3 ticks
+WRAP_PER_TICK = 1_500_000_000
+
+
+def eth0_rx(tick):
+    return (tick % ETH0_RESET_EVERY) * ETH0_PER_TICK
+
+
+def write_net_dev(path, names, tick):
+    lines = []
+    for i, name in enumerate(names):
+        rx = eth0_rx(tick) if name == "eth0" else tick * 1000 * i
+        tx = tick * 500 * i
+        lines.append(f"{name:>6}: {rx} 10 0 0 0 0 0 0 {tx} 10 0 0 0 0 0 0")
+    with open(path, "w") as f:
+        f.write(NET_HEADER + "\n".join(lines) + "\n")
+
+
+def write_diskstats(path, names, tick):
+    lines = []
+    for i, name in enumerate(names):
+        reads, sectors = tick * (i + 1), tick * 8 * (i + 1)
+        lines.append(
+            f"259 {i} {name} {reads} 0 {sectors} 10 {reads} 0 {sectors} 10 "
+            "0 20 30 0 0 0 0 0 0"
+        )
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def bench(virtual, ticks, filtered):
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        os.makedirs(os.path.join(root, "proc", "net"))
+        net_path = os.path.join(root, "proc", "net", "dev")
+        disk_path = os.path.join(root, "proc", "diskstats")
+        interfaces = interface_names(virtual)
+        devices = device_names(virtual)
+        write_net_dev(net_path, interfaces, 1)
+        write_diskstats(disk_path, devices, 1)
+
+        if filtered:
+            reader = IoReader(root=root)
+        else:
+            reader = IoReader(root=root, exclude_interfaces=(), devices=("*",))
+        reader.read()
+
+        elapsed = 0.0
+        for tick in range(ticks):
+            # Rewrite outside the timing; the reader keeps its handles open
+            write_net_dev(net_path, interfaces, tick + 2)
+            write_diskstats(disk_path, devices, tick + 2)
+            start = time.perf_counter()
+            rates = reader.read()
+            elapsed += time.perf_counter() - start
+
+    matched = len(rates["interfaces"]) + len(rates["devices"])
+    return elapsed / ticks * 1e6, matched, rates
+
+
+def check_reset(ticks):
+    deltas = [counter_delta(eth0_rx(t + 1), eth0_rx(t)) for t in range(ticks)]
+    worst = max(deltas)
+    print(
+        f"  reset:     largest eth0 delta {worst / 1e9:.2f} GB per tick "
+        f"(traffic {ETH0_PER_TICK / 1e9:.2f} GB per tick)"
+    )
+    return worst <= ETH0_PER_TICK
+
+
+def write_wrapping_net_dev(path, tick):
+    rx = tick * WRAP_PER_TICK
+    lines = [
+        f"{'eth0':>6}: {rx} 10 0 0 0 0 0 0 0 10 0 0 0 0 0 0",
+        f"{'wlan0':>6}: {rx % 2**32} 10 0 0 0 0 0 0 0 10 0 0 0 0 0 0",
+    ]
+    with open(path, "w") as f:
+        f.write(NET_HEADER + "\n".join(lines) + "\n")
+
+
+def check_wrap(ticks):
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        os.makedirs(os.path.join(root, "proc", "net"))
+        net_path = os.path.join(root, "proc", "net", "dev")
+        write_wrapping_net_dev(net_path, 1)
+        write_diskstats(os.path.join(root, "proc", "diskstats"), [], 1)
+
+        reader = IoReader(root=root, wrap32_interfaces=("wlan0",))
+        reader.read()
+        wraps = wrong = 0
+        for tick in range(2, ticks + 2):
+            write_wrapping_net_dev(net_path, tick)
+            rates = reader.read()["interfaces"]
+            wraps += (tick * WRAP_PER_TICK) % 2**32 < ((tick - 1) * WRAP_PER_TICK) % 2**32
+            wrong += rates["wlan0"][0] != rates["eth0"][0]
+
+    # Dropping from 1 GB to 500 bytes would be a 3.3 GB wrap: a reset
+    reset = counter_delta(500, 1_000_000_000, 32)
+    print(
+        f"  wrap:      {wraps} wraps in {ticks} ticks, {wrong} wrong rates; "
+        f"32-bit reset counted as {reset} bytes"
+    )
+    return wraps > 0 and wrong == 0 and reset == 500
+
+
+def check_multipage():
+    for path in ("/proc/kallsyms", "/proc/self/smaps"):
+        try:
+            proc_file = ProcFile(path)
+        except OSError:
+            continue
+        length = proc_file.read()
+        lines = proc_file.buffer[:length].count(b"\n")
+        with open(path, "rb") as f:
+            expected = f.read().count(b"\n")
+        proc_file.close()
+        print(
+            f"  multipage: {path}: {length} bytes, {lines} lines read "
+            f"({expected} lines by a plain read)"
+        )
+        # smaps can gain a mapping or two (about 25 lines each) in between
+        return abs(lines - expected) <= (0 if path == "/proc/kallsyms" else 50)
+    print("  multipage: skipped, no multi-page procfs file readable")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("entries", nargs="*", type=int, default=[10, 100, 500])
+    parser.add_argument("--ticks", type=int, default=500)
+    args = parser.parse_args()
+
+    for virtual in args.entries:
+        for filtered in (True, False):
+            us, matched, rates = bench(virtual, args.ticks, filtered)
+            print(
+                f"  {virtual:5d} virtual entries, "
+                f"{'default filters' if filtered else 'match all':15s}: "
+                f"{us:7.1f} us/tick, {matched:4d} entries tracked"
+            )
+        if rates["rx"] < 0:
+            print("  negative rate: counter reset not handled")
+
+    ok = check_reset(args.ticks)
+    ok = check_wrap(args.ticks) and ok
+    ok = check_multipage() and ok
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compare RSS and CPU of one bar process per monitor with one for all monitors.
+
+matching  Gdk monitors are paired with Mango outputs by geometry, then by
+          model, against fake `wlr-randr --json` heads listed in every
+          order a hotplug can produce. Each monitor must get its own output
+          whatever the order, and an ambiguous monitor must get none.
+measure   Starts `config.py` once (a bar on every monitor), then once per
+          monitor with --monitor N, lets both settle and samples RSS and
+          CPU of the processes like measure_bar.py. Needs a Wayland session
+          with GTK; skipped otherwise.
+
+Exits with status 1 if the matching check fails or a bar process dies.
+
+Usage:
+    python scripts/bench_multi_monitor.py [--monitors N] [--settle S] [--duration S]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from scripts.measure_bar import measure  # noqa: E402
+from services.mango import (  # noqa: E402
+    match_output,
+    parse_output_heads,
+    read_output_heads,
+)
+
+
+def head(name, model, x, y, width, height, scale=1.0, transform="normal"):
+    return {
+        "name": name,
+        "model": model,
+        "enabled": True,
+        "modes": [{"width": width, "height": height, "current": True}],
+        "position": {"x": x, "y": y},
+        "scale": scale,
+        "transform": transform,
+    }
+
+
+# Fake heads and the logical geometry Gdk reports for each of them
+HEADS = [
+    head("DP-3", "U2720Q", 0, 0, 2560, 1440),
+    head("HDMI-A-1", "VG27", 2560, 0, 1920, 1080, scale=1.25),
+    head("DP-4", "VG27", 4096, 0, 1920, 1080, transform="90"),
+    head("eDP-1", "0x08E8", 0, 1440, 2880, 1800, scale=2.0),
+]
+MONITORS = {
+    "DP-3": ((0, 0, 2560, 1440), "U2720Q"),
+    "HDMI-A-1": ((2560, 0, 1536, 864), "VG27"),
+    "DP-4": ((4096, 0, 1080, 1920), "VG27"),
+    "eDP-1": ((0, 1440, 1440, 900), "0x08E8"),
+}
+
+
+def check_matching():
+    wrong = 0
+    orders = 0
+    for order in itertools.permutations(HEADS):
+        heads = parse_output_heads(json.dumps(order))
+        orders += 1
+        for name, (geometry, model) in MONITORS.items():
+            wrong += match_output(geometry, model, heads) != name
+
+    # Two mirrored outputs of the same model cannot be told apart
+    mirrored = parse_output_heads(
+        json.dumps(
+            [
+                head("DP-1", "VG27", 0, 0, 1920, 1080),
+                head("DP-2", "VG27", 0, 0, 1920, 1080),
+            ]
+        )
+    )
+    ambiguous = match_output((0, 0, 1920, 1080), "VG27", mirrored)
+
+    print(
+        f"  matching: {len(MONITORS)} monitors x {orders} head orders, "
+        f"{wrong} wrong; mirrored twins -> {ambiguous}"
+    )
+    return wrong == 0 and ambiguous is None
+
+
+def start_bars(argvs):
+    return [
+        subprocess.Popen(
+            [sys.executable, os.path.join(BASE_DIR, "config.py"), *argv],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for argv in argvs
+    ]
+
+
+def run_setup(label, argvs, settle, duration):
+    processes = start_bars(argvs)
+    try:
+        time.sleep(settle)
+        if any(process.poll() is not None for process in processes):
+            print(f"  {label}: a bar process exited during startup")
+            return False
+        results = measure([process.pid for process in processes], duration)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    rss = sum(rss_kb for rss_kb, _ in results.values()) / 1024
+    cpu = sum(cpu_percent for _, cpu_percent in results.values())
+    print(
+        f"  {label:24s}: {len(processes)} process(es), "
+        f"{rss:6.1f} MiB RSS, {cpu:5.2f}% CPU"
+    )
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--monitors", type=int, default=None)
+    parser.add_argument("--settle", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    ok = check_matching()
+
+    if not os.environ.get("WAYLAND_DISPLAY"):
+        print("  measure: skipped, no Wayland session")
+    else:
+        monitors = args.monitors or len(read_output_heads()) or 1
+        ok = run_setup("one process, all bars", [[]], args.settle, args.duration) and ok
+        ok = run_setup(
+            "one process per monitor",
+            [["--monitor", str(i)] for i in range(monitors)],
+            args.settle,
+            args.duration,
+        ) and ok
+
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
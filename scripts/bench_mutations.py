@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Count widget mutations per minute on a simulated steady-state desktop.
+
+Feeds a minute of noisy-but-idle readings (CPU jitter, RAM drifting by a
+fraction of a percent, temperatures flipping by 1°C, a playing track, the
+uptime clock) through the bar's update paths, once writing every reading to
+the widgets as the bar used to and once through services/filters.py.
+
+Usage:
+    python scripts/bench_mutations.py [--seconds N] [--seed N]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.filters import (  # noqa: E402
+    MetricFilter,
+    metric_filter,
+    percent_label,
+    temperature_label,
+)
+
+# Widget calls each reading used to cost: gauges set a label and animate
+GAUGE_CALLS = 2
+
+
+def steady_state(seconds, seed):
+    rng = random.Random(seed)
+    for tick in range(seconds):
+        yield {
+            "cpu": max(0.0, rng.gauss(6, 2)),
+            "ram": 41.3 + rng.uniform(-0.05, 0.05),
+            "cpu-temp": rng.choice((47, 48, 48, 49)),
+            "gpu": max(0, int(rng.gauss(3, 2))),
+            "vram": 12,
+            "gpu-temp": rng.choice((40, 41)),
+            "media-progress": (60 + tick) / 210,
+            "media-status": "Playing",
+            "uptime": 93_000 + tick,
+        }
+
+
+def count_unfiltered(readings):
+    per_tick = 0
+    per_tick += GAUGE_CALLS * 4  # cpu, ram, gpu, vram
+    per_tick += 2  # cpu and gpu temperature labels
+    per_tick += 2  # media progress animation and status icon
+    per_tick += 4  # uptime labels
+    return per_tick * len(readings)
+
+
+def count_filtered(readings):
+    def noop(*_):
+        pass
+
+    filters = {
+        "cpu": (metric_filter("cpu", noop, percent_label), GAUGE_CALLS),
+        "ram": (metric_filter("ram", noop, percent_label), GAUGE_CALLS),
+        "gpu": (metric_filter("gpu", noop, percent_label), GAUGE_CALLS),
+        "vram": (metric_filter("vram", noop, percent_label), GAUGE_CALLS),
+        "cpu-temp": (metric_filter("cpu-temp", noop, temperature_label), 1),
+        "gpu-temp": (metric_filter("gpu-temp", noop, temperature_label), 1),
+        "media-progress": (
+            metric_filter("media-progress", noop, lambda p: round(p * 200)),
+            1,
+        ),
+        "media-status": (MetricFilter(noop), 1),
+    }
+    uptime = [
+        MetricFilter(noop, lambda s: f"{int(s // 86400)}d"),
+        MetricFilter(noop, lambda s: f"{int((s % 86400) // 3600):02d}h"),
+        MetricFilter(noop, lambda s: f"{int((s % 3600) // 60):02d}m"),
+        MetricFilter(noop, lambda s: f"{int(s % 60):02d}s"),
+    ]
+
+    for reading in readings:
+        for name, (metric, _) in filters.items():
+            metric(reading[name])
+        for label in uptime:
+            label(reading["uptime"])
+
+    total = sum(metric.mutations * calls for metric, calls in filters.values())
+    return total + sum(label.mutations for label in uptime)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    readings = list(steady_state(args.seconds, args.seed))
+    per_minute = 60 / args.seconds
+    before = count_unfiltered(readings) * per_minute
+    after = count_filtered(readings) * per_minute
+    print(f"  unfiltered: {before:6.0f} widget mutations/min")
+    print(f"  filtered:   {after:6.0f} widget mutations/min")
+
+
+if __name__ == "__main__":
+    main()
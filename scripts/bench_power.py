@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Drive the power service with a fake sysfs tree and injected uevents.
+
+Builds /sys/class/power_supply with a battery and an AC adapter, then
+feeds PowerService a stream of kernel-style uevent datagrams over a
+socketpair: battery capacity/status changes, AC plug events, uevents from
+other subsystems and udev re-broadcasts that must be ignored. Reports the
+final state, how many "changed" signals were emitted, the handling cost
+per uevent, and the wakeups saved against polling once per second.
+
+Exits with status 1 unless exactly the kernel power_supply uevents were
+handled, "changed" was emitted once per actual change of capacity or AC,
+and the final state matches the last events.
+
+Requires PyGObject (GLib).
+
+Usage:
+    python scripts/bench_power.py [--events N]
+"""
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from gi.repository import GLib  # noqa: E402
+
+from services.power import PowerService  # noqa: E402
+
+BATTERY = {
+    "type": "Battery",
+    "status": "Discharging",
+    "capacity": "80",
+    "energy_now": "40000000",
+    "energy_full": "50000000",
+    "power_now": "10000000",
+}
+AC = {"type": "Mains", "online": "0"}
+
+
+def build_fake_sysfs(root):
+    for name, attributes in (("BAT0", BATTERY), ("AC", AC)):
+        path = os.path.join(root, "sys", "class", "power_supply", name)
+        os.makedirs(path)
+        for attribute, value in attributes.items():
+            with open(os.path.join(path, attribute), "w") as f:
+                f.write(value + "\n")
+
+
+def uevent(name, properties, subsystem="power_supply", action="change"):
+    devpath = f"/devices/LNXSYSTM:00/{name}/power_supply/{name}"
+    fields = [
+        f"{action}@{devpath}",
+        f"ACTION={action}",
+        f"DEVPATH={devpath}",
+        f"SUBSYSTEM={subsystem}",
+        f"POWER_SUPPLY_NAME={name}",
+    ]
+    fields += [f"POWER_SUPPLY_{key.upper()}={value}" for key, value in properties]
+    return "\0".join(fields).encode() + b"\0"
+
+
+def event_stream(count):
+    """Yield uevent datagrams resembling a discharge cycle plus noise."""
+    capacity = 80
+    for i in range(count):
+        kind = i % 5
+        if kind == 0:
+            capacity = max(capacity - 1, 1)
+            yield uevent("BAT0", [("status", "Discharging"), ("capacity", capacity)])
+        elif kind == 1:
+            # Same capacity again: must not reach the widget
+            yield uevent("BAT0", [("status", "Discharging"), ("capacity", capacity)])
+        elif kind == 2:
+            yield uevent("AC", [("online", i % 2)])
+        elif kind == 3:
+            yield uevent("usb1", [], subsystem="usb", action="add")
+        else:
+            yield b"libudev\0" + uevent("BAT0", [("capacity", 1)])
+
+
+def expected_outcome(count):
+    """(power uevents, changes, final capacity, final AC) for event_stream()."""
+    capacity, ac = 80, False
+    handled = changes = 0
+    for i in range(count):
+        kind = i % 5
+        if kind > 2:
+            continue  # other subsystems and udev re-broadcasts
+        handled += 1
+        before = (capacity, ac)
+        if kind == 0:
+            capacity = max(capacity - 1, 1)
+        elif kind == 2:
+            ac = bool(i % 2)
+        changes += (capacity, ac) != before
+    return handled, changes, capacity, ac
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        build_fake_sysfs(root)
+        kernel_end, bar_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        bar_end.setblocking(False)
+        # Room for every datagram so the whole stream can be queued up front
+        kernel_end.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 22)
+        bar_end.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 22)
+
+        service = PowerService(root=root, uevent_socket=bar_end)
+        print(f"  initial state: {service.state}")
+        changes = []
+        service.connect("changed", lambda _, state: changes.append(state))
+
+        loop = GLib.MainLoop()
+        events = list(event_stream(args.events))
+        sent = 0
+
+        def inject():
+            nonlocal sent
+            for data in events[sent : sent + 50]:
+                kernel_end.send(data)
+                sent += 1
+            if sent >= len(events):
+                GLib.timeout_add(100, loop.quit)
+                return False
+            return True
+
+        start = time.perf_counter()
+        GLib.idle_add(inject)
+        loop.run()
+        elapsed = time.perf_counter() - start - 0.1
+        service.stop()
+        kernel_end.close()
+
+    final = changes[-1] if changes else service.state
+    print(f"  final state:   {final}")
+    print(f"  uevents sent:  {len(events)}")
+    print(f"  power uevents: {service.uevents}")
+    print(f"  changed:       {len(changes)} signals")
+    print(f"  cost:          {elapsed / len(events) * 1e6:.1f} us/uevent")
+    print(
+        "  wakeups/hour:  one per kernel uevent + 12 drift refreshes, "
+        "vs 3600 when polling every second"
+    )
+
+    handled, expected_changes, capacity, ac = expected_outcome(len(events))
+    ok = (
+        service.uevents == handled
+        and len(changes) == expected_changes
+        and final["capacity"] == capacity
+        and final["ac"] == ac
+    )
+    print(
+        f"  expected:      {handled} power uevents, {expected_changes} signals, "
+        f"capacity {capacity}, ac {ac}"
+    )
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Compare PSI triggers with polling: idle wakeups and stall detection latency.
+
+polling   PressureService over a fake /proc/pressure tree. The fake memory
+          file is switched to avg10=40 and back, and the time until the
+          service reports the stall and the recovery is measured.
+triggers  PressureService on the kernel's /proc/pressure with threshold
+          triggers (skipped if the kernel has no PSI or refuses triggers).
+          CPU pressure is created with busy processes, two per CPU.
+
+Both report file reads while idle, i.e. periodic wakeups with no pressure.
+Exits with status 1 if either mode misses the stall or the recovery.
+
+Requires PyGObject (GLib).
+
+Usage:
+    python scripts/bench_pressure.py [--idle SECONDS] [--stress SECONDS]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from gi.repository import GLib  # noqa: E402
+
+from services.pressure import PressureService, has_pressure  # noqa: E402
+
+CALM = (
+    "some avg10=0.50 avg60=0.40 avg300=0.30 total=1000\n"
+    "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n"
+)
+STALLED = (
+    "some avg10=40.00 avg60=12.00 avg300=3.00 total=9000000\n"
+    "full avg10=20.00 avg60=6.00 avg300=1.00 total=4000000\n"
+)
+
+
+def build_fake_procfs(root):
+    path = os.path.join(root, "proc", "pressure")
+    os.makedirs(path)
+    for name in ("cpu", "memory", "io"):
+        write_pressure(root, name, CALM)
+
+
+def write_pressure(root, name, text):
+    with open(os.path.join(root, "proc", "pressure", name), "w") as f:
+        f.write(text)
+
+
+def run_loop(seconds, service=None, until=None):
+    """Run the GLib loop for `seconds`, or until `until(state)` is true.
+
+    Returns seconds elapsed when `until` was met, or None.
+    """
+    loop = GLib.MainLoop()
+    start = time.monotonic()
+    met = []
+
+    def on_changed(_service, state):
+        if until is not None and not met and until(state):
+            met.append(time.monotonic() - start)
+            loop.quit()
+
+    handler = service.connect("changed", on_changed) if service else None
+    GLib.timeout_add(int(seconds * 1000), loop.quit)
+    loop.run()
+    if handler is not None:
+        service.disconnect(handler)
+    return met[0] if met else None
+
+
+def calm(state):
+    return not any(entry["stalled"] for entry in state.values())
+
+
+def stalled(name):
+    return lambda state: state.get(name, {}).get("stalled", False)
+
+
+def recovered(name):
+    return lambda state: not state.get(name, {}).get("stalled", True)
+
+
+def spin(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def format_latency(seconds):
+    return "not seen" if seconds is None else f"{seconds * 1e3:7.0f} ms"
+
+
+def bench_polling(idle):
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        build_fake_procfs(root)
+        service = PressureService(root=root)
+        reads = service.reads
+        run_loop(idle)
+        idle_reads = service.reads - reads
+
+        write_pressure(root, "memory", STALLED)
+        detect = run_loop(10, service, stalled("memory"))
+        write_pressure(root, "memory", CALM)
+        recover = run_loop(10, service, recovered("memory"))
+        service.stop()
+
+    print("  polling  (fake procfs):")
+    print(f"    reads while idle for {idle:.0f} s: {idle_reads}")
+    print(f"    stall detected after:  {format_latency(detect)}")
+    print(f"    recovery seen after:   {format_latency(recover)}")
+    return detect is not None and recover is not None
+
+
+def bench_triggers(idle, stress):
+    if not has_pressure():
+        print("  triggers: skipped, kernel has no /proc/pressure")
+        return True
+    service = PressureService()
+    if service.mode != "triggers":
+        service.stop()
+        print("  triggers: skipped, kernel refused PSI triggers")
+        return True
+
+    # Let any stall from starting up clear first
+    run_loop(30, service, calm)
+    reads, events = service.reads, service.events
+    run_loop(idle)
+    idle_reads = service.reads - reads
+    idle_events = service.events - events
+
+    workers = [
+        multiprocessing.Process(target=spin, args=(stress,))
+        for _ in range(2 * (os.cpu_count() or 1))
+    ]
+    for worker in workers:
+        worker.start()
+    detect = run_loop(stress, service, stalled("cpu"))
+    for worker in workers:
+        worker.join()
+    recover = run_loop(30, service, recovered("cpu"))
+    service.stop()
+
+    print(f"  triggers (window {service.window:.0f} s, kernel PSI):")
+    print(
+        f"    reads while idle for {idle:.0f} s: {idle_reads} "
+        f"({idle_events} trigger events)"
+    )
+    print(f"    CPU stall detected after: {format_latency(detect)}")
+    print(f"    recovery seen after stress ended: {format_latency(recover)}")
+    return detect is not None and recover is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--idle", type=float, default=10)
+    parser.add_argument("--stress", type=float, default=5)
+    args = parser.parse_args()
+
+    ok = bench_polling(args.idle)
+    ok = bench_triggers(args.idle, args.stress) and ok
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the top-processes scan against a fake procfs with many processes.
+
+Builds /proc/<pid>/{stat,statm,comm,cmdline} for thousands of synthetic
+processes, advances their CPU times between ticks and replaces a few of
+them with new processes (some reusing old PIDs), then times one scan of
+ProcessScanner against a naive scan that re-reads every file and sorts
+the full list. Checks that both agree on the top processes.
+
+Usage:
+    python scripts/bench_processes.py [--processes N] [--ticks N] [--top N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.procfs import (  # noqa: E402
+    PAGE_SIZE,
+    STAT_RSS,
+    STAT_STARTTIME,
+    STAT_STIME,
+    STAT_UTIME,
+    ProcessScanner,
+)
+
+# Processes replaced by new ones each tick
+CHURN = 5
+
+
+def write_process(proc_dir, pid, start, ticks, rss_pages, name):
+    path = os.path.join(proc_dir, str(pid))
+    os.makedirs(path, exist_ok=True)
+    fields = ["S"] + ["0"] * 40
+    fields[STAT_UTIME] = str(ticks)
+    fields[STAT_STIME] = "0"
+    fields[STAT_STARTTIME] = str(start)
+    fields[STAT_RSS] = str(rss_pages)
+    with open(os.path.join(path, "stat"), "w") as f:
+        f.write(f"{pid} ({name}) {' '.join(fields)}\n")
+    with open(os.path.join(path, "statm"), "w") as f:
+        f.write(f"{rss_pages * 2} {rss_pages} 0 0 0 0 0\n")
+    with open(os.path.join(path, "comm"), "w") as f:
+        f.write(name + "\n")
+    with open(os.path.join(path, "cmdline"), "w") as f:
+        f.write(f"/usr/bin/{name}\0--flag\0{pid}\0")
+
+
+def naive_scan(proc_dir, previous, limit):
+    """Read everything for every process and sort the full list."""
+    rows = []
+    current = {}
+    for name in os.listdir(proc_dir):
+        if not name.isdigit():
+            continue
+        base = os.path.join(proc_dir, name)
+        with open(os.path.join(base, "stat")) as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(os.path.join(base, "statm")) as f:
+            rss = int(f.read().split()[1]) * PAGE_SIZE
+        with open(os.path.join(base, "comm")) as f:
+            comm = f.read().strip()
+        with open(os.path.join(base, "cmdline")) as f:
+            cmdline = f.read().replace("\0", " ").strip()
+        ticks = int(fields[STAT_UTIME]) + int(fields[STAT_STIME])
+        current[int(name)] = ticks
+        cpu = ticks - previous.get(int(name), ticks)
+        rows.append((int(name), comm, cmdline, cpu, rss))
+    by_cpu = sorted(rows, key=lambda row: row[3], reverse=True)[:limit]
+    by_rss = sorted(rows, key=lambda row: row[4], reverse=True)[:limit]
+    return by_cpu, by_rss, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--processes", type=int, default=5000)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        proc_dir = os.path.join(root, "proc")
+        os.makedirs(os.path.join(proc_dir, "self"))
+        processes = {
+            pid: [pid, 0, rng.randrange(100, 100_000), f"proc{pid}"]
+            for pid in range(1, args.processes + 1)
+        }
+        for pid, (start, ticks, rss, name) in processes.items():
+            write_process(proc_dir, pid, start, ticks, rss, name)
+
+        scanner = ProcessScanner(root=root, limit=args.top)
+        start = time.perf_counter()
+        scanner.scan()
+        cold = time.perf_counter() - start
+        previous = naive_scan(proc_dir, {}, args.top)[2]
+
+        incremental = naive = 0.0
+        mismatches = 0
+        for tick in range(args.ticks):
+            # Rewrite outside the timing: a few busy processes, some churn
+            for pid in rng.sample(sorted(processes), 50):
+                processes[pid][1] += rng.randrange(1, 100)
+                write_process(proc_dir, pid, *processes[pid])
+            for pid in rng.sample(sorted(processes), CHURN):
+                # Same PID, new start time: a different process
+                processes[pid] = [10**6 + tick, rng.randrange(0, 5), 500, "new"]
+                write_process(proc_dir, pid, *processes[pid])
+
+            start = time.perf_counter()
+            snapshot = scanner.scan()
+            incremental += time.perf_counter() - start
+
+            start = time.perf_counter()
+            by_cpu, by_rss, previous = naive_scan(proc_dir, previous, args.top)
+            naive += time.perf_counter() - start
+
+            if [i.rss for i in snapshot.by_rss] != [row[4] for row in by_rss]:
+                mismatches += 1
+            if snapshot.by_cpu[0].cpu == 0 and by_cpu[0][3] != 0:
+                mismatches += 1
+
+    print(f"  processes:         {snapshot.count}")
+    print(f"  first scan:        {cold * 1e3:7.1f} ms")
+    print(f"  incremental scan:  {incremental / args.ticks * 1e3:7.1f} ms/tick")
+    print(f"  naive scan + sort: {naive / args.ticks * 1e3:7.1f} ms/tick")
+    print(f"  static data cached for {len(scanner._static)} processes")
+    print(f"  mismatched ticks:  {mismatches}")
+    print("  top by CPU:")
+    for info in snapshot.by_cpu[:5]:
+        print(f"    {info.pid:>7} {info.cpu:6.1f}%  {info.cmdline}")
+
+
+if __name__ == "__main__":
+    main()
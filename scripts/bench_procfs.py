@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Compare the persistent-handle procfs reader against psutil.
+
+Times one bar tick worth of CPU, RAM and uptime sampling and reports the
+transient memory each tick allocates (tracemalloc peak per tick).
+
+Usage:
+    python scripts/bench_procfs.py [--ticks N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.procfs import ProcReader  # noqa: E402
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def procfs_tick(reader):
+    return reader.cpu_percent(), reader.ram_percent(), reader.uptime()
+
+
+def psutil_tick(_):
+    return (
+        psutil.cpu_percent(),
+        psutil.virtual_memory().percent,
+        time.time() - psutil.boot_time(),
+    )
+
+
+def bench(tick, state, ticks):
+    tick(state)  # warm up caches and first-call deltas
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick(state)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peak_total = 0
+    for _ in range(ticks):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        tick(state)
+        peak_total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return elapsed / ticks * 1e6, peak_total / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--ticks", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = [("procfs", bench(procfs_tick, ProcReader(), args.ticks))]
+    if psutil is not None:
+        results.append(("psutil", bench(psutil_tick, None, args.ticks)))
+    else:
+        print("psutil not installed, skipping comparison")
+
+    for name, (us_per_tick, bytes_per_tick) in results:
+        print(
+            f"  {name:7s} {us_per_tick:7.1f} us/tick, "
+            f"{bytes_per_tick:7.0f} B allocated/tick"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Count size-allocate passes per tag switch in the Tags and Layout modules.
+
+A fake Mango service cycles the active tag and layout; every widget in
+the offscreen test window counts the size-allocate signals it receives.
+The "legacy" run rebuilds the tag buttons and re-asserts visibility with
+show_all() after each update, as the modules used to, for comparison.
+That part requires the full GTK/Fabric stack and is skipped without it.
+
+Before it, a headless check drives the update logic the modules use
+(services/tags.py) through the same switches, without gi, and exits with
+status 1 unless a tag switch touches at most the two buttons whose state
+changed and a repeated state or layout touches nothing.
+
+Usage:
+    python scripts/bench_relayout.py [--switches N]
+"""
+
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.tags import changed_tags, layout_label, tag_states  # noqa: E402
+
+try:
+    import gi
+
+    gi.require_version("Gtk", "3.0")
+    gi.require_version("Gdk", "3.0")
+    from gi.repository import Gdk, GObject, Gtk
+    from fabric.widgets.box import Box
+
+    from modules.layout import Layout
+    from modules.tags import Tags
+except (ImportError, ValueError) as e:
+    Gtk = None
+    GTK_ERROR = e
+
+LAYOUTS = ("t", "s", "m", "g")
+TAGS = list(range(1, 10))
+OCCUPIED = [1, 2, 3]
+
+
+def check_logic(switches):
+    """Count the buttons and labels the update logic touches per switch."""
+    states = tag_states(TAGS, [], [])
+    label = None
+    touched = []
+    repeated = 0
+    relabels = 0
+    for i in range(switches):
+        active = [i % 9 + 1]
+        current = tag_states(TAGS, active, OCCUPIED)
+        changed = changed_tags(states, current)
+        touched.append(len(changed))
+        states = current
+        # The compositor re-reports the same state on the next poll
+        repeated += len(changed_tags(states, tag_states(TAGS, active, OCCUPIED)))
+
+        layout = f"FAKE-1 {LAYOUTS[(i // 3) % len(LAYOUTS)]}"
+        text = layout_label(layout)
+        if text != label:
+            label = text
+            relabels += 1
+
+    # The first switch applies the initial state to the occupied tags too
+    worst = max(touched[1:], default=0)
+    print(
+        f"  headless: buttons touched per tag switch: max {worst}, "
+        f"mean {sum(touched) / switches:.2f}; on a repeated state: {repeated}"
+    )
+    print(
+        f"            layout labels set: {relabels} for {switches} updates "
+        f"({-(-switches // 3)} layout changes)"
+    )
+    return worst <= 2 and repeated == 0 and relabels <= -(-switches // 3)
+
+
+if Gtk is not None:
+
+    class FakeMangoService(GObject.Object):
+        __gsignals__ = {
+            "tags-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+            "layout-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+            "command-finished": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        }
+
+        def __init__(self):
+            super().__init__()
+            self.monitor = "FAKE-1"
+            self.available_tags = list(TAGS)
+            self.active_tags = [1]
+            self.occupied_tags = list(OCCUPIED)
+            self.layout = "t"
+
+
+def count_allocations(widget, counter):
+    widget.connect("size-allocate", lambda *_: counter.__setitem__(0, counter[0] + 1))
+    if isinstance(widget, Gtk.Container):
+        for child in widget.get_children():
+            count_allocations(child, counter)
+
+
+def settle():
+    while Gtk.events_pending():
+        Gtk.main_iteration()
+
+
+def bench(switches, legacy):
+    service = FakeMangoService()
+    tags = Tags(service=service)
+    layout = Layout(service=service)
+    column = Box(orientation="v", children=[layout, tags])
+
+    window = Gtk.OffscreenWindow()
+    window.add(column)
+    window.show_all()
+    settle()
+
+    counter = [0]
+    count_allocations(window, counter)
+
+    for i in range(switches):
+        service.active_tags = [i % 9 + 1]
+        service.emit("tags-changed")
+        if i % 3 == 0:
+            service.layout = LAYOUTS[(i // 3) % len(LAYOUTS)]
+            service.emit("layout-changed")
+        if legacy:
+            # Tags used to rebuild every button on each tags-changed
+            tags.build_buttons()
+            for btn in tags.buttons:
+                count_allocations(btn, counter)
+            tags.show_all()
+            layout.show_all()
+        settle()
+
+    window.destroy()
+    return counter[0] / switches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--switches", type=int, default=200)
+    args = parser.parse_args()
+
+    ok = check_logic(args.switches)
+    if Gtk is None:
+        print(f"  GTK size-allocate count skipped: {GTK_ERROR}")
+        sys.exit(0 if ok else 1)
+
+    provider = Gtk.CssProvider()
+    provider.load_from_path(os.path.join(BASE_DIR, "style.css"))
+    Gtk.StyleContext.add_provider_for_screen(
+        Gdk.Screen.get_default(), provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
+    )
+
+    for name, legacy in (("legacy", True), ("current", False)):
+        per_switch = bench(args.switches, legacy)
+        print(f"  {name:8s} {per_switch:6.1f} size-allocate passes per tag switch")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
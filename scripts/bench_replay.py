@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Record every kind of channel to a trace, replay it and compare readings.
+
+Readings are recorded the way the bar records them: per-core CPU
+(utilization, frequency) vectors and I/O rates read by the procfs readers
+from fake /proc trees, GPU dicts, Mango state for one output and media
+player state.
+The trace is then replayed under a GLib main loop through the real
+samplers, MangoService and MediaService, and every value their
+subscribers receive is compared with what was recorded. Per-core
+readings must also produce the same heatmap cells and pixels as the
+live reading, since JSON hands them back as lists instead of arrays.
+Sampler readings must hold no lists, as live ones are frozen into tuples.
+Album art is not decoded without GdkPixbuf; its URL is still compared.
+
+Exits with status 1 if any channel delivers a different value.
+
+Usage:
+    python scripts/bench_replay.py [--readings N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from gi.repository import GLib  # noqa: E402
+
+from scripts.bench_cpu_cores import build_fake_root, write_stat  # noqa: E402
+from scripts.bench_io import (  # noqa: E402
+    device_names,
+    interface_names,
+    write_diskstats,
+    write_net_dev,
+)
+from services.cells import core_cells, pack_cells  # noqa: E402
+from services.procfs import CpuCoreReader, IoReader  # noqa: E402
+from services.trace import (  # noqa: E402
+    TraceRecorder,
+    TraceReplayer,
+    encode_value,
+    install_replayer,
+)
+
+OUTPUT = "REPLAY-1"
+CORES = 12
+COLUMNS = 8
+RGB = (0.6, 0.5, 0.8)
+ART = os.path.join(BASE_DIR, "assets", "layouts", "grid.svg")
+
+
+def mango_state(n):
+    return {
+        "tags": 9,
+        "active": [n % 9 + 1],
+        "occupied": sorted({n % 9 + 1, (n * 7) % 9 + 1}),
+        "layout": ("t", "m", "s")[n % 3],
+        "client": {"title": f"kitty {n}", "appid": "kitty"} if n % 4 else None,
+    }
+
+
+def media_state(n):
+    playing = n % 5 != 4
+    return {
+        "player": playing,
+        "status": "Playing" if n % 2 else "Paused",
+        "progress": n / 7,
+        "art": f"file://{ART}" if playing and n % 3 else None,
+    }
+
+
+def record_readings(root, path, readings):
+    """Record `readings` values per channel; return {channel: [value, ...]}."""
+    stat_path = build_fake_root(root, CORES)
+    net_path = os.path.join(root, "proc", "net", "dev")
+    disk_path = os.path.join(root, "proc", "diskstats")
+    os.makedirs(os.path.dirname(net_path))
+    interfaces = interface_names(4)
+    devices = device_names(4)
+    write_net_dev(net_path, interfaces, 1)
+    write_diskstats(disk_path, devices, 1)
+
+    cores = CpuCoreReader(root=root)
+    io = IoReader(root=root)
+    cores.read()
+    io.read()
+
+    recorded = {
+        "sampler:cpu-cores": [],
+        "sampler:io": [],
+        "sampler:gpu": [],
+        f"mango:{OUTPUT}": [],
+        "media": [],
+    }
+    recorder = TraceRecorder(path)
+    for n in range(readings):
+        write_stat(stat_path, CORES, n + 2)
+        write_net_dev(net_path, interfaces, n + 2)
+        write_diskstats(disk_path, devices, n + 2)
+        time.sleep(0.01)
+        values = {
+            "sampler:cpu-cores": cores.read(),
+            "sampler:io": io.read(),
+            "sampler:gpu": {"usage": n * 9 % 100, "vram": 30 + n, "temp": 50 + n},
+            f"mango:{OUTPUT}": mango_state(n),
+            "media": media_state(n),
+        }
+        for channel, value in values.items():
+            recorded[channel].append(value)
+            recorder.record(channel, value)
+    recorder.close()
+    return recorded
+
+
+def deduplicated(values):
+    """The values a replay delivers: the recorder skips exact repeats."""
+    result = []
+    last = None
+    for value in values:
+        payload = encode_value(value)
+        if payload != last:
+            result.append(value)
+        last = payload
+    return result
+
+
+def replay(path):
+    """Replay a trace into the services; return {channel: [received, ...]}."""
+    replayer = install_replayer(TraceReplayer(path, speed=100))
+
+    # Imported after the replayer is installed, like config.py --replay
+    from services.mango import MangoService
+    from services.media import MediaService
+    from services.system import get_sampler
+
+    received = {}
+
+    for name in ("cpu-cores", "io", "gpu"):
+        values = received.setdefault(f"sampler:{name}", [])
+        get_sampler(name).subscribe(values.append)
+
+    mango = MangoService(monitor=OUTPUT)
+    mango_values = received.setdefault(f"mango:{OUTPUT}", [])
+    # apply_state only emits the signals of what changed, and widgets read
+    # the service's attributes; attached after the service, this reads
+    # them back once per delivery
+    replayer.attach(
+        f"mango:{OUTPUT}", lambda value: mango_values.append(mango.snapshot())
+    )
+
+    media = MediaService()
+    media_values = received.setdefault("media", [])
+
+    def on_status_changed(service, status):
+        # The last signal apply_state emits for a delivery
+        media_values.append(service.snapshot())
+
+    media.connect("status-changed", on_status_changed)
+
+    loop = GLib.MainLoop()
+
+    def check_done():
+        if replayer.delivered >= len(replayer.events):
+            loop.quit()
+            return False
+        return True
+
+    GLib.timeout_add(10, check_done)
+    GLib.timeout_add_seconds(30, loop.quit)
+    replayer.start()
+    loop.run()
+    replayer.stop()
+    return received
+
+
+def same(recorded, received):
+    """Compare a recorded value with a replayed one, arrays and tuples as lists."""
+    if hasattr(recorded, "tolist"):
+        recorded = recorded.tolist()
+    if hasattr(received, "tolist"):
+        received = received.tolist()
+    if isinstance(recorded, (list, tuple)):
+        return (
+            isinstance(received, (list, tuple))
+            and len(recorded) == len(received)
+            and all(same(a, b) for a, b in zip(recorded, received))
+        )
+    if isinstance(recorded, dict):
+        return (
+            isinstance(received, dict)
+            and recorded.keys() == received.keys()
+            and all(same(recorded[key], received[key]) for key in recorded)
+        )
+    return recorded == received
+
+
+def mutable(value):
+    """True if a reading holds lists a subscriber could change."""
+    if isinstance(value, list):
+        return True
+    if isinstance(value, tuple):
+        return any(mutable(item) for item in value)
+    if isinstance(value, dict):
+        return any(mutable(item) for item in value.values())
+    return False
+
+
+def same_pixels(recorded, received):
+    """Both (usage, freqs) readings must pack into identical heatmap pixels."""
+    packed = [
+        pack_cells(core_cells(usage, freqs, COLUMNS), RGB, COLUMNS)
+        for usage, freqs in (recorded, received)
+    ]
+    (live, live_rows), (replayed, replayed_rows) = packed
+    return live_rows == replayed_rows and bytes(live) == bytes(replayed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--readings", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as root:
+        path = os.path.join(root, "replay.trace")
+        recorded = record_readings(root, path, args.readings)
+        received = replay(path)
+
+    ok = True
+    for channel, values in recorded.items():
+        expected = deduplicated(values)
+        got = received.get(channel, [])
+        wrong = sum(not same(a, b) for a, b in zip(expected, got))
+        wrong += abs(len(expected) - len(got))
+        line = (
+            f"  {channel:18s}: {len(expected):3d} recorded, "
+            f"{len(got):3d} received, {wrong} different"
+        )
+        if channel.startswith("sampler:"):
+            # Live readings are frozen before subscribers see them
+            lists = sum(mutable(value) for value in got)
+            line += f", {lists} with lists"
+            wrong += lists
+        if channel == "sampler:cpu-cores":
+            pixels = sum(not same_pixels(a, b) for a, b in zip(expected, got))
+            line += f", {pixels} heatmap(s) different"
+            wrong += pixels
+        print(line)
+        ok = ok and wrong == 0
+
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
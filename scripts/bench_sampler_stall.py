@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Measure dropped frames when one data source stalls, inline vs worker pool.
+
+Runs two cheap sources and one that blocks for --stall ms on every other
+read, next to a 60 Hz frame callback standing in for gauge animations.
+With inline polling the stall runs on the main loop and frames are
+missed; with the sampling pool only the stalled source falls behind.
+Reports missed frames, the longest frame gap and readings delivered per
+source for each mode.
+
+Exits with status 1 unless the worker pool keeps frames on time (at most
+MAX_MISSED missed) and still delivers every fast source's readings.
+
+Requires PyGObject (GLib).
+
+Usage:
+    python scripts/bench_sampler_stall.py [--seconds N] [--stall MS]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from gi.repository import GLib  # noqa: E402
+
+from services.sampler import Sampler, get_sampling_pool  # noqa: E402
+
+FRAME_MS = 1000 / 60
+# Interval of every source; shorter than the bar's 1 s to get more samples
+INTERVAL_MS = 250
+# Frames the worker pool may miss to scheduler noise on a loaded machine
+MAX_MISSED = 2
+
+
+def stalling_source(stall_ms):
+    calls = 0
+
+    def read():
+        nonlocal calls
+        calls += 1
+        if calls % 2 == 0:
+            time.sleep(stall_ms / 1000)
+        return calls
+
+    return read
+
+
+def run(seconds, stall_ms, threaded):
+    executor = get_sampling_pool() if threaded else None
+    sources = {
+        "fast-a": lambda: time.monotonic(),
+        "fast-b": lambda: os.getloadavg()[0],
+        "stall": stalling_source(stall_ms),
+    }
+    delivered = dict.fromkeys(sources, 0)
+
+    def counter(name):
+        def count(_):
+            delivered[name] += 1
+
+        return count
+
+    samplers = []
+    for name, read in sources.items():
+        sampler = Sampler(
+            read, interval=INTERVAL_MS, name=name, executor=executor, timeout=250
+        )
+        sampler.subscribe(counter(name))
+        samplers.append(sampler)
+
+    loop = GLib.MainLoop()
+    gaps = []
+    last = time.perf_counter()
+
+    def frame():
+        nonlocal last
+        now = time.perf_counter()
+        gaps.append((now - last) * 1000)
+        last = now
+        return True
+
+    GLib.timeout_add(round(FRAME_MS), frame)
+    GLib.timeout_add(seconds * 1000, loop.quit)
+    loop.run()
+    for sampler in samplers:
+        sampler.stop()
+
+    missed = sum(int(gap // FRAME_MS) - 1 for gap in gaps if gap > 1.5 * FRAME_MS)
+    stalls = sum(sampler.stalls for sampler in samplers)
+    return missed, max(gaps), delivered, stalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seconds", type=int, default=5)
+    parser.add_argument("--stall", type=int, default=500)
+    args = parser.parse_args()
+
+    expected = args.seconds * 1000 // INTERVAL_MS
+    ok = True
+    for threaded in (False, True):
+        missed, longest, delivered, stalls = run(args.seconds, args.stall, threaded)
+        print(f"  {'worker pool' if threaded else 'inline'}:")
+        print(f"    missed frames:  {missed}")
+        print(f"    longest frame:  {longest:.0f} ms")
+        print(f"    stalls logged:  {stalls}")
+        for name, count in delivered.items():
+            print(f"    {name:7s} readings: {count} of ~{expected}")
+        if threaded:
+            fast = min(delivered["fast-a"], delivered["fast-b"])
+            ok = missed <= MAX_MISSED and fast >= expected - 1
+
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
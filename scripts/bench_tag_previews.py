@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Measure tag preview lookups with 9 tags x 20 clients against a fake mmsg.
+
+A fake `mmsg` reporting 20 clients on each of 9 tags is put first on
+PATH. Times the on-hover fetch of per-tag client counts (async mmsg),
+recording 180 focus changes, building every tag's client list, and
+resolving the apps' icons cold and through the LRU cache. None of this
+runs on MangoService's 1 s poll; the fetch only happens on hover after
+the tags changed.
+
+A hung mmsg must not leave a hover fetch pending forever: with the fake
+mmsg stalling, the fetch must report None once MMSG_TIMEOUT (shortened to
+1 s) has killed it, and the next fetch must succeed. The script exits
+with status 1 otherwise.
+
+Requires PyGObject (GLib/Gio). The icon lookups need GTK and are skipped
+without it.
+
+Usage:
+    python scripts/bench_tag_previews.py [--hovers N]
+"""
+
+import argparse
+import os
+import stat
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+TAGS = 9
+CLIENTS = 20
+
+# Seconds the fake mmsg stalls when MANGOBAR_BENCH_HANG is set
+HANG_SECONDS = 60
+HANG_TIMEOUT = 1
+
+FAKE_MMSG = """#!{python}
+import os
+import sys
+import time
+args = sys.argv[1:]
+if os.environ.get("MANGOBAR_BENCH_HANG"):
+    time.sleep({hang})
+if "-o" in args:
+    i = args.index("-o")
+    del args[i : i + 2]
+if args == ["-T"]:
+    print({tags})
+elif args == ["-g", "-t"]:
+    for tag in range(1, {tags} + 1):
+        print(f"FAKE-1 tag {{tag}} {{int(tag == 1)}} {clients} {{int(tag == 1)}}")
+    print("FAKE-1 tags 111111111 000000001 000000000")
+elif args == ["-g", "-l"]:
+    print("t")
+elif args == ["-g", "-c"]:
+    print("bench fake")
+"""
+
+
+def install_fake_mmsg(directory):
+    path = os.path.join(directory, "mmsg")
+    with open(path, "w") as f:
+        f.write(
+            FAKE_MMSG.format(
+                python=sys.executable, tags=TAGS, clients=CLIENTS, hang=HANG_SECONDS
+            )
+        )
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    os.environ["PATH"] = directory + os.pathsep + os.environ["PATH"]
+
+
+def bench_fetch(service, hovers):
+    from gi.repository import GLib
+
+    loop = GLib.MainLoop()
+    results = []
+
+    def fetch():
+        start = time.perf_counter()
+
+        def done(counts):
+            results.append((time.perf_counter() - start, counts))
+            if len(results) < hovers:
+                fetch()
+            else:
+                loop.quit()
+
+        service.fetch_tag_clients(done)
+
+    fetch()
+    loop.run()
+    mean = sum(elapsed for elapsed, _ in results) / len(results)
+    return mean, results[-1][1]
+
+
+def fetch_once(service):
+    from gi.repository import GLib
+
+    loop = GLib.MainLoop()
+    results = []
+
+    def done(counts):
+        results.append(counts)
+        loop.quit()
+
+    # Give up well before the fake mmsg would finish on its own
+    timeout = GLib.timeout_add_seconds(HANG_SECONDS // 2, loop.quit)
+    start = time.perf_counter()
+    service.fetch_tag_clients(done)
+    loop.run()
+    if results:
+        GLib.source_remove(timeout)
+    return time.perf_counter() - start, results
+
+
+def check_hung(service):
+    import services.mango
+
+    timeout = services.mango.MMSG_TIMEOUT
+    services.mango.MMSG_TIMEOUT = HANG_TIMEOUT
+    os.environ["MANGOBAR_BENCH_HANG"] = "1"
+    try:
+        hung_seconds, hung = fetch_once(service)
+    finally:
+        del os.environ["MANGOBAR_BENCH_HANG"]
+        services.mango.MMSG_TIMEOUT = timeout
+    _, after = fetch_once(service)
+
+    answered = hung == [None]
+    recovered = bool(after and after[0])
+    print(
+        f"  hung mmsg: callback {'ran' if hung else 'never ran'} after "
+        f"{hung_seconds:.1f} s with {hung[0] if hung else '-'} "
+        f"(timeout {HANG_TIMEOUT} s); next fetch "
+        f"{'ok' if recovered else 'failed'}"
+    )
+    return answered and hung_seconds < HANG_TIMEOUT + 2 and recovered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--hovers", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mangobar_bench_") as directory:
+        install_fake_mmsg(directory)
+
+        from services.mango import MangoService, TagClients
+
+        service = MangoService(monitor="FAKE-1")
+        service.stop()  # previews never touch the poll
+
+        fetch_seconds, counts = bench_fetch(service, args.hovers)
+
+        clients = TagClients()
+        start = time.perf_counter()
+        for tag in range(1, TAGS + 1):
+            for client in range(CLIENTS):
+                app_id = f"org.bench.App{tag}x{client}"
+                clients.note_focus([tag], {"appid": app_id, "title": app_id})
+        focus_seconds = (time.perf_counter() - start) / (TAGS * CLIENTS)
+
+        clients.set_counts(counts)
+        start = time.perf_counter()
+        lists = [clients.clients(tag) for tag in range(1, TAGS + 1)]
+        lookup_seconds = (time.perf_counter() - start) / TAGS
+
+        print(f"  fake mmsg: {TAGS} tags x {CLIENTS} clients")
+        print(f"  hover fetch (async mmsg): {fetch_seconds * 1e3:7.2f} ms")
+        print(f"  counts parsed:            {sum((counts or {}).values())} clients")
+        print(f"  record focus change:      {focus_seconds * 1e6:7.2f} us")
+        print(f"  client list per tag:      {lookup_seconds * 1e6:7.2f} us")
+
+        app_ids = [app_id for _, apps in lists for app_id, _ in apps]
+        try:
+            from services.icons import resolve_app_icon
+        except (ImportError, ValueError) as e:
+            print(f"  icons: skipped, GTK unavailable ({e})")
+        else:
+            resolve_app_icon.cache_clear()
+            start = time.perf_counter()
+            for app_id in app_ids:
+                resolve_app_icon(app_id)
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            for app_id in app_ids:
+                resolve_app_icon(app_id)
+            warm = time.perf_counter() - start
+            print(
+                f"  icons for {len(app_ids)} apps:     {cold * 1e3:7.2f} ms cold, "
+                f"{warm * 1e3:.3f} ms cached "
+                f"({resolve_app_icon.cache_info().hits} hits)"
+            )
+
+        ok = check_hung(service)
+
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Time theme switches with one full stylesheet vs the structural + palette layers.
+
+Builds an offscreen window with the bar's named widgets (gauges, tags,
+labels) repeated for several bars, then cycles through every theme many
+times in each mode:
+
+    full     style.css and the palette concatenated into one provider and
+             reloaded on every switch, as with the old self-contained themes
+    layered  style.css loaded once; only the palette provider is reloaded
+
+Reports CSS bytes parsed, time per switch (load plus the style pass GTK
+runs before the next frame) and style-updated emissions per switch.
+
+Two checks follow, and the script exits with status 1 if either fails:
+
+palettes  Every named color style.css refers to must resolve in every
+          palette, so any switch replaces all of them. Needs no GTK.
+reach     In layered mode, after a switch to each theme, the widgets built
+          before the switch must report the same color, background and
+          border as widgets built after it.
+
+Timing and the reach check need GTK 3 and are skipped without it.
+
+Usage:
+    python scripts/bench_theme_switch.py [--bars N] [--switches N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import gi  # noqa: E402
+
+from services.assets import (  # noqa: E402
+    CSS_COMMENT,
+    DEFINE_COLOR,
+    AssetStore,
+    list_sources,
+    parse_palette,
+)
+
+try:
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gdk, Gtk
+except (ImportError, ValueError) as e:
+    Gtk = None
+    GTK_ERROR = e
+
+# Widget names styled by style.css, one of each per bar
+NAMED_WIDGETS = (
+    "bar-inner",
+    "cpu-progress-bar",
+    "ram-progress-bar",
+    "gpu-progress-bar",
+    "vram-progress-bar",
+    "volume-progress-bar",
+    "media-progress-bar",
+    "net-rx-progress-bar",
+    "net-tx-progress-bar",
+    "cpu-sparkline",
+    "cpu-cores-heatmap",
+    "layout-image",
+    "theme-switcher-image",
+    "window-title",
+    "temp",
+)
+TAGS = 9
+# Style properties compared by the reach check
+STYLE_PROPERTIES = ("color", "background-color", "border-color")
+COLOR_REFERENCE = re.compile(r"@([\w-]+)")
+
+
+def build_window(bars):
+    window = Gtk.OffscreenWindow()
+    column = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+    window.add(column)
+    widgets = []
+    for _ in range(bars):
+        row = Gtk.Box()
+        for name in NAMED_WIDGETS:
+            label = Gtk.Label(label=name[:3])
+            label.set_name(name)
+            row.add(label)
+            widgets.append(label)
+        for tag in range(TAGS):
+            button = Gtk.Button(label=str(tag + 1))
+            button.set_name("workspace-button")
+            if tag % 3 == 0:
+                button.get_style_context().add_class("occupied")
+            row.add(button)
+            widgets.append(button)
+        column.add(row)
+    window.show_all()
+    return window, widgets
+
+
+def settle():
+    while Gtk.events_pending():
+        Gtk.main_iteration_do(False)
+
+
+def run(mode, bars, switches, assets, themes):
+    window, widgets = build_window(bars)
+    updates = 0
+
+    def count(*_):
+        nonlocal updates
+        updates += 1
+
+    for widget in widgets:
+        widget.connect("style-updated", count)
+
+    screen = Gdk.Screen.get_default()
+    base = assets.base_css()
+    palettes = [assets.theme_css(name) for name in themes]
+    provider = Gtk.CssProvider()
+    Gtk.StyleContext.add_provider_for_screen(
+        screen, provider, Gtk.STYLE_PROVIDER_PRIORITY_USER + 1
+    )
+    base_provider = None
+    if mode == "layered":
+        base_provider = Gtk.CssProvider()
+        base_provider.load_from_data(base.encode())
+        Gtk.StyleContext.add_provider_for_screen(
+            screen, base_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER
+        )
+
+    def load(palette):
+        data = palette if mode == "layered" else base + palette
+        provider.load_from_data(data.encode())
+        return len(data)
+
+    load(palettes[0])
+    settle()
+    updates = 0
+    parsed = 0
+    start = time.perf_counter()
+    for i in range(switches):
+        parsed += load(palettes[(i + 1) % len(palettes)])
+        # Force the style pass a frame would run
+        for widget in widgets:
+            widget.get_style_context().get_color(Gtk.StateFlags.NORMAL)
+        settle()
+    elapsed = time.perf_counter() - start
+
+    Gtk.StyleContext.remove_provider_for_screen(screen, provider)
+    if base_provider is not None:
+        Gtk.StyleContext.remove_provider_for_screen(screen, base_provider)
+    window.destroy()
+    return elapsed / switches, parsed / switches, updates / switches, len(widgets)
+
+
+def check_palettes(assets, themes):
+    base = DEFINE_COLOR.sub("", CSS_COMMENT.sub("", assets.base_css()))
+    used = set(COLOR_REFERENCE.findall(base))
+    ok = True
+    for name in themes:
+        colors = parse_palette(assets.theme_css(name))
+        # A resolved value still naming a color (e.g. inside shade()) needs
+        # that color defined too
+        missing = sorted(
+            color
+            for color in used
+            if color not in colors
+            or any(
+                ref not in colors for ref in COLOR_REFERENCE.findall(colors[color])
+            )
+        )
+        print(
+            f"  palettes: {name:20s} {len(used) - len(missing)}/{len(used)} "
+            f"colors used by style.css resolve"
+            + (f", missing {', '.join(missing)}" if missing else "")
+        )
+        ok = ok and not missing
+    return ok
+
+
+def style_of(widget):
+    context = widget.get_style_context()
+    return tuple(
+        context.get_property(name, Gtk.StateFlags.NORMAL).to_string()
+        for name in STYLE_PROPERTIES
+    )
+
+
+def check_reach(bars, assets, themes):
+    window, widgets = build_window(bars)
+    screen = Gdk.Screen.get_default()
+    base_provider = Gtk.CssProvider()
+    base_provider.load_from_data(assets.base_css().encode())
+    provider = Gtk.CssProvider()
+    for layer, priority in (
+        (base_provider, Gtk.STYLE_PROVIDER_PRIORITY_USER),
+        (provider, Gtk.STYLE_PROVIDER_PRIORITY_USER + 1),
+    ):
+        Gtk.StyleContext.add_provider_for_screen(screen, layer, priority)
+
+    stale = 0
+    for name in themes[1:] + themes[:1]:
+        provider.load_from_data(assets.theme_css(name).encode())
+        settle()
+        fresh_window, fresh = build_window(bars)
+        settle()
+        stale += sum(
+            style_of(old) != style_of(new) for old, new in zip(widgets, fresh)
+        )
+        fresh_window.destroy()
+
+    Gtk.StyleContext.remove_provider_for_screen(screen, provider)
+    Gtk.StyleContext.remove_provider_for_screen(screen, base_provider)
+    window.destroy()
+    print(
+        f"  reach:    {len(themes)} switches x {len(widgets)} widgets, "
+        f"{stale} styled differently from widgets built after the switch"
+    )
+    return stale == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--bars", type=int, default=3)
+    parser.add_argument("--switches", type=int, default=50)
+    args = parser.parse_args()
+
+    assets = AssetStore(use_bundle=False)
+    themes, _ = list_sources()
+    ok = check_palettes(assets, themes)
+
+    if Gtk is None:
+        print(f"  timing and reach: skipped, GTK unavailable ({GTK_ERROR})")
+    else:
+        for mode in ("full", "layered"):
+            seconds, parsed, updates, count = run(
+                mode, args.bars, args.switches, assets, themes
+            )
+            print(
+                f"  {mode:8s}: {seconds * 1e3:6.2f} ms/switch, "
+                f"{parsed / 1024:5.1f} KiB CSS parsed, "
+                f"{updates:5.0f} style-updated of {count} widgets"
+            )
+        ok = check_reach(args.bars, assets, themes) and ok
+
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Check volume-scroll coalescing and speaker handlers against a fake Audio.
+
+burst     Each frame gets a burst of wheel and smooth-scroll events; the
+          fake speaker counts volume writes, which must be at most one
+          per frame. The fake server confirms each write a few ms later.
+switches  The default speaker is replaced N times; across all speakers
+          exactly one notify::volume handler must remain connected.
+
+Exits with status 1 if either check fails. Requires PyGObject (GLib).
+
+Usage:
+    python scripts/bench_volume.py [--frames N] [--events N] [--switches N]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from gi.repository import GLib, GObject  # noqa: E402
+
+from services.volume import VolumeControl  # noqa: E402
+
+# Delay before the fake server reports a written volume back
+SERVER_DELAY_MS = 3
+
+
+class FakeSpeaker(GObject.Object):
+    """Counts volume writes and connected handlers."""
+
+    def __init__(self, volume=50.0):
+        super().__init__()
+        self._volume = volume
+        self.writes = 0
+        self.handlers = 0
+
+    @GObject.Property(type=float)
+    def volume(self):
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self.writes += 1
+        # The server applies the value and reports it back asynchronously
+        GLib.timeout_add(SERVER_DELAY_MS, self.confirm, value)
+
+    def confirm(self, value):
+        self._volume = value
+        self.notify("volume")
+        return False
+
+    def connect(self, *args):
+        self.handlers += 1
+        return super().connect(*args)
+
+    def disconnect(self, handler_id):
+        self.handlers -= 1
+        super().disconnect(handler_id)
+
+
+class FakeAudio(GObject.Object):
+    speaker = GObject.Property(type=object)
+
+
+class FakeFrames:
+    """Stands in for the frame clock: callbacks run on the next frame."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def add(self, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(None, None)
+
+
+def run_loop(ms):
+    loop = GLib.MainLoop()
+    GLib.timeout_add(ms, loop.quit)
+    loop.run()
+
+
+def check_burst(frames, events):
+    audio = FakeAudio()
+    audio.speaker = FakeSpeaker()
+    clock = FakeFrames()
+    shown = []
+    control = VolumeControl(audio, clock.add, shown.append)
+    control.on_speaker_changed()
+
+    rng = random.Random(1)
+    for _ in range(frames):
+        for _ in range(events):
+            if rng.random() < 0.5:
+                control.scroll(rng.choice((1, -1)))
+            else:
+                control.scroll(rng.uniform(-0.3, 0.3))
+        clock.run()
+        # Let the server confirm before the next frame, 60 Hz apart
+        run_loop(16)
+
+    writes = audio.speaker.writes
+    print(
+        f"  burst:    {frames} frames x {events} events -> {writes} writes "
+        f"(final volume {audio.speaker.volume:.1f}, shown {shown[-1]:.1f})"
+    )
+    control.destroy()
+    return writes <= frames
+
+
+def check_switches(switches):
+    audio = FakeAudio()
+    speakers = []
+    control = VolumeControl(audio, lambda callback: None, lambda _: None)
+    audio.connect("notify::speaker", control.on_speaker_changed)
+    for i in range(switches):
+        speaker = FakeSpeaker(volume=i % 100)
+        speakers.append(speaker)
+        audio.speaker = speaker
+
+    handlers = sum(speaker.handlers for speaker in speakers)
+    print(f"  switches: {switches} speaker changes -> {handlers} volume handler(s)")
+    control.destroy()
+    remaining = sum(speaker.handlers for speaker in speakers)
+    print(f"            after destroy -> {remaining}")
+    return handlers == 1 and remaining == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--switches", type=int, default=100)
+    args = parser.parse_args()
+
+    ok = check_burst(args.frames, args.events)
+    ok = check_switches(args.switches) and ok
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Drive the focused-window title widget with a fast fake client stream.
+
+A fake Mango service emits `client-changed` at a fixed rate (100/s by
+default) cycling through a handful of apps whose titles change every
+event, like a busy terminal or a loading browser tab.
+
+throttle  Feeds the stream through the widget's Throttle under a GLib main
+          loop, without GTK. The number of updates must stay within one
+          per interval (plus the leading call), and the last title sent
+          must be the last one delivered.
+widget    Shows the widget in an offscreen window and reports how many
+          events arrived, how many widget updates were applied, how many
+          size-allocate passes (relayouts) the widget went through, icon
+          cache hits/misses and the time spent in the update path. The
+          rotated title must not widen the widget past its width with a
+          short title. Needs the GTK/Fabric stack; skipped otherwise.
+
+Exits with status 1 if a check fails.
+
+Usage:
+    python scripts/bench_window_title.py [--rate N] [--seconds N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import gi  # noqa: E402
+
+from gi.repository import GLib, GObject  # noqa: E402
+
+from services.sampler import Throttle  # noqa: E402
+
+try:
+    gi.require_version("Gtk", "3.0")
+    from gi.repository import Gtk
+
+    from modules.window_title import TITLE_THROTTLE_MS, WindowTitle
+    from services.icons import resolve_app_icon
+except (ImportError, ValueError) as e:
+    Gtk = None
+    GTK_ERROR = e
+    TITLE_THROTTLE_MS = 250  # modules.window_title needs GTK to import
+
+APPS = ("firefox", "kitty", "org.gnome.Nautilus", "code", "spotify")
+
+
+class FakeMangoService(GObject.Object):
+    __gsignals__ = {
+        "client-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.monitor = "FAKE-1"
+        self.focused_client = None
+
+
+def client(n):
+    app = APPS[(n // 50) % len(APPS)]
+    return {"title": f"{app} - a long, busy title that keeps changing {n}", "appid": app}
+
+
+def run_stream(service, rate, seconds):
+    """Emit `rate * seconds` client changes, then let the trailing update land."""
+    total = int(rate * seconds)
+    sent = []
+    loop = GLib.MainLoop()
+
+    def emit():
+        if len(sent) >= total:
+            GLib.timeout_add(2 * TITLE_THROTTLE_MS, loop.quit)
+            return False
+        service.focused_client = client(len(sent))
+        sent.append(service.focused_client)
+        service.emit("client-changed")
+        return True
+
+    GLib.timeout_add(max(1, 1000 // rate), emit)
+    loop.run()
+    return sent
+
+
+def check_throttle(rate, seconds):
+    service = FakeMangoService()
+    delivered = []
+    throttle = Throttle(delivered.append, TITLE_THROTTLE_MS)
+    service.connect("client-changed", lambda service: throttle(service.focused_client))
+
+    start = time.monotonic()
+    sent = run_stream(service, rate, seconds)
+    elapsed = time.monotonic() - start
+    throttle.cancel()
+
+    limit = int(elapsed * 1000 / TITLE_THROTTLE_MS) + 1
+    ok = throttle.calls <= limit and delivered[-1] is sent[-1]
+    print(
+        f"  throttle: {len(sent)} events -> {throttle.calls} updates "
+        f"(limit {limit}), last title delivered: {delivered[-1] is sent[-1]}"
+    )
+    return ok
+
+
+def check_widget(rate, seconds):
+    service = FakeMangoService()
+    service.focused_client = {"title": "a", "appid": APPS[0]}
+    widget = WindowTitle(service=service)
+    window = Gtk.OffscreenWindow()
+    window.add(widget)
+    window.show_all()
+    while Gtk.events_pending():
+        Gtk.main_iteration()
+    short_width = widget.get_allocated_width()
+
+    stats = {"allocations": 0, "max_width": 0, "update_time": 0.0}
+
+    def on_size_allocate(widget, allocation):
+        stats["allocations"] += 1
+        stats["max_width"] = max(stats["max_width"], allocation.width)
+
+    widget.connect("size-allocate", on_size_allocate)
+
+    original_update = widget.update_client
+
+    def timed_update(client):
+        start = time.perf_counter()
+        original_update(client)
+        stats["update_time"] += time.perf_counter() - start
+
+    widget.throttle.callback = timed_update
+
+    sent = run_stream(service, rate, seconds)
+    window.destroy()
+
+    updates = widget.throttle.calls
+    cache = resolve_app_icon.cache_info()
+    print(f"  widget: events          {len(sent)}")
+    print(f"          widget updates  {updates}")
+    print(f"          size-allocate   {stats['allocations']}")
+    print(
+        f"          width           {short_width} px short title, "
+        f"{stats['max_width']} px max"
+    )
+    print(f"          icon cache      {cache.hits} hits, {cache.misses} misses")
+    print(
+        f"          update path     {stats['update_time'] * 1000:.1f} ms total, "
+        f"{stats['update_time'] / max(1, updates) * 1e6:.0f} us/update"
+    )
+    return stats["max_width"] <= short_width
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rate", type=int, default=100, help="events per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    ok = check_throttle(args.rate, args.seconds)
+
+    if Gtk is None:
+        print(f"  widget: skipped, GTK unavailable ({GTK_ERROR})")
+    else:
+        ok = check_widget(args.rate, args.seconds) and ok
+
+    print("  PASS" if ok else "  FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Build the compiled GResource bundle of styles and recolored icons.
+
+The bar checks the bundle at startup and rebuilds it whenever style.css,
+a palette or an icon template has changed, so running this by hand is
+only needed to build ahead of time or to check the bundle. Icons are
+recolored by replacing `currentColor` in the templates under assets/
+with each palette's accent_color; the templates themselves are never
+modified.
+
+Requires PyGObject and glib-compile-resources.
+
+Usage:
+    python scripts/build_assets.py [--check] [--output PATH]
+"""
+
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.assets import (  # noqa: E402
+    BUNDLE_PATH,
+    build_bundle,
+    list_sources,
+    open_bundle,
+    source_stamp,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--output", default=BUNDLE_PATH)
+    parser.add_argument(
+        "--check", action="store_true", help="only report whether it is stale"
+    )
+    args = parser.parse_args()
+
+    stamp = source_stamp()
+    _, bundled = open_bundle(args.output)
+    if args.check:
+        state = "missing" if bundled is None else "stale"
+        print(f"{args.output}: {'up to date' if bundled == stamp else state}")
+        return 0 if bundled == stamp else 1
+
+    if not build_bundle(args.output, stamp=stamp):
+        return 1
+    themes, icons = list_sources()
+    print(
+        f"Built {args.output}: {len(themes)} themes, "
+        f"{len(icons)} icons x {len(themes) + 1} accents, "
+        f"{os.path.getsize(args.output)} bytes"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
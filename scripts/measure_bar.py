@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measure RSS and CPU usage of running MangoBar processes.
+
+Usage:
+    python scripts/measure_bar.py [--duration SECONDS] <pid> [<pid> ...]
+
+Examples:
+    # One process driving a bar on every monitor
+    python config.py &
+    python scripts/measure_bar.py $!
+
+    # One process per monitor (the old multi-monitor setup)
+    python config.py --monitor 0 & P0=$!
+    python config.py --monitor 1 & P1=$!
+    python scripts/measure_bar.py $P0 $P1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def read_cpu_ticks(pid):
+    """Return utime + stime of a process in clock ticks."""
+    with open(f"/proc/{pid}/stat", "r") as f:
+        # The command name may contain spaces, so split after its closing paren
+        fields = f.read().rsplit(")", 1)[1].split()
+    return int(fields[11]) + int(fields[12])
+
+
+def read_rss_kb(pid):
+    """Return the resident set size of a process in KiB."""
+    with open(f"/proc/{pid}/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def measure(pids, duration):
+    start_ticks = {pid: read_cpu_ticks(pid) for pid in pids}
+    start = time.monotonic()
+    time.sleep(duration)
+    elapsed = time.monotonic() - start
+
+    results = {}
+    for pid in pids:
+        ticks = read_cpu_ticks(pid) - start_ticks[pid]
+        cpu_percent = ticks / CLOCK_TICKS / elapsed * 100
+        results[pid] = (read_rss_kb(pid), cpu_percent)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("pids", nargs="+", type=int)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    try:
+        results = measure(args.pids, args.duration)
+    except FileNotFoundError as e:
+        print(f"Error: process vanished while measuring: {e}")
+        sys.exit(1)
+
+    total_rss = 0
+    total_cpu = 0.0
+    for pid, (rss_kb, cpu_percent) in results.items():
+        print(f"  pid {pid}: {rss_kb / 1024:.1f} MiB RSS, {cpu_percent:.2f}% CPU")
+        total_rss += rss_kb
+        total_cpu += cpu_percent
+
+    print(f"\nTotal over {args.duration:.0f}s:")
+    print(f"  {total_rss / 1024:.1f} MiB RSS, {total_cpu:.2f}% CPU")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Summarize a trace recorded with `config.py --record`.
+
+Prints the duration, size and per-channel event counts and rates, which
+is enough to tell what a captured incident contains before replaying it
+with `config.py --replay TRACE --speed N`.
+
+Requires PyGObject (GLib).
+
+Usage:
+    python scripts/trace_info.py TRACE
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from services.trace import read_trace  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("trace")
+    args = parser.parse_args()
+
+    counts = Counter()
+    duration_us = 0
+    for elapsed_us, channel, _ in read_trace(args.trace):
+        counts[channel] += 1
+        duration_us = elapsed_us
+
+    duration = max(duration_us / 1e6, 1e-6)
+    size = os.path.getsize(args.trace)
+    events = sum(counts.values())
+    print(f"  duration: {duration:.1f} s")
+    print(f"  size:     {size} bytes ({size / duration * 60 / 1024:.1f} KiB/min)")
+    print(f"  events:   {events} ({events / duration:.1f}/s)")
+    for channel, count in sorted(counts.items()):
+        print(f"    {channel:24s} {count:8d}  {count / duration:6.2f}/s")
+
+
+if __name__ == "__main__":
+    main()
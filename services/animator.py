@@ -3,8 +3,16 @@ from typing import cast
 from fabric import Service, Signal, Property
 from gi.repository import GLib, Gtk
 
+from services.motion import FrameLimiter
+
 
 class Animator(Service):
+    # Animations with a tick source attached, i.e. drawing frames right now;
+    # idle-time work such as garbage collection waits for this to drop to
+    # zero. A playing animation on an unrealized widget has no tick callback
+    # and is not counted until the widget is realized.
+    running = 0
+
     @Signal
     def finished(self) -> None:
         ...
@@ -71,6 +79,7 @@ class Animator(Service):
         max_value: float = 1.0,
         repeat: bool = False,
         tick_widget: Gtk.Widget | None = None,
+        max_fps: int = 0,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -93,6 +102,15 @@ class Animator(Service):
         self._tick_handler = None
         self._timeline_pos = 0
         self._tick_widget = tick_widget
+        # Frame clocks tick at the monitor's refresh rate; skip ticks past the cap
+        self._limiter = FrameLimiter(max_fps) if max_fps else None
+
+        if tick_widget is not None:
+            # Tick callbacks only run on realized widgets; follow the widget so
+            # `running` never counts an animation that cannot tick
+            tick_widget.connect("realize", self.do_on_realize)
+            tick_widget.connect("unrealize", self.do_on_unrealize)
+            tick_widget.connect("destroy", self.do_on_destroy)
 
     def do_get_time_now(self):
         return GLib.get_monotonic_time() / 1_000_000
@@ -137,33 +155,55 @@ class Animator(Service):
 
     def do_handle_tick(self, *_):
         current_time = self.do_get_time_now()
+        if self._limiter is not None and not self._limiter.ready(current_time):
+            return True
         self.do_update_value(current_time)
         return True
 
+    def do_add_tick_handler(self):
+        if self._tick_handler:
+            return
+        if self._tick_widget is None:
+            self._tick_handler = GLib.timeout_add(16, self.do_handle_tick)
+        elif self._tick_widget.get_realized():
+            self._tick_handler = self._tick_widget.add_tick_callback(
+                self.do_handle_tick
+            )
+        else:
+            return  # attached once the widget is realized
+        Animator.running += 1
+
     def do_remove_tick_handlers(self):
         if self._tick_handler:
             if self._tick_widget:
                 self._tick_widget.remove_tick_callback(self._tick_handler)
             else:
                 GLib.source_remove(self._tick_handler)
+            Animator.running -= 1
         self._tick_handler = None
         return
 
+    def do_on_realize(self, *_):
+        if self.playing:
+            self.do_add_tick_handler()
+
+    def do_on_unrealize(self, *_):
+        self.do_remove_tick_handlers()
+
+    def do_on_destroy(self, *_):
+        self.playing = False
+        self.do_remove_tick_handlers()
+
     def play(self):
         if self.playing:
             return
 
         self._start_time = self.do_get_time_now()
-
-        if not self._tick_handler:
-            if self._tick_widget:
-                self._tick_handler = self._tick_widget.add_tick_callback(
-                    self.do_handle_tick
-                )
-            else:
-                self._tick_handler = GLib.timeout_add(16, self.do_handle_tick)
+        if self._limiter is not None:
+            self._limiter.reset()
 
         self.playing = True
+        self.do_add_tick_handler()
         return
 
     def pause(self):
@@ -171,8 +211,8 @@ class Animator(Service):
         return self.do_remove_tick_handlers()
 
     def stop(self):
+        self.playing = False
         if not self._tick_handler:
             self._timeline_pos = 0
-            self.playing = False
             return
-        return self.do_remove_tick_handlers()
\ No newline at end of file
+        return self.do_remove_tick_handlers()
@@ -0,0 +1,42 @@
+# Gauge geometry, kept free of GTK and cairo so the redraw area can be
+# checked headlessly.
+
+import math
+
+# Arcs start at 12 o'clock and run clockwise
+START_ANGLE = -math.pi / 2
+
+
+def value_angle(value):
+    """Angle where a gauge arc ending at `value` (0..1) stops."""
+    # Overshooting bezier curves may briefly leave the 0..1 range
+    return START_ANGLE + 2 * math.pi * min(max(value, 0.0), 1.0)
+
+
+def arc_bounds(cx, cy, radius, start, end):
+    """Bounding box (x, y, width, height) of the arc between two angles."""
+    if end < start:
+        start, end = end, start
+    angles = [start, end]
+    # Include every axis extreme the arc sweeps past
+    quarter = math.ceil(start / (math.pi / 2)) * (math.pi / 2)
+    while quarter < end:
+        angles.append(quarter)
+        quarter += math.pi / 2
+
+    xs = [cx + radius * math.cos(a) for a in angles]
+    ys = [cy + radius * math.sin(a) for a in angles]
+    return min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)
+
+
+def redraw_area(cx, cy, radius, line_width, old, new):
+    """Whole-pixel (x, y, width, height) to redraw when a value changes.
+
+    Covers the stroke between the two values' angles, with round caps and
+    a pixel of antialiasing on every side.
+    """
+    x, y, w, h = arc_bounds(cx, cy, radius, value_angle(old), value_angle(new))
+    pad = line_width / 2 + 1
+    left, top = math.floor(x - pad), math.floor(y - pad)
+    right, bottom = math.ceil(x + w + pad), math.ceil(y + h + pad)
+    return left, top, right - left, bottom - top
@@ -0,0 +1,136 @@
+import hashlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Bits kept per channel when bucketing colors: 4 gives 4096 buckets
+QUANT_BITS = 4
+BUCKETS = 1 << (3 * QUANT_BITS)
+# Buckets darker than this (max channel / 255) never win: shadows, black bars
+MIN_VALUE = 0.2
+# Near-white buckets with less saturation than this never win either
+WHITE_VALUE = 0.92
+WHITE_SATURATION = 0.12
+# A bucket's score is count * (VIBRANCE_FLOOR + saturation), so a large
+# muted area can still beat a few saturated pixels
+VIBRANCE_FLOOR = 0.25
+# Pixels with less alpha than this are ignored
+MIN_ALPHA = 128
+
+
+def art_key(url):
+    """Cache key for a piece of album art."""
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def to_hex(rgb):
+    return "#{:02x}{:02x}{:02x}".format(*(int(round(c)) for c in rgb))
+
+
+def _eligible(r, g, b):
+    high = max(r, g, b)
+    value = high / 255
+    saturation = (high - min(r, g, b)) / high if high else 0.0
+    if value < MIN_VALUE:
+        return False, saturation
+    if value > WHITE_VALUE and saturation < WHITE_SATURATION:
+        return False, saturation
+    return True, saturation
+
+
+def dominant_color(pixels, width, height, rowstride, channels=3):
+    """Return the most vibrant common color of an RGB(A) buffer as "#rrggbb".
+
+    `pixels` is a GdkPixbuf-style buffer (rows `rowstride` bytes apart), so
+    pass an already downsampled image: the cost is linear in pixels.
+    Colors are bucketed to QUANT_BITS per channel and each bucket scored by
+    size and saturation; the winner's mean color is returned. Returns None
+    for an empty or fully transparent image.
+    """
+    if not width or not height:
+        return None
+    if np is not None:
+        return _dominant_numpy(pixels, width, height, rowstride, channels)
+    return _dominant_python(pixels, width, height, rowstride, channels)
+
+
+def _dominant_numpy(pixels, width, height, rowstride, channels):
+    buffer = np.frombuffer(pixels, dtype=np.uint8)
+    # The last row may be shorter than rowstride
+    rows = np.lib.stride_tricks.as_strided(
+        buffer, shape=(height, width, channels), strides=(rowstride, channels, 1)
+    )
+    if channels == 4:
+        rgb = rows[rows[:, :, 3] >= MIN_ALPHA][:, :3]
+    else:
+        rgb = rows[:, :, :3].reshape(-1, 3)
+    if not len(rgb):
+        return None
+
+    shift = 8 - QUANT_BITS
+    quantized = (rgb >> shift).astype(np.intp)
+    buckets = (
+        quantized[:, 0] << (2 * QUANT_BITS) | quantized[:, 1] << QUANT_BITS
+    ) | quantized[:, 2]
+    counts = np.bincount(buckets, minlength=BUCKETS)
+    occupied = np.flatnonzero(counts)
+    counts = counts[occupied]
+    means = np.stack(
+        [
+            np.bincount(buckets, weights=rgb[:, c], minlength=BUCKETS)[occupied]
+            for c in range(3)
+        ],
+        axis=1,
+    ) / counts[:, None]
+
+    high = means.max(axis=1)
+    value = high / 255
+    saturation = np.divide(
+        high - means.min(axis=1), high, out=np.zeros_like(high), where=high > 0
+    )
+    eligible = (value >= MIN_VALUE) & ~(
+        (value > WHITE_VALUE) & (saturation < WHITE_SATURATION)
+    )
+    if not eligible.any():
+        return to_hex(means[np.argmax(counts)])
+    scores = np.where(eligible, counts * (VIBRANCE_FLOOR + saturation), -1.0)
+    return to_hex(means[np.argmax(scores)])
+
+
+def _dominant_python(pixels, width, height, rowstride, channels):
+    shift = 8 - QUANT_BITS
+    # bucket -> [count, red sum, green sum, blue sum]
+    buckets = {}
+    for y in range(height):
+        row = y * rowstride
+        for offset in range(row, row + width * channels, channels):
+            if channels == 4 and pixels[offset + 3] < MIN_ALPHA:
+                continue
+            r, g, b = pixels[offset], pixels[offset + 1], pixels[offset + 2]
+            key = (r >> shift) << (2 * QUANT_BITS) | (g >> shift) << QUANT_BITS
+            key |= b >> shift
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [1, r, g, b]
+            else:
+                bucket[0] += 1
+                bucket[1] += r
+                bucket[2] += g
+                bucket[3] += b
+    if not buckets:
+        return None
+
+    best = None
+    best_score = -1.0
+    largest = None
+    for count, r, g, b in buckets.values():
+        mean = (r / count, g / count, b / count)
+        if largest is None or count > largest[0]:
+            largest = (count, mean)
+        eligible, saturation = _eligible(*mean)
+        if eligible and count * (VIBRANCE_FLOOR + saturation) > best_score:
+            best_score = count * (VIBRANCE_FLOOR + saturation)
+            best = mean
+    return to_hex(best if best is not None else largest[1])
@@ -0,0 +1,293 @@
+import atexit
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+import gi
+
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio, GLib
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+THEMES_DIR = os.path.join(BASE_DIR, "themes")
+# Structural stylesheet shared by every theme; themes only hold palettes
+STYLE_PATH = os.path.join(BASE_DIR, "style.css")
+ASSETS_DIR = os.path.join(BASE_DIR, "assets")
+# Directories under assets/ holding currentColor SVG templates
+ICON_DIRS = ("layouts", "icons")
+
+CACHE_HOME = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+BUNDLE_PATH = os.path.join(CACHE_HOME, "mangobar", "assets.gresource")
+
+RESOURCE_PREFIX = "/org/mangobar"
+# Resource holding the source stamp the bundle was built from
+STAMP_RESOURCE = f"{RESOURCE_PREFIX}/stamp"
+# Bump when the bundle layout changes so old bundles are rebuilt
+BUNDLE_VERSION = 2
+
+# Icon color for palettes without an accent_color
+DEFAULT_ACCENT = "#9d7cd8"
+
+DEFINE_COLOR = re.compile(r"@define-color\s+([\w-]+)\s+([^;]+);")
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+def parse_palette(css):
+    """Return a palette layer's named colors, with @references resolved."""
+    colors = dict(DEFINE_COLOR.findall(CSS_COMMENT.sub("", css)))
+
+    def resolve(value, seen=()):
+        value = value.strip()
+        name = value[1:]
+        if value.startswith("@") and name in colors and name not in seen:
+            return resolve(colors[name], seen + (name,))
+        return value
+
+    return {name: resolve(value) for name, value in colors.items()}
+
+
+def palette_accent(css):
+    """The color a palette's icons are recolored to."""
+    return parse_palette(css).get("accent_color", DEFAULT_ACCENT)
+
+
+def list_sources(themes_dir=THEMES_DIR, assets_dir=ASSETS_DIR):
+    """Return (themes, icons): theme names and "<dir>/<file>.svg" templates."""
+    themes = []
+    if os.path.isdir(themes_dir):
+        themes = sorted(f[:-4] for f in os.listdir(themes_dir) if f.endswith(".css"))
+    icons = []
+    for directory in ICON_DIRS:
+        path = os.path.join(assets_dir, directory)
+        if os.path.isdir(path):
+            icons += sorted(
+                f"{directory}/{f}" for f in os.listdir(path) if f.endswith(".svg")
+            )
+    return themes, icons
+
+
+def source_stamp(themes_dir=THEMES_DIR, assets_dir=ASSETS_DIR):
+    """Hash of every bundled source's name, size and mtime.
+
+    Only stats the files, so checking a bundle for staleness opens nothing.
+    """
+    themes, icons = list_sources(themes_dir, assets_dir)
+    paths = [STYLE_PATH]
+    paths += [os.path.join(themes_dir, f"{name}.css") for name in themes]
+    paths += [os.path.join(assets_dir, icon) for icon in icons]
+    digest = hashlib.sha1(f"{BUNDLE_VERSION}".encode())
+    for path in paths:
+        st = os.stat(path)
+        digest.update(f"{path} {st.st_size} {st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def icon_variant(icon, theme_name):
+    """Name of an icon recolored for a theme, e.g. layouts/tile_nord.svg."""
+    return f"{icon[:-4]}_{theme_name}.svg"
+
+
+def build_bundle(
+    output=BUNDLE_PATH, themes_dir=THEMES_DIR, assets_dir=ASSETS_DIR, stamp=None
+):
+    """Compile the stylesheet, every palette and every icon per theme accent.
+
+    Needs glib-compile-resources. The bundle is written next to `output`
+    and renamed into place, so a running bar never maps a partial file.
+    Returns True on success.
+    """
+    themes, icons = list_sources(themes_dir, assets_dir)
+    stamp = stamp or source_stamp(themes_dir, assets_dir)
+
+    with tempfile.TemporaryDirectory(prefix="mangobar_assets_") as build_dir:
+        files = {"stamp": stamp}
+        with open(STYLE_PATH, "r") as f:
+            files["style.css"] = f.read()
+        # "default" covers themes added since the bundle was built
+        accents = {"default": DEFAULT_ACCENT}
+        for name in themes:
+            with open(os.path.join(themes_dir, f"{name}.css"), "r") as f:
+                files[f"themes/{name}.css"] = f.read()
+            accents[name] = palette_accent(files[f"themes/{name}.css"])
+        for icon in icons:
+            with open(os.path.join(assets_dir, icon), "r") as f:
+                template = f.read()
+            for name, accent in accents.items():
+                files[icon_variant(icon, name)] = template.replace(
+                    "currentColor", accent
+                )
+
+        entries = []
+        for relative, content in files.items():
+            path = os.path.join(build_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(content)
+            entries.append(f"    <file>{relative}</file>")
+
+        manifest = os.path.join(build_dir, "assets.gresource.xml")
+        with open(manifest, "w") as f:
+            f.write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n<gresources>\n'
+                f'  <gresource prefix="{RESOURCE_PREFIX}">\n'
+                + "\n".join(entries)
+                + "\n  </gresource>\n</gresources>\n"
+            )
+
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        partial = f"{output}.partial"
+        try:
+            subprocess.run(
+                [
+                    "glib-compile-resources",
+                    f"--sourcedir={build_dir}",
+                    f"--target={partial}",
+                    manifest,
+                ],
+                check=True,
+                capture_output=True,
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error building asset bundle, using loose files: {e}")
+            return False
+        os.replace(partial, output)
+    return True
+
+
+def open_bundle(path=BUNDLE_PATH):
+    """Map a bundle and return (resource, stamp), or (None, None) if unusable."""
+    try:
+        resource = Gio.Resource.load(path)
+        stamp = resource.lookup_data(STAMP_RESOURCE, Gio.ResourceLookupFlags.NONE)
+        return resource, stamp.get_data().decode()
+    except GLib.Error:
+        return None, None
+
+
+class AssetStore:
+    """Stylesheet, palettes and recolored icons from a compiled GResource bundle.
+
+    The bundle is memory-mapped once and registered, so theme switches and
+    layout icons are `resource://` lookups instead of file reads. It is
+    rebuilt when its stamp no longer matches the sources. Without
+    glib-compile-resources the loose files are used instead, with recolored
+    icons written to a temp directory once per (icon, theme).
+    """
+
+    def __init__(self, bundle_path=BUNDLE_PATH, use_bundle=True):
+        self.bundle_path = bundle_path
+        self.resource = None
+        self.themes = set(list_sources()[0])
+        self._accents = {}
+        self._temp_dir = None
+        if use_bundle:
+            self.resource = self._load_bundle()
+
+    def _load_bundle(self):
+        stamp = source_stamp()
+        resource, bundled = open_bundle(self.bundle_path)
+        if bundled != stamp:
+            if not build_bundle(self.bundle_path, stamp=stamp):
+                return None
+            resource, bundled = open_bundle(self.bundle_path)
+            if resource is None:
+                return None
+        Gio.resources_register(resource)
+        return resource
+
+    def _read(self, relative, path):
+        if self.resource is not None:
+            try:
+                data = Gio.resources_lookup_data(
+                    f"{RESOURCE_PREFIX}/{relative}", Gio.ResourceLookupFlags.NONE
+                )
+                return data.get_data().decode()
+            except GLib.Error:
+                pass  # added since the bundle was built
+        with open(path, "r") as f:
+            return f.read()
+
+    def base_css(self):
+        """Return the structural stylesheet."""
+        return self._read("style.css", STYLE_PATH)
+
+    def theme_css(self, theme_name):
+        """Return a theme's palette layer."""
+        return self._read(
+            f"themes/{theme_name}.css", os.path.join(THEMES_DIR, f"{theme_name}.css")
+        )
+
+    def accent(self, theme_name):
+        """Return the accent color of a theme's palette."""
+        accent = self._accents.get(theme_name)
+        if accent is None:
+            try:
+                accent = palette_accent(self.theme_css(theme_name))
+            except OSError:
+                accent = DEFAULT_ACCENT
+            self._accents[theme_name] = accent
+        return accent
+
+    def icon(self, icon, theme_name):
+        """Return a `resource://` URI or file path for an icon in a theme's accent.
+
+        `icon` is relative to assets/, e.g. "layouts/tile.svg".
+        """
+        if self.resource is not None:
+            variant = theme_name if theme_name in self.themes else "default"
+            path = f"{RESOURCE_PREFIX}/{icon_variant(icon, variant)}"
+            try:
+                self.resource.get_info(path, Gio.ResourceLookupFlags.NONE)
+                return f"resource://{path}"
+            except GLib.Error:
+                pass  # icon added since the bundle was built
+
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="mangobar_icons_")
+        colored_path = os.path.join(
+            self._temp_dir, icon_variant(icon, theme_name).replace("/", "_")
+        )
+        # Each (icon, theme) pair only needs to be written once per run
+        if os.path.exists(colored_path):
+            return colored_path
+
+        template_path = os.path.join(ASSETS_DIR, icon)
+        try:
+            with open(template_path, "r") as f:
+                template = f.read()
+            colored_svg = template.replace("currentColor", self.accent(theme_name))
+            with open(colored_path, "w") as f:
+                f.write(colored_svg)
+            return colored_path
+        except Exception as e:
+            print(f"Error creating colored icon: {e}")
+            return template_path  # Fallback to template
+
+    def cleanup(self):
+        """Remove the fallback icon directory, if one was created."""
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+
+def set_image_source(image, source):
+    """Load a path or `resource://` URI from `AssetStore.icon` into an image."""
+    if source.startswith("resource://"):
+        image.set_from_resource(source[len("resource://") :])
+    else:
+        image.set_from_file(source)
+
+
+_asset_store = None
+
+
+def get_asset_store():
+    """Return the AssetStore shared by every bar in the process."""
+    global _asset_store
+    if _asset_store is None:
+        _asset_store = AssetStore()
+        atexit.register(_asset_store.cleanup)
+    return _asset_store
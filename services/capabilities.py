@@ -0,0 +1,120 @@
+import os
+from collections import namedtuple
+
+# Result of a startup probe; `reason` says what is missing when unavailable
+Capability = namedtuple("Capability", "available reason")
+
+# hwmon driver names the cpu-temp source reads through psutil
+CPU_TEMP_SENSORS = ("k10temp",)
+
+
+def probe_nvml():
+    """pynvml is installed, the driver loads and there is at least one GPU."""
+    try:
+        from pynvml import nvmlDeviceGetCount, nvmlInit, nvmlShutdown
+    except ImportError:
+        return Capability(False, "pynvml not installed")
+    try:
+        nvmlInit()
+    except Exception as e:
+        return Capability(False, f"NVML driver not loaded ({e})")
+    try:
+        count = nvmlDeviceGetCount()
+    except Exception as e:
+        return Capability(False, f"NVML device query failed ({e})")
+    finally:
+        nvmlShutdown()
+    if count == 0:
+        return Capability(False, "no NVIDIA GPU")
+    return Capability(True, f"{count} NVIDIA GPU(s)")
+
+
+def probe_cpu_temp(root="/"):
+    """A supported CPU temperature sensor is registered with hwmon."""
+    hwmon_dir = os.path.join(root, "sys", "class", "hwmon")
+    try:
+        devices = os.listdir(hwmon_dir)
+    except OSError:
+        return Capability(False, "no hwmon sensors")
+    for device in devices:
+        try:
+            with open(os.path.join(hwmon_dir, device, "name"), "r") as f:
+                name = f.read().strip()
+        except OSError:
+            continue
+        if name in CPU_TEMP_SENSORS:
+            return Capability(True, name)
+    return Capability(False, f"no {'/'.join(CPU_TEMP_SENSORS)} sensor")
+
+
+def probe_playerctl():
+    """Playerctl is installed and its player manager can reach the session bus."""
+    try:
+        import gi
+
+        gi.require_version("Playerctl", "2.0")
+        from gi.repository import Playerctl
+
+        Playerctl.PlayerManager()
+    except Exception as e:
+        return Capability(False, f"Playerctl not available ({e})")
+    return Capability(True, "Playerctl")
+
+
+def probe_audio():
+    """Fabric's audio service and its volume-control library are installed.
+
+    A sound server that is not running yet is not a reason to disable the
+    widget: the service connects when it appears and reports the speaker
+    with an event.
+    """
+    try:
+        from fabric.audio.service import Audio  # noqa: F401
+    except Exception as e:
+        return Capability(False, f"fabric audio not available ({e})")
+    return Capability(True, "fabric audio")
+
+
+def probe_battery():
+    from services.power import has_battery
+
+    if has_battery():
+        return Capability(True, "battery")
+    return Capability(False, "no battery")
+
+
+def probe_pressure():
+    from services.pressure import has_pressure
+
+    if has_pressure():
+        return Capability(True, "/proc/pressure")
+    return Capability(False, "kernel has no PSI (/proc/pressure)")
+
+
+PROBES = {
+    "nvml": probe_nvml,
+    "cpu-temp": probe_cpu_temp,
+    "playerctl": probe_playerctl,
+    "audio": probe_audio,
+    "battery": probe_battery,
+    "pressure": probe_pressure,
+}
+
+_results = {}
+
+
+def probe(name):
+    """Return a capability's Capability, probing it on first use only."""
+    result = _results.get(name)
+    if result is None:
+        try:
+            result = PROBES[name]()
+        except Exception as e:
+            result = Capability(False, f"probe failed ({e})")
+        _results[name] = result
+    return result
+
+
+def probed():
+    """Return {name: Capability} for everything probed so far."""
+    return dict(_results)
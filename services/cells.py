@@ -0,0 +1,62 @@
+# Heatmap cell layout and packing, kept free of GTK and cairo so replayed
+# readings can be checked headlessly.
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Opacity of an idle cell, so empty cores are still visible
+MIN_ALPHA = 0.15
+# Sentinel cell value that is drawn fully transparent
+GAP = -1.0
+
+
+def pack_cells(values, rgb, columns):
+    """Pack 0..1 cell values into a premultiplied ARGB32 pixel buffer.
+
+    Each cell becomes one pixel whose opacity follows its value; negative
+    values are left fully transparent (used as gaps). Returns the buffer and
+    the number of rows.
+    """
+    count = len(values)
+    rows = max(1, -(-count // columns))
+    red, green, blue = rgb
+
+    if np is not None:
+        cells = np.asarray(values, dtype=np.float32)
+        alpha = np.where(
+            cells < 0, 0.0, MIN_ALPHA + (1 - MIN_ALPHA) * np.clip(cells, 0, 1)
+        )
+        pixels = np.zeros((rows * columns, 4), dtype=np.uint8)
+        # Little-endian ARGB32 is stored as B, G, R, A
+        pixels[:count] = (
+            np.outer(alpha, (blue, green, red, 1.0)) * 255 + 0.5
+        ).astype(np.uint8)
+        return pixels, rows
+
+    pixels = bytearray(rows * columns * 4)
+    for i, value in enumerate(values):
+        if value < 0:
+            continue
+        alpha = MIN_ALPHA + (1 - MIN_ALPHA) * min(max(value, 0.0), 1.0)
+        offset = i * 4
+        pixels[offset] = int(blue * alpha * 255 + 0.5)
+        pixels[offset + 1] = int(green * alpha * 255 + 0.5)
+        pixels[offset + 2] = int(red * alpha * 255 + 0.5)
+        pixels[offset + 3] = int(alpha * 255 + 0.5)
+    return pixels, rows
+
+
+def core_cells(usage, freqs, columns):
+    """Lay out per-core usage above per-core frequency as heatmap cells.
+
+    Usage is padded to whole rows and one empty row separates the two maps.
+    Without frequencies only the usage cells are returned.
+    """
+    cells = list(usage)
+    if len(freqs):
+        padding = -len(cells) % columns
+        cells.extend([GAP] * (padding + columns))
+        cells.extend(freqs)
+    return cells
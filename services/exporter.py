@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import socket
+import sys
+from collections import deque
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib, GObject
+
+from services.capabilities import probe
+from services.mango import MangoService
+from services.system import SOURCES, get_sampler
+
+# Samplers streamed by the exporter; uptime is left out because it changes
+# every tick and consumers can derive it from the clock.
+EXPORTED_SOURCES = ("cpu", "ram", "cpu-temp", "gpu")
+
+# Snapshots buffered per socket client before the oldest are dropped
+DEFAULT_QUEUE_SIZE = 16
+
+
+class Exporter(GObject.Object):
+    """Samples every bar data source once and emits change-only snapshots.
+
+    All consumers share the same samplers and Mango services, so sources are
+    polled once no matter how many sinks or socket clients are attached.
+    Changes arriving in the same main loop iteration are coalesced into a
+    single snapshot.
+    """
+
+    __gsignals__ = {
+        "snapshot": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+    }
+
+    def __init__(self, outputs=None):
+        super().__init__()
+        self.state = {}
+        self.last_line = None
+        self._flush_id = None
+        self.mango_services = []
+
+        for name in EXPORTED_SOURCES:
+            if name in SOURCES:
+                get_sampler(name).subscribe(
+                    lambda value, name=name: self.set_value(name, value)
+                )
+
+        for output in outputs or MangoService.list_outputs() or [None]:
+            service = MangoService(monitor=output)
+            for signal in ("tags-changed", "layout-changed", "client-changed"):
+                service.connect(signal, self.on_mango_changed)
+            self.mango_services.append(service)
+            self.on_mango_changed(service)
+
+        self.setup_media()
+
+    def setup_media(self):
+        try:
+            from services.media import get_media_service
+        except (ImportError, ValueError) as e:
+            print(f"Media state not exported: {e}", file=sys.stderr)
+            return
+        if not probe("playerctl").available:
+            return
+
+        self.media = get_media_service()
+        for signal in ("player-changed", "status-changed", "position-changed"):
+            self.media.connect(signal, self.on_media_changed)
+        self.on_media_changed(self.media)
+
+    def on_mango_changed(self, service, *_):
+        mango = dict(self.state.get("mango", {}))
+        mango[service.monitor or "default"] = {
+            "tags": service.available_tags,
+            "active": service.active_tags,
+            "occupied": service.occupied_tags,
+            "layout": service.layout,
+            "client": service.focused_client,
+        }
+        self.set_value("mango", mango)
+
+    def on_media_changed(self, service, *_):
+        if service.player is None:
+            self.set_value("media", None)
+            return
+        self.set_value(
+            "media",
+            {
+                "player": service.player.props.player_name,
+                "status": service.status,
+                "progress": round(service.progress, 3),
+            },
+        )
+
+    def set_value(self, key, value):
+        if self.state.get(key) == value and key in self.state:
+            return
+        self.state[key] = value
+        if self._flush_id is None:
+            self._flush_id = GLib.idle_add(self.flush)
+
+    def flush(self):
+        self._flush_id = None
+        line = json.dumps(self.state, separators=(",", ":"), sort_keys=True)
+        if line != self.last_line:
+            self.last_line = line
+            self.emit("snapshot", line)
+        return False
+
+
+class StdoutSink:
+    """Writes every snapshot to stdout as one JSON line."""
+
+    def __init__(self, exporter, loop):
+        self.loop = loop
+        exporter.connect("snapshot", self.on_snapshot)
+
+    def on_snapshot(self, _, line):
+        try:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # Reader went away (e.g. `| head`); nothing left to serve
+            self.loop.quit()
+
+
+class SocketClient:
+    """One subscriber connection with a bounded, non-blocking send queue."""
+
+    def __init__(self, server, conn, queue_size):
+        self.server = server
+        self.conn = conn
+        # Snapshots are full state, so a slow client only needs the newest;
+        # when the queue is full the oldest entry is dropped.
+        self.queue = deque(maxlen=queue_size)
+        self.pending = None
+        self.dropped = 0
+        self._write_id = None
+        self._read_id = GLib.io_add_watch(
+            conn.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+            self.on_readable,
+        )
+
+    def push(self, line):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append((line + "\n").encode())
+        if self._write_id is None:
+            self._write_id = GLib.io_add_watch(
+                self.conn.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_OUT, self.on_writable
+            )
+
+    def on_writable(self, *_):
+        while True:
+            if not self.pending:
+                if not self.queue:
+                    self._write_id = None
+                    return False
+                self.pending = memoryview(self.queue.popleft())
+            try:
+                sent = self.conn.send(self.pending)
+            except BlockingIOError:
+                return True  # socket buffer full, wait for the next IO_OUT
+            except OSError:
+                self.close()
+                return False
+            self.pending = self.pending[sent:]
+
+    def on_readable(self, *_):
+        # Clients never send anything; readable means EOF or error
+        try:
+            data = self.conn.recv(4096)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b""
+        if data:
+            return True
+        self.close()
+        return False
+
+    def close(self):
+        for source_id in (self._read_id, self._write_id):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self._read_id = self._write_id = None
+        self.conn.close()
+        self.server.clients.discard(self)
+
+
+class SocketServer:
+    """Serves snapshots to any number of clients on a Unix stream socket.
+
+    New clients receive the current snapshot immediately, then every change.
+    """
+
+    def __init__(self, exporter, path, queue_size=DEFAULT_QUEUE_SIZE):
+        self.exporter = exporter
+        self.path = path
+        self.queue_size = queue_size
+        self.clients = set()
+
+        if os.path.exists(path):
+            os.unlink(path)  # stale socket from a previous run
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen()
+        self.sock.setblocking(False)
+
+        GLib.io_add_watch(
+            self.sock.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, self.on_accept
+        )
+        exporter.connect("snapshot", self.on_snapshot)
+
+    def on_accept(self, *_):
+        try:
+            conn, _ = self.sock.accept()
+        except BlockingIOError:
+            return True
+        conn.setblocking(False)
+        client = SocketClient(self, conn, self.queue_size)
+        self.clients.add(client)
+        if self.exporter.last_line:
+            client.push(self.exporter.last_line)
+        return True
+
+    def on_snapshot(self, _, line):
+        for client in list(self.clients):
+            client.push(line)
+
+    def close(self):
+        for client in list(self.clients):
+            client.close()
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run MangoBar's data sources without GTK and stream "
+        "change-only JSON-lines snapshots"
+    )
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="serve snapshots on this Unix socket instead of stdout",
+    )
+    parser.add_argument(
+        "--stdout",
+        action="store_true",
+        help="also write snapshots to stdout when --socket is given",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help="snapshots buffered per socket client before dropping the oldest",
+    )
+    parser.add_argument(
+        "--output",
+        action="append",
+        help="Mango output to export (repeatable, default: all)",
+    )
+    args = parser.parse_args(argv)
+
+    loop = GLib.MainLoop()
+    exporter = Exporter(outputs=args.output)
+
+    server = None
+    if args.socket:
+        server = SocketServer(exporter, args.socket, queue_size=args.queue_size)
+        print(f"Serving snapshots on {args.socket}", file=sys.stderr)
+    if not args.socket or args.stdout:
+        StdoutSink(exporter, loop)
+
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# Per-metric display filtering. `smoothing` is the EMA weight given to the
+# previous value (0 disables it) and `hysteresis` the minimum change, in the
+# metric's own units, before the display moves at all.
+METRIC_FILTERS = {
+    "cpu": {"smoothing": 0.3, "hysteresis": 1.0},
+    "ram": {"hysteresis": 0.5},
+    "cpu-temp": {"smoothing": 0.5, "hysteresis": 1.5},
+    "gpu": {"smoothing": 0.3, "hysteresis": 1.0},
+    "vram": {"hysteresis": 0.5},
+    "gpu-temp": {"smoothing": 0.5, "hysteresis": 1.5},
+    # byte rates jump around a lot from one second to the next
+    "net-rx": {"smoothing": 0.3},
+    "net-tx": {"smoothing": 0.3},
+    "disk-read": {"smoothing": 0.3},
+    "disk-write": {"smoothing": 0.3},
+    # progress is 0..1; half a percent is below what the ring can show
+    "media-progress": {"hysteresis": 0.005},
+}
+
+
+class MetricFilter:
+    """Sits between a sampler and a widget and drops invisible updates.
+
+    Each reading is optionally EMA-smoothed, held back until it moves past
+    the hysteresis threshold, then rendered; `callback(value, rendered)` only
+    runs when the rendered output differs from what is already on screen.
+    """
+
+    __slots__ = (
+        "callback",
+        "render",
+        "smoothing",
+        "hysteresis",
+        "mutations",
+        "_smoothed",
+        "_shown",
+        "_rendered",
+    )
+
+    def __init__(self, callback, render=str, smoothing=0.0, hysteresis=0.0):
+        self.callback = callback
+        self.render = render
+        self.smoothing = smoothing
+        self.hysteresis = hysteresis
+        self.mutations = 0  # number of times the widget was actually touched
+
+        self._smoothed = None
+        self._shown = None
+        self._rendered = None
+
+    def __call__(self, value):
+        if self.smoothing and self._smoothed is not None:
+            value = self._smoothed + (1 - self.smoothing) * (value - self._smoothed)
+        self._smoothed = value
+
+        if (
+            self.hysteresis
+            and self._shown is not None
+            and abs(value - self._shown) < self.hysteresis
+        ):
+            return
+
+        rendered = self.render(value)
+        if rendered == self._rendered:
+            return
+
+        self._shown = value
+        self._rendered = rendered
+        self.mutations += 1
+        self.callback(value, rendered)
+
+    def reset(self):
+        """Forget the displayed state so the next reading always renders."""
+        self._smoothed = None
+        self._shown = None
+        self._rendered = None
+
+
+def metric_filter(name, callback, render=str):
+    """Build a MetricFilter with the configured settings for `name`."""
+    return MetricFilter(callback, render, **METRIC_FILTERS.get(name, {}))
+
+
+def percent_label(value):
+    return f"{str(int(value))}%"
+
+
+def temperature_label(value):
+    return f"{round(value)}°C"
+
+
+def rate_label(value):
+    """Bytes per second as at most four characters, e.g. "512", "12K", "1.2M"."""
+    for unit in ("", "K", "M", "G"):
+        if value < 999.5:
+            if unit and value < 9.95:
+                return f"{value:.1f}{unit}"
+            return f"{value:.0f}{unit}"
+        value /= 1024
+    return f"{value:.0f}T"
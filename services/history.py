@@ -0,0 +1,93 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 300 one-second samples = the last five minutes
+DEFAULT_CAPACITY = 300
+
+
+class MetricHistory:
+    """Fixed-capacity ring buffer of float samples for one metric.
+
+    Samples live in a preallocated ``array("f")`` (float32), so appending is
+    O(1) and allocates nothing. Memory per metric is bounded at
+    ``capacity * 4`` bytes plus a constant object overhead: 1.2 KiB for the
+    default 300 samples. Statistics are computed on demand over the most
+    recent ``n`` samples, using a zero-copy NumPy view when NumPy is installed.
+    """
+
+    __slots__ = ("capacity", "version", "_data", "_view", "_index", "_count")
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        # Bumped on every append so renderers know when to rebuild caches
+        self.version = 0
+        self._data = array("f", bytes(4 * capacity))
+        self._view = np.frombuffer(self._data, dtype=np.float32) if np else None
+        self._index = 0  # next slot to write
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.version += 1
+
+    def clear(self):
+        self._index = 0
+        self._count = 0
+        self.version += 1
+
+    def latest(self):
+        if not self._count:
+            return None
+        return self._data[self._index - 1]
+
+    def window(self, n=None):
+        """Return the last `n` samples (default: all), oldest first."""
+        n = self._count if n is None else max(0, min(n, self._count))
+        if not n:
+            return [] if self._view is None else self._view[:0]
+
+        start = (self._index - n) % self.capacity
+        source = self._data if self._view is None else self._view
+        if start + n <= self.capacity:
+            return source[start : start + n]
+        tail = source[start:]
+        head = source[: self._index]
+        if self._view is None:
+            return tail + head
+        return np.concatenate((tail, head))
+
+    def stats(self, n=None):
+        """Return (min, max, mean) over the last `n` samples, or None if empty."""
+        samples = self.window(n)
+        if not len(samples):
+            return None
+        if self._view is not None:
+            return float(samples.min()), float(samples.max()), float(samples.mean())
+        return min(samples), max(samples), sum(samples) / len(samples)
+
+    def percentile(self, q, n=None):
+        """Return the q-th percentile (0-100) over the last `n` samples."""
+        samples = self.window(n)
+        if not len(samples):
+            return None
+        if self._view is not None:
+            return float(np.percentile(samples, q))
+
+        # Linear interpolation between closest ranks, as numpy does by default
+        ordered = sorted(samples)
+        rank = (len(ordered) - 1) * q / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
@@ -0,0 +1,63 @@
+from functools import lru_cache
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio, Gtk
+
+FALLBACK_ICON = "application-x-executable"
+
+
+def _desktop_app_info(app_id):
+    """Find the desktop entry for a Wayland app id, if any."""
+    candidates = [app_id, app_id.lower()]
+    # Reverse-DNS ids (org.gnome.Nautilus) are often installed by last part
+    if "." in app_id:
+        candidates.append(app_id.rsplit(".", 1)[-1].lower())
+
+    for candidate in candidates:
+        try:
+            info = Gio.DesktopAppInfo.new(f"{candidate}.desktop")
+        except TypeError:
+            info = None
+        if info is not None:
+            return info
+
+    # Fall back to a full desktop-file search (slow, hence the cache)
+    for group in Gio.DesktopAppInfo.search(app_id):
+        for desktop_id in group:
+            info = Gio.DesktopAppInfo.new(desktop_id)
+            if info is not None:
+                return info
+    return None
+
+
+# Sized for tag previews: up to 9 tags x 20 clients
+@lru_cache(maxsize=256)
+def resolve_app_icon(app_id):
+    """Resolve an app id to a Gio.Icon, once per app.
+
+    Looks the id up in the icon theme first, then in desktop files. Results
+    are kept in an LRU cache that is cleared when the icon theme changes.
+    """
+    if not app_id:
+        return Gio.ThemedIcon.new(FALLBACK_ICON)
+
+    theme = Gtk.IconTheme.get_default()
+    for name in (app_id, app_id.lower()):
+        if theme.has_icon(name):
+            return Gio.ThemedIcon.new(name)
+
+    info = _desktop_app_info(app_id)
+    if info is not None and info.get_icon() is not None:
+        return info.get_icon()
+
+    return Gio.ThemedIcon.new(FALLBACK_ICON)
+
+
+def _on_icon_theme_changed(*_):
+    resolve_app_icon.cache_clear()
+
+
+Gtk.IconTheme.get_default().connect("changed", _on_icon_theme_changed)
@@ -1,15 +1,175 @@
 import gi
 
 gi.require_version("GLib", "2.0")
-from gi.repository import GLib, GObject
+gi.require_version("Gio", "2.0")
+from gi.repository import GLib, GObject, Gio
+import json
 import subprocess
 
+from services.trace import get_replayer, record
+
+# Apps remembered per tag for tag previews
+TAG_HISTORY_LIMIT = 20
+
+# Queries behind each poll of the Mango state, by result key
+POLL_QUERIES = {
+    "num": ["-T"],
+    "tags": ["-g", "-t"],
+    "layout": ["-g", "-l"],
+    "client": ["-g", "-c"],
+}
+# Seconds a query may run before it is killed
+MMSG_TIMEOUT = 5
+
+
+def parse_tag_clients(text):
+    """Parse per-tag client counts from `mmsg -g -t` output.
+
+    Per-tag lines look like "<output> tag <n> <state> <clients> <focused>".
+    """
+    counts = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 5 and parts[1] == "tag":
+            try:
+                counts[int(parts[2])] = int(parts[4])
+            except ValueError:
+                pass
+    return counts
+
+
+def parse_output_heads(text):
+    """Parse `wlr-randr --json` output into enabled outputs.
+
+    Returns [{"name", "geometry", "model"}, ...] where geometry is the
+    output's logical (x, y, width, height), the layout Gdk monitors use.
+    """
+    try:
+        heads = json.loads(text)
+    except ValueError:
+        return []
+
+    outputs = []
+    for head in heads if isinstance(heads, list) else []:
+        mode = next((m for m in head.get("modes", ()) if m.get("current")), None)
+        if not head.get("enabled") or mode is None or "position" not in head:
+            continue
+        scale = head.get("scale") or 1.0
+        width, height = mode["width"] / scale, mode["height"] / scale
+        if head.get("transform", "normal").split("-")[-1] in ("90", "270"):
+            width, height = height, width
+        position = head["position"]
+        outputs.append(
+            {
+                "name": head["name"],
+                "geometry": (
+                    position["x"],
+                    position["y"],
+                    round(width),
+                    round(height),
+                ),
+                "model": head.get("model"),
+            }
+        )
+    return outputs
+
+
+def read_output_heads():
+    """Return the enabled outputs as parse_output_heads() does.
+
+    Queries wlr-output-management through `wlr-randr`; an empty list if it
+    is not installed or the compositor does not answer.
+    """
+    try:
+        result = subprocess.run(
+            ["wlr-randr", "--json"], capture_output=True, text=True, timeout=5
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return []
+    if result.returncode != 0:
+        return []
+    return parse_output_heads(result.stdout)
+
+
+def match_output(geometry, model, heads, names=None):
+    """Return the name of the output a Gdk monitor shows, or None.
+
+    Matches the monitor's logical geometry (x, y, width, height) first,
+    within a pixel for fractional scales, then its model when exactly one
+    output has it. `names` restricts the candidates, e.g. to the outputs
+    Mango reports. Output order is never used: it changes on hotplug.
+    """
+    if names is not None:
+        heads = [head for head in heads if head["name"] in names]
+
+    at = [
+        head["name"]
+        for head in heads
+        if all(abs(a - b) <= 1 for a, b in zip(head["geometry"], geometry))
+    ]
+    if len(at) == 1:
+        return at[0]
+
+    if model:
+        same = [head["name"] for head in heads if head["model"] == model]
+        if len(same) == 1:
+            return same[0]
+    return None
+
+
+class TagClients:
+    """Which apps live on each tag, for tag previews.
+
+    mmsg reports how many clients each tag holds but only the focused
+    client's identity, so a tag's apps are the ones most recently focused
+    on it, trimmed to its client count. Counts are fetched on demand and
+    marked stale whenever the tags change.
+    """
+
+    def __init__(self, limit=TAG_HISTORY_LIMIT):
+        self.limit = limit
+        self.counts = None  # tag -> client count, None if unknown
+        self.fresh = False
+        # tag -> {app id: title}, most recently focused last
+        self._apps = {}
+
+    def note_focus(self, tags, client):
+        """Remember the focused client on the tags currently shown."""
+        if not client or not client.get("appid"):
+            return
+        for tag in tags:
+            apps = self._apps.setdefault(tag, {})
+            apps.pop(client["appid"], None)
+            apps[client["appid"]] = client["title"]
+            if len(apps) > self.limit:
+                del apps[next(iter(apps))]
+
+    def set_counts(self, counts):
+        self.counts = counts
+        self.fresh = True
+        for tag, count in (counts or {}).items():
+            if count == 0:
+                self._apps.pop(tag, None)
+
+    def invalidate(self):
+        self.fresh = False
+
+    def clients(self, tag):
+        """Return (client count or None, [(app id, title), ...] newest first)."""
+        count = None if self.counts is None else self.counts.get(tag, 0)
+        apps = list(reversed(self._apps.get(tag, {}).items()))
+        if count is not None:
+            apps = apps[:count]
+        return count, apps
+
 
 class MangoService(GObject.Object):
     __gsignals__ = {
         "tags-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
         "layout-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
         "client-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+        # emitted with the command kind ("tag", "layout") once mmsg returns
+        "command-finished": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
     }
 
     def __init__(self, monitor=None):
@@ -21,29 +181,238 @@ class MangoService(GObject.Object):
         self.occupied_tags = []
         self.layout = None
         self.focused_client = None
+        # Command kinds with an mmsg process running, and the latest intent
+        # queued behind each one
+        self._in_flight = set()
+        self._queued = {}
+        self._source_id = None
+        # Outputs of the running poll by query, None while none is running
+        self._poll_results = None
+        self._poll_again = False
+        # Command kinds waiting for the next poll to confirm them, and the
+        # ones the running poll will confirm
+        self._finished = []
+        self._confirming = []
+        # Bumped whenever a tag command starts or finishes; a poll that saw
+        # another value when it started may have read the tags before the
+        # command took effect
+        self._tag_generation = 0
+        self._poll_tag_generation = 0
+
+        replayer = get_replayer()
+        if replayer is not None:
+            replayer.attach(f"mango:{monitor}", self.apply_state)
+            return
+        self.update()
+        self._source_id = GLib.timeout_add(1000, self.poll)  # poll every second
+
+    @staticmethod
+    def list_outputs():
+        """Return Mango output names in the order mmsg reports them."""
+        replayer = get_replayer()
+        if replayer is not None:
+            return sorted(
+                channel[len("mango:") :]
+                for channel in replayer.channels
+                if channel.startswith("mango:") and channel != "mango:None"
+            )
+        try:
+            result = subprocess.run(
+                ["mmsg", "-g", "-t"], capture_output=True, text=True, timeout=5
+            )
+        except (subprocess.TimeoutExpired, FileNotFoundError):
+            return []
+        if result.returncode != 0:
+            return []
+
+        outputs = []
+        for line in result.stdout.strip().split("\n"):
+            parts = line.split()
+            if len(parts) >= 2 and parts[1] == "tags" and parts[0] not in outputs:
+                outputs.append(parts[0])
+        return outputs
+
+    def stop(self):
+        """Stop polling, e.g. when the output this service tracks is unplugged."""
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+        replayer = get_replayer()
+        if replayer is not None:
+            # The replayer would otherwise keep this bar's widgets alive
+            replayer.detach(f"mango:{self.monitor}", self.apply_state)
+
+    def view_tag(self, tag):
+        """Switch to a tag, showing it as active before mmsg has returned."""
+        self.active_tags = [tag]
+        self._tag_generation += 1
+        self.emit("tags-changed")
+        self.dispatch("tag", ["-t", str(tag)])
+
+    def next_layout(self):
+        self.dispatch("layout", ["-l", "next"])
+
+    def dispatch(self, kind, args):
+        """Run an mmsg command asynchronously.
+
+        Only one command per kind runs at a time; anything requested while
+        one is in flight replaces the queued intent, so rapid clicks collapse
+        into the latest one. When the last command of a kind returns, the
+        state is re-polled straight away, which confirms optimistic updates
+        or rolls them back.
+        """
+        if kind in self._in_flight:
+            self._queued[kind] = args
+            return
+
+        if get_replayer() is not None:
+            # Nothing to control while replaying; the trace decides the state
+            GLib.idle_add(lambda: self.emit("command-finished", kind))
+            return
+
+        cmd = ["mmsg"]
+        if self.monitor:
+            cmd.extend(["-o", self.monitor])
+        cmd.extend(args)
+        try:
+            process = Gio.Subprocess.new(
+                cmd,
+                Gio.SubprocessFlags.STDOUT_SILENCE
+                | Gio.SubprocessFlags.STDERR_SILENCE,
+            )
+        except GLib.Error as e:
+            print(f"Error running mmsg: {e.message}")
+            self._finished.append(kind)
+            self.update()
+            return
+
+        self._in_flight.add(kind)
+        process.wait_async(None, self._on_dispatch_finished, kind)
+
+    def _on_dispatch_finished(self, process, result, kind):
+        try:
+            process.wait_finish(result)
+        except GLib.Error as e:
+            print(f"Error waiting for mmsg: {e.message}")
+        self._in_flight.discard(kind)
+        if kind == "tag":
+            self._tag_generation += 1
+
+        queued = self._queued.pop(kind, None)
+        if queued is not None:
+            self.dispatch(kind, queued)
+            return
+
+        # Confirmed or rolled back by the poll that follows
+        self._finished.append(kind)
         self.update()
-        GLib.timeout_add(1000, self.update)  # poll every second
 
-    def run_mmsg(self, args):
+    def fetch_tag_clients(self, callback):
+        """Fetch per-tag client counts without blocking the main loop.
+
+        Calls `callback(counts)` with {tag: count}, or None if mmsg could
+        not tell (including during a replay). A hung mmsg is killed after
+        MMSG_TIMEOUT seconds, so the callback always runs.
+        """
+        if get_replayer() is not None:
+            GLib.idle_add(lambda: callback(None))
+            return
+
+        self.run_mmsg(
+            ["-g", "-t"],
+            lambda output: callback(
+                None if output is None else parse_tag_clients(output)
+            ),
+        )
+
+    def run_mmsg(self, args, callback):
+        """Run an mmsg query without blocking the main loop.
+
+        Calls `callback(output)` with the stripped stdout, or None if mmsg
+        failed or is not installed.
+        """
         cmd = ["mmsg"]
         if self.monitor:
             cmd.extend(["-o", self.monitor])
         cmd.extend(args)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except subprocess.TimeoutExpired:
-            pass
-        except FileNotFoundError:
-            pass  # mmsg not found
-        return None
+            process = Gio.Subprocess.new(
+                cmd,
+                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_SILENCE,
+            )
+        except GLib.Error:
+            # mmsg not found
+            GLib.idle_add(lambda: callback(None))
+            return
+        query = {"callback": callback, "timeout": None}
+
+        def kill():
+            # A hung mmsg is killed so the next poll can start
+            query["timeout"] = None
+            process.force_exit()
+            return False
+
+        query["timeout"] = GLib.timeout_add_seconds(MMSG_TIMEOUT, kill)
+        process.communicate_utf8_async(None, None, self._on_mmsg_output, query)
+
+    def _on_mmsg_output(self, process, result, query):
+        if query["timeout"] is not None:
+            GLib.source_remove(query["timeout"])
+        callback = query["callback"]
+        try:
+            _, stdout, _ = process.communicate_utf8_finish(result)
+        except GLib.Error as e:
+            print(f"Error waiting for mmsg: {e.message}")
+            callback(None)
+            return
+        if process.get_successful() and stdout:
+            callback(stdout.strip())
+        else:
+            callback(None)
+
+    def poll(self):
+        """Timer tick: poll mmsg unless the previous poll is still running."""
+        if self._poll_results is None:
+            self.update()
+        return True  # continue polling
 
     def update(self):
+        """Re-read the Mango state.
+
+        The queries run in parallel as mmsg subprocesses off the main loop,
+        and the state is applied once all of them have returned. An update
+        requested while one is running is folded into a single follow-up,
+        which also emits "command-finished" for the commands it confirms.
+        """
+        if self._poll_results is not None:
+            self._poll_again = True
+            return
+        self._poll_results = {}
+        self._poll_tag_generation = self._tag_generation
+        self._confirming, self._finished = self._finished, []
+        for key, args in POLL_QUERIES.items():
+            self.run_mmsg(
+                args, lambda output, key=key: self._on_poll_result(key, output)
+            )
+
+    def _on_poll_result(self, key, output):
+        self._poll_results[key] = output
+        if len(self._poll_results) < len(POLL_QUERIES):
+            return
+        results, self._poll_results = self._poll_results, None
+        self.apply_poll(results)
+        for kind in self._confirming:
+            self.emit("command-finished", kind)
+        self._confirming = []
+        if self._poll_again:
+            self._poll_again = False
+            self.update()
+
+    def apply_poll(self, results):
+        """Apply the output of the POLL_QUERIES, emitting what changed."""
         changed = False
 
-        # get number of tags
-        num_str = self.run_mmsg(["-T"])
+        num_str = results["num"]
         if num_str:
             try:
                 new_num = int(num_str)
@@ -54,8 +423,7 @@ class MangoService(GObject.Object):
             except ValueError:
                 pass
 
-        # get tags info
-        tags_info = self.run_mmsg(["-g", "-t"])
+        tags_info = results["tags"]
         if tags_info:
             lines = tags_info.split("\n")
             target_monitor = self.monitor
@@ -85,6 +453,13 @@ class MangoService(GObject.Object):
                             if active_mask & (1 << (i - 1))
                         ]
 
+                        if (
+                            "tag" in self._in_flight
+                            or self._poll_tag_generation != self._tag_generation
+                        ):
+                            # Keep the optimistic tag until a poll started
+                            # after the tag command returned confirms it
+                            new_active = self.active_tags
                         if (
                             new_occupied != self.occupied_tags
                             or new_active != self.active_tags
@@ -99,23 +474,12 @@ class MangoService(GObject.Object):
                     if target_monitor is None:
                         break  # take first for no monitor
 
-        # get current layout
-        cmd = ["mmsg", "-g", "-l"]
-        if self.monitor:
-            cmd.extend(["-o", self.monitor])
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-            layout_str = result.stdout.strip() if result.returncode == 0 else None
-        except subprocess.TimeoutExpired:
-            layout_str = None
-        except FileNotFoundError:
-            layout_str = None
+        layout_str = results["layout"]
         if layout_str and layout_str != self.layout:
             self.layout = layout_str
             self.emit("layout-changed")
 
-        # get focused client
-        client_str = self.run_mmsg(["-g", "-c"])
+        client_str = results["client"]
         new_client = None
         if client_str:
             parts = client_str.split(" ", 1)
@@ -130,4 +494,37 @@ class MangoService(GObject.Object):
         if changed:
             self.emit("tags-changed")
 
-        return True  # continue polling
+        record(f"mango:{self.monitor}", self.snapshot())
+
+    def snapshot(self):
+        return {
+            "tags": self.num_tags,
+            "active": self.active_tags,
+            "occupied": self.occupied_tags,
+            "layout": self.layout,
+            "client": self.focused_client,
+        }
+
+    def apply_state(self, state):
+        """Load a snapshot() taken elsewhere, emitting what changed."""
+        tags_changed = False
+        if state["tags"] != self.num_tags:
+            self.num_tags = state["tags"]
+            self.available_tags = list(range(1, self.num_tags + 1))
+            tags_changed = True
+        if (
+            state["active"] != self.active_tags
+            or state["occupied"] != self.occupied_tags
+        ):
+            self.active_tags = state["active"]
+            self.occupied_tags = state["occupied"]
+            tags_changed = True
+
+        if state["layout"] != self.layout:
+            self.layout = state["layout"]
+            self.emit("layout-changed")
+        if state["client"] != self.focused_client:
+            self.focused_client = state["client"]
+            self.emit("client-changed")
+        if tags_changed:
+            self.emit("tags-changed")
@@ -0,0 +1,354 @@
+import os
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib, GObject
+
+from services.artcolor import art_key, dominant_color
+from services.capabilities import probe
+from services.trace import get_replayer, record
+
+# Thumbnail size shown in the media widget
+THUMBNAIL_SIZE = 34
+# Art is decoded at this size for color extraction
+COLOR_SAMPLE_SIZE = 64
+# Decoded art kept per process, keyed by art URL hash
+ART_CACHE_SIZE = 32
+ART_TIMEOUT = 10
+
+# Decoded album art: source path if local, thumbnail pixbuf, "#rrggbb"
+ArtEntry = namedtuple("ArtEntry", "path thumbnail color")
+NO_ART = ArtEntry(None, None, None)
+
+# Position is re-read this often while playing; seeks arrive as signals
+POSITION_INTERVAL_MS = 1000
+
+if probe("playerctl").available:
+    from gi.repository import Playerctl
+
+
+class MediaService(GObject.Object):
+    """Tracks the Spotify player once per process and shares its state.
+
+    Every MediaWidget (one per bar) listens to the same service, so player
+    signals, position polling and album-art downloads happen only once.
+    Players are found through PlayerManager signals, and the position is
+    polled only while a player is playing, so nothing wakes up otherwise.
+    Art is decoded and its dominant color extracted on a worker thread;
+    both are cached by URL hash, so returning to seen art is a lookup.
+    """
+
+    __gsignals__ = {
+        "player-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+        "art-changed": (GObject.SignalFlags.RUN_FIRST, None, ()),
+        "status-changed": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
+        "position-changed": (GObject.SignalFlags.RUN_FIRST, None, (float,)),
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.player = None
+        self.manager = None
+        self.status = "Stopped"
+        self.progress = 0.0
+        # Thumbnail and dominant color of the current art, once loaded
+        self.art_file = None
+        self.art_pixbuf = None
+        self.art_color = None
+        self.art_url = None
+        # art_key(url) -> ArtEntry, least recently shown first
+        self._art_cache = OrderedDict()
+        self._art_loading = set()
+        self._position_id = None
+
+        replayer = get_replayer()
+        if replayer is not None:
+            replayer.attach("media", self.apply_state)
+            return
+        self.setup_manager()
+
+    def setup_manager(self):
+        try:
+            self.manager = Playerctl.PlayerManager()
+            self.manager.connect("name-appeared", self.on_player_appeared)
+            self.manager.connect("player-vanished", self.on_player_vanished)
+
+            # Check for existing Spotify players
+            for player_name in self.manager.props.player_names:
+                if "spotify" in player_name.name.lower():
+                    self.init_player(player_name)
+        except Exception as e:
+            print(f"Error setting up PlayerManager: {e}")
+
+    def on_player_appeared(self, manager, player_name):
+        # Only accept Spotify players
+        if "spotify" not in player_name.name.lower():
+            print(f"Ignoring non-Spotify player: {player_name.name}")
+            return
+        print(f"Spotify player appeared: {player_name.name}")
+        self.init_player(player_name)
+
+    def on_player_vanished(self, manager, player):
+        # Only care about Spotify players
+        if "spotify" not in player.props.player_name.lower():
+            return
+        print(f"Spotify player vanished: {player.props.player_name}")
+        if self.player == player:
+            self.set_player(None)
+
+    def init_player(self, player_name):
+        try:
+            # Double-check this is Spotify
+            if "spotify" not in player_name.name.lower():
+                return
+
+            player = Playerctl.Player.new_from_name(player_name)
+            player.connect("metadata", self.on_metadata_changed)
+            player.connect("playback-status", self.on_status_changed)
+            player.connect("seeked", self.on_seeked)
+            player.connect("exit", self.on_player_exit)
+
+            # Set as active player if we don't have one
+            if self.player is None:
+                self.set_player(player)
+                print(f"Initialized Spotify player: {player.props.player_name}")
+        except Exception as e:
+            print(f"Error initializing player: {e}")
+
+    def set_player(self, player):
+        self.player = player
+        self.emit("player-changed")
+        if player is not None:
+            self.update_art()
+            self.update_position()
+        self._update_polling()
+        self.record()
+
+    def on_metadata_changed(self, player, metadata):
+        if player != self.player:
+            return
+        self.update_art()
+        self.update_position()
+
+    def on_status_changed(self, player, status):
+        if player != self.player:
+            return
+        self.status = self.player.props.status
+        self.emit("status-changed", self.status)
+        self._update_polling()
+        self.record()
+
+    def on_seeked(self, player, _position):
+        if player == self.player:
+            self.update_position()
+
+    def on_player_exit(self, player):
+        if player == self.player:
+            print(f"Player exited: {player.props.player_name}")
+            self.set_player(None)
+
+    def play_pause(self):
+        if self.player:
+            try:
+                self.player.play_pause()
+            except Exception as e:
+                print(f"Error toggling playback: {e}")
+
+    def _update_polling(self):
+        """Run the position timer only while the player is playing."""
+        playing = self.player is not None and self.status == "Playing"
+        if playing and self._position_id is None:
+            self._position_id = GLib.timeout_add(
+                POSITION_INTERVAL_MS, self.update_position
+            )
+        elif not playing and self._position_id is not None:
+            GLib.source_remove(self._position_id)
+            self._position_id = None
+
+    def update_position(self):
+        if not self.player:
+            self._update_polling()
+            return False
+
+        try:
+            metadata = self.player.props.metadata
+            if not metadata:
+                return self._position_id is not None
+
+            position = self.player.get_position()
+            length = (
+                metadata["mpris:length"] if "mpris:length" in metadata.keys() else None
+            )
+
+            if length and length > 0:
+                self.progress = position / length
+                self.emit("position-changed", self.progress)
+
+            self.status = self.player.props.status
+            self.emit("status-changed", self.status)
+            self.record()
+        except Exception as e:
+            print(f"Error updating position: {e}")
+        self._update_polling()
+        return self._position_id is not None  # continue polling while playing
+
+    def snapshot(self):
+        return {
+            "player": self.player is not None,
+            "status": self.status,
+            "progress": self.progress,
+            "art": self.art_url,
+        }
+
+    def record(self):
+        record("media", self.snapshot())
+
+    def apply_state(self, state):
+        """Load a snapshot() taken elsewhere, emitting what changed."""
+        if state["art"] != self.art_url:
+            # Only local art is shown; a replay never reaches the network
+            url = state["art"]
+            self.set_art_url(url if url and url.startswith("file://") else None)
+
+        if state["player"] != (self.player is not None):
+            self.player = ReplayedPlayer() if state["player"] else None
+            self.emit("player-changed")
+
+        self.status = state["status"]
+        self.progress = state["progress"]
+        self.emit("position-changed", self.progress)
+        self.emit("status-changed", self.status)
+
+    def update_art(self):
+        art_url = None
+        try:
+            metadata = self.player.props.metadata if self.player else None
+            if metadata and "mpris:artUrl" in metadata.keys():
+                art_url = str(metadata["mpris:artUrl"]) or None
+        except Exception as e:
+            print(f"Error updating album art: {e}")
+        self.set_art_url(art_url)
+
+    def set_art_url(self, art_url):
+        """Show the art at a URL, loading it off the main loop if unseen."""
+        self.art_url = art_url
+        if not art_url:
+            self._show_art(NO_ART)
+            return
+
+        key = art_key(art_url)
+        entry = self._art_cache.get(key)
+        if entry is not None:
+            self._art_cache.move_to_end(key)
+            self._show_art(entry)
+            return
+        if key in self._art_loading:
+            return
+
+        # The previous art stays up until the new one is decoded
+        self._art_loading.add(key)
+        future = get_art_pool().submit(load_art, art_url)
+        future.add_done_callback(
+            lambda f: GLib.idle_add(self._on_art_loaded, art_url, f)
+        )
+
+    def _on_art_loaded(self, art_url, future):
+        key = art_key(art_url)
+        self._art_loading.discard(key)
+        try:
+            entry = future.result()
+        except Exception as e:
+            # Not cached, so the next track change with this art retries
+            print(f"Error loading album art: {e}")
+            entry = NO_ART
+        else:
+            self._art_cache[key] = entry
+            while len(self._art_cache) > ART_CACHE_SIZE:
+                self._art_cache.popitem(last=False)
+
+        # Skip art for a track that has already been replaced
+        if art_url == self.art_url:
+            self._show_art(entry)
+        return False
+
+    def _show_art(self, entry):
+        self.art_file, self.art_pixbuf, self.art_color = entry
+        self.emit("art-changed")
+
+
+def load_art(art_url):
+    """Decode art to a thumbnail and extract its dominant color.
+
+    Runs on the art worker thread; remote art is downloaded here too.
+    """
+    from gi.repository import GdkPixbuf, Gio
+
+    path = None
+    size = COLOR_SAMPLE_SIZE
+    if art_url.startswith("file://"):
+        path = art_url[len("file://") :]
+        if not os.path.exists(path):
+            return NO_ART
+        # Loaders such as JPEG decode straight at the reduced size
+        sample = GdkPixbuf.Pixbuf.new_from_file_at_size(path, size, size)
+    elif art_url.startswith(("http://", "https://")):
+        import urllib.request
+
+        with urllib.request.urlopen(art_url, timeout=ART_TIMEOUT) as response:
+            data = response.read()
+        # Decoded from memory; no temp file to leave behind
+        stream = Gio.MemoryInputStream.new_from_bytes(GLib.Bytes.new(data))
+        sample = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
+            stream, size, size, True, None
+        )
+    else:
+        return NO_ART
+
+    color = dominant_color(
+        sample.get_pixels(),
+        sample.get_width(),
+        sample.get_height(),
+        sample.get_rowstride(),
+        sample.get_n_channels(),
+    )
+    scale = THUMBNAIL_SIZE / max(sample.get_width(), sample.get_height())
+    thumbnail = sample.scale_simple(
+        max(1, round(sample.get_width() * scale)),
+        max(1, round(sample.get_height() * scale)),
+        GdkPixbuf.InterpType.BILINEAR,
+    )
+    return ArtEntry(path, thumbnail, color)
+
+
+_art_pool = None
+
+
+def get_art_pool():
+    """Return the single worker thread that downloads and decodes art."""
+    global _art_pool
+    if _art_pool is None:
+        # One thread: tracks change rarely, and a slow download must not
+        # hold up the sampling pool
+        _art_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="art")
+    return _art_pool
+
+
+class ReplayedPlayer:
+    """Stands in for the Playerctl player while a trace is replayed."""
+
+    def play_pause(self):
+        pass
+
+
+_media_service = None
+
+
+def get_media_service():
+    """Return the MediaService shared by every bar in the process."""
+    global _media_service
+    if _media_service is None:
+        _media_service = MediaService()
+    return _media_service
@@ -0,0 +1,240 @@
+import gc
+import os
+import signal
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib, GObject
+
+from services.animator import Animator
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prefix of every temp file and directory the bar creates
+TEMP_PREFIX = "mangobar_"
+
+# Large enough that automatic gen-2 collections never trigger
+NEVER = 2**31 - 1
+
+_baseline = None
+
+
+def start_tracing(frames=1):
+    """Start tracemalloc; the baseline for diffs is taken by mark_baseline()."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def mark_baseline():
+    """Snapshot the heap once startup is done, so reports show only growth."""
+    global _baseline
+    if tracemalloc.is_tracing():
+        _baseline = tracemalloc.take_snapshot()
+
+
+def module_name(filename):
+    """Attribute a source file to a repo module or a third-party package."""
+    if filename.startswith(BASE_DIR + os.sep):
+        relative = os.path.relpath(filename, BASE_DIR)
+        return os.path.splitext(relative)[0].replace(os.sep, ".")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in filename:
+            package = filename.split(marker + os.sep, 1)[1]
+            return package.split(os.sep, 1)[0].removesuffix(".py")
+    if filename.startswith("<"):
+        return filename  # <frozen importlib._bootstrap> and friends
+    return "stdlib"
+
+
+def allocation_diff(limit=15):
+    """Return [(module, size delta, count delta)] since the baseline."""
+    if _baseline is None:
+        return []
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+    sizes = Counter()
+    counts = Counter()
+    for stat in snapshot.compare_to(_baseline, "filename"):
+        module = module_name(stat.traceback[0].filename)
+        sizes[module] += stat.size_diff
+        counts[module] += stat.count_diff
+
+    ranked = sorted(sizes, key=lambda module: abs(sizes[module]), reverse=True)
+    return [(module, sizes[module], counts[module]) for module in ranked[:limit]]
+
+
+def gobject_counts(limit=15):
+    """Count live GObject wrappers by type."""
+    counts = Counter(
+        type(obj).__name__
+        for obj in gc.get_objects()
+        if isinstance(obj, GObject.Object)
+    )
+    return counts.most_common(limit)
+
+
+def open_fds():
+    """Count this process's open file descriptors by kind."""
+    kinds = Counter()
+    fd_dir = "/proc/self/fd"
+    for fd in os.listdir(fd_dir):
+        try:
+            target = os.readlink(os.path.join(fd_dir, fd))
+        except OSError:
+            continue  # closed while listing (e.g. the listdir fd itself)
+        if target.startswith("/"):
+            kinds["temp file" if TEMP_PREFIX in target else "file"] += 1
+        else:
+            # socket:[123], pipe:[456], anon_inode:[eventfd]
+            kinds[target.split(":", 1)[0]] += 1
+    return kinds
+
+
+def temp_usage():
+    """Return (entries, bytes) of mangobar temp files and directories."""
+    entries = 0
+    size = 0
+    root = tempfile.gettempdir()
+    for name in os.listdir(root):
+        if not name.startswith(TEMP_PREFIX):
+            continue
+        entries += 1
+        path = os.path.join(root, name)
+        for directory, _, files in os.walk(path):
+            for filename in files:
+                try:
+                    size += os.path.getsize(os.path.join(directory, filename))
+                except OSError:
+                    pass
+        if os.path.isfile(path):
+            size += os.path.getsize(path)
+    return entries, size
+
+
+def read_rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def format_report(limit=15, collector=None):
+    lines = [f"MangoBar memory report (pid {os.getpid()})"]
+    lines.append(f"  RSS: {read_rss_kb()} KiB")
+
+    if _baseline is None:
+        lines.append("  allocations: run with --trace-malloc for a per-module diff")
+    else:
+        lines.append("  allocations since startup, by module:")
+        for module, size, count in allocation_diff(limit):
+            lines.append(
+                f"    {module:36s} {size / 1024:+10.1f} KiB {count:+8d} blocks"
+            )
+
+    lines.append("  live GObjects:")
+    for name, count in gobject_counts(limit):
+        lines.append(f"    {name:36s} {count:8d}")
+
+    fds = open_fds()
+    lines.append(f"  open fds: {sum(fds.values())}")
+    for kind, count in fds.most_common():
+        lines.append(f"    {kind:36s} {count:8d}")
+
+    entries, size = temp_usage()
+    lines.append(
+        f"  temp files: {entries} {TEMP_PREFIX}* entries, {size / 1024:.1f} KiB"
+    )
+
+    lines.append(
+        f"  gc: counts {gc.get_count()}, frozen {gc.get_freeze_count()} objects"
+    )
+    if collector is not None:
+        lines.append(
+            f"  idle gc: {collector.collections} full collections, "
+            f"longest pause {collector.longest_pause * 1000:.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+def install_report_signal(signum=signal.SIGUSR1, collector=None):
+    """Print a memory report to stderr whenever the process gets `signum`."""
+
+    def on_signal():
+        try:
+            print(format_report(collector=collector), file=sys.stderr)
+        except Exception as e:
+            print(f"Error building memory report: {e}")
+        return True  # keep the handler installed
+
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signum, on_signal)
+
+
+class IdleCollector:
+    """Moves full garbage collections out of animation frames.
+
+    After startup the heap is frozen (startup objects never get rescanned)
+    and automatic gen-2 collections are disabled; a full collection is
+    instead requested every `interval` seconds and run from a low-priority
+    idle callback once no animation is playing.
+    """
+
+    # How long to wait before retrying while animations are playing
+    RETRY_MS = 250
+    # Stop waiting for animations after this many retries
+    MAX_DEFERRALS = 40
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self.collections = 0
+        self.longest_pause = 0.0
+        self._source_id = None
+        self._idle_id = None
+        self._deferrals = 0
+
+    def start(self):
+        gc.collect()
+        gc.freeze()
+        threshold0, threshold1, _ = gc.get_threshold()
+        gc.set_threshold(threshold0, threshold1, NEVER)
+        self._source_id = GLib.timeout_add_seconds(self.interval, self.request)
+
+    def stop(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+        if self._idle_id is not None:
+            GLib.source_remove(self._idle_id)
+            self._idle_id = None
+
+    def request(self):
+        if self._idle_id is None:
+            self._idle_id = GLib.idle_add(self.collect, priority=GLib.PRIORITY_LOW)
+        return True
+
+    def collect(self):
+        self._idle_id = None
+        if Animator.running and self._deferrals < self.MAX_DEFERRALS:
+            self._deferrals += 1
+            self._idle_id = GLib.timeout_add(self.RETRY_MS, self._retry)
+            return False
+        self._deferrals = 0
+
+        start = time.perf_counter()
+        gc.collect(2)
+        self.longest_pause = max(self.longest_pause, time.perf_counter() - start)
+        self.collections += 1
+        return False
+
+    def _retry(self):
+        self._idle_id = None
+        self.request()
+        return False
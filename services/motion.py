@@ -0,0 +1,99 @@
+from services.settings import load_config
+
+# Motion modes for gauge animations
+MOTION_FULL = "full"  # eased animation with overshoot
+MOTION_LINEAR = "linear"  # short linear step
+MOTION_JUMP = "jump"  # no animation, jump straight to the value
+MOTION_MODES = (MOTION_FULL, MOTION_LINEAR, MOTION_JUMP)
+
+# config.json "animations" section
+DEFAULT_ANIMATIONS = {
+    # Animation frames per second at most, whatever the refresh rate; 0 = no cap
+    "max_fps": 60,
+    "motion": MOTION_FULL,
+    # Widget names of gauges that never animate, e.g. "cpu-progress-bar"
+    "static_gauges": [],
+}
+
+# Duration of the step in linear mode, in seconds
+LINEAR_DURATION = 0.15
+# Cubic bezier whose y(t) is t, for the linear step
+LINEAR_CURVE = (0.0, 1 / 3, 1.0, 2 / 3)
+
+
+class FrameLimiter:
+    """Lets through at most `max_fps` frames per second of a faster clock.
+
+    Time is accumulated across skipped frames so the average rate matches
+    the cap on any refresh rate, and a frame arriving up to `tolerance` of a
+    period early still counts so jitter at an equal refresh rate does not
+    halve it.
+    """
+
+    def __init__(self, max_fps, tolerance=0.1):
+        self.period = 1 / max_fps if max_fps else 0.0
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self):
+        self._last = None
+        self._budget = 0.0
+
+    def ready(self, now):
+        """Whether the frame at monotonic time `now` (seconds) should run."""
+        if not self.period or self._last is None:
+            self._last = now
+            return True
+        self._budget += now - self._last
+        self._last = now
+        if self._budget < self.period * (1 - self.tolerance):
+            return False
+        # Keep the remainder, but never bank more than one frame
+        self._budget = min(max(self._budget - self.period, 0.0), self.period)
+        return True
+
+
+class MotionSettings:
+    """Animation settings from config.json and GTK's gtk-enable-animations."""
+
+    def __init__(self, config=None):
+        animations = dict(DEFAULT_ANIMATIONS)
+        section = (config if config is not None else load_config()).get(
+            "animations", {}
+        )
+        if isinstance(section, dict):
+            animations.update(section)
+
+        self.max_fps = max(int(animations["max_fps"] or 0), 0)
+        self.motion = animations["motion"]
+        if self.motion not in MOTION_MODES:
+            print(f"Error in config: unknown motion mode {self.motion!r}")
+            self.motion = MOTION_FULL
+        self.static_gauges = frozenset(animations["static_gauges"])
+        self._gtk_settings = None
+
+    def gtk_animations_enabled(self):
+        if self._gtk_settings is None:
+            from gi.repository import Gtk
+
+            self._gtk_settings = Gtk.Settings.get_default()
+        if self._gtk_settings is None:
+            return True
+        return self._gtk_settings.get_property("gtk-enable-animations")
+
+    def mode_for(self, name):
+        """Motion mode for the gauge with widget name `name`."""
+        if name in self.static_gauges or not self.gtk_animations_enabled():
+            return MOTION_JUMP
+        return self.motion
+
+
+_motion_settings = None
+
+
+def get_motion_settings():
+    """Return the MotionSettings shared by every gauge, read once per process."""
+    global _motion_settings
+    if _motion_settings is None:
+        _motion_settings = MotionSettings()
+    return _motion_settings
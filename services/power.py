@@ -0,0 +1,290 @@
+import os
+import socket
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib, GObject
+
+from services.trace import get_replayer, record
+
+# Not exported by the socket module
+NETLINK_KOBJECT_UEVENT = 15
+# Multicast group the kernel sends uevents to (udev re-broadcasts on 2)
+UEVENT_KERNEL_GROUP = 1
+
+# Some batteries only emit a uevent every few percent; re-read sysfs this
+# often to catch the drift in between.
+DRIFT_REFRESH_SECONDS = 300
+# Without a uevent socket (e.g. in a sandbox) sysfs is polled instead
+FALLBACK_REFRESH_SECONDS = 60
+
+# sysfs attributes read per supply; uevents carry the same names as
+# POWER_SUPPLY_<NAME> properties
+ATTRIBUTES = (
+    "type",
+    "online",
+    "status",
+    "capacity",
+    "energy_now",
+    "energy_full",
+    "power_now",
+    "charge_now",
+    "charge_full",
+    "current_now",
+)
+
+
+def parse_uevent(data):
+    """Parse a kernel uevent datagram into (action, {property: value}).
+
+    Messages look like b"change@/devices/...\\0ACTION=change\\0KEY=value...".
+    Returns None for anything else, such as udev's "libudev" re-broadcasts.
+    """
+    header, _, body = data.partition(b"\0")
+    if b"@" not in header:
+        return None
+    action = header.split(b"@", 1)[0].decode(errors="replace")
+    properties = {}
+    for field in body.split(b"\0"):
+        key, sep, value = field.partition(b"=")
+        if sep:
+            properties[key.decode(errors="replace")] = value.decode(
+                errors="replace"
+            )
+    return action, properties
+
+
+def read_supply(path):
+    """Read a power supply's attributes from its sysfs directory."""
+    attributes = {}
+    for name in ATTRIBUTES:
+        try:
+            with open(os.path.join(path, name), "r") as f:
+                attributes[name] = f.read().strip()
+        except OSError:
+            pass
+    return attributes
+
+
+def _number(attributes, name):
+    try:
+        return int(attributes[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def summarize(supplies):
+    """Combine per-supply attributes into the state the widget shows.
+
+    Capacity is weighted by each battery's full energy (or charge) when the
+    kernel reports it, and time remaining comes from the summed power draw.
+    """
+    batteries = [a for a in supplies.values() if a.get("type") == "Battery"]
+    mains = [a for a in supplies.values() if a.get("type") in ("Mains", "USB")]
+    ac = any(a.get("online") == "1" for a in mains)
+    if not batteries:
+        return {"present": False, "ac": ac}
+
+    capacity_sum = 0.0
+    weight_sum = 0
+    now_sum = full_sum = draw_sum = 0
+    statuses = []
+    for attributes in batteries:
+        statuses.append(attributes.get("status", "Unknown"))
+        now = _number(attributes, "energy_now")
+        full = _number(attributes, "energy_full")
+        draw = _number(attributes, "power_now")
+        if now is None or full is None:
+            now = _number(attributes, "charge_now")
+            full = _number(attributes, "charge_full")
+            draw = _number(attributes, "current_now")
+        capacity = _number(attributes, "capacity")
+        if capacity is None and now is not None and full:
+            capacity = round(now / full * 100)
+        if capacity is None:
+            continue
+
+        weight = full or 1
+        capacity_sum += capacity * weight
+        weight_sum += weight
+        now_sum += now or 0
+        full_sum += full or 0
+        draw_sum += abs(draw or 0)
+
+    if "Charging" in statuses:
+        status = "Charging"
+    elif "Discharging" in statuses:
+        status = "Discharging"
+    else:
+        status = statuses[0] if statuses else "Unknown"
+
+    seconds = None
+    if draw_sum:
+        if status == "Discharging":
+            seconds = round(now_sum / draw_sum * 3600)
+        elif status == "Charging" and full_sum:
+            seconds = round((full_sum - now_sum) / draw_sum * 3600)
+
+    return {
+        "present": True,
+        "ac": ac,
+        "status": status,
+        "capacity": round(capacity_sum / weight_sum) if weight_sum else 0,
+        "seconds": seconds,
+    }
+
+
+class PowerService(GObject.Object):
+    """Battery and AC state driven by kernel uevents instead of polling.
+
+    sysfs is read once at startup; after that, power_supply uevents from a
+    NETLINK_KOBJECT_UEVENT socket watched by the GLib loop update the state,
+    with only a slow re-read for capacity drift. `root` and `uevent_socket`
+    can point at a fake sysfs tree and any datagram socket for testing.
+    """
+
+    __gsignals__ = {
+        "changed": (GObject.SignalFlags.RUN_FIRST, None, (object,)),
+    }
+
+    def __init__(self, root="/", uevent_socket=None):
+        super().__init__()
+        self.supply_dir = os.path.join(root, "sys", "class", "power_supply")
+        self.supplies = {}
+        self.state = {"present": False, "ac": False}
+        self.uevents = 0
+        self._socket = None
+        self._watch_id = None
+        self._refresh_id = None
+
+        replayer = get_replayer()
+        if replayer is not None:
+            replayer.attach("power", self.set_state)
+            return
+
+        self.refresh()
+        self._socket = uevent_socket or self._open_uevent_socket()
+        if self._socket is not None:
+            self._watch_id = GLib.io_add_watch(
+                self._socket.fileno(),
+                GLib.PRIORITY_DEFAULT,
+                GLib.IO_IN,
+                self.on_uevent_ready,
+            )
+            interval = DRIFT_REFRESH_SECONDS
+        else:
+            interval = FALLBACK_REFRESH_SECONDS
+        self._refresh_id = GLib.timeout_add_seconds(interval, self.refresh)
+
+    @staticmethod
+    def _open_uevent_socket():
+        try:
+            sock = socket.socket(
+                socket.AF_NETLINK,
+                socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+                NETLINK_KOBJECT_UEVENT,
+            )
+            sock.bind((0, UEVENT_KERNEL_GROUP))
+            return sock
+        except (AttributeError, OSError) as e:
+            print(f"Error opening uevent socket, polling power supplies: {e}")
+            return None
+
+    def stop(self):
+        for source_id in (self._watch_id, self._refresh_id):
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self._watch_id = self._refresh_id = None
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def refresh(self):
+        """Re-read every supply from sysfs."""
+        try:
+            names = sorted(os.listdir(self.supply_dir))
+        except OSError:
+            names = []
+        self.supplies = {
+            name: read_supply(os.path.join(self.supply_dir, name)) for name in names
+        }
+        self.update_state()
+        return True  # keep the drift timer running
+
+    def on_uevent_ready(self, *_):
+        # Drain everything queued; the socket is non-blocking
+        while True:
+            try:
+                data = self._socket.recv(8192)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                print(f"Error reading uevent: {e}")
+                break
+            if not data:
+                break
+            self.handle_uevent(data)
+        return True  # keep watching
+
+    def handle_uevent(self, data):
+        parsed = parse_uevent(data)
+        if parsed is None:
+            return
+        action, properties = parsed
+        if properties.get("SUBSYSTEM") != "power_supply":
+            return
+        self.uevents += 1
+
+        name = properties.get("POWER_SUPPLY_NAME") or os.path.basename(
+            properties.get("DEVPATH", "")
+        )
+        if action == "remove":
+            self.supplies.pop(name, None)
+        else:
+            attributes = self.supplies.setdefault(name, {})
+            for key, value in properties.items():
+                if key.startswith("POWER_SUPPLY_"):
+                    attributes[key[len("POWER_SUPPLY_") :].lower()] = value
+            if "type" not in attributes:
+                # A supply that appeared after startup; sysfs has the rest
+                attributes.update(read_supply(os.path.join(self.supply_dir, name)))
+        self.update_state()
+
+    def update_state(self):
+        self.set_state(summarize(self.supplies))
+
+    def set_state(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        record("power", state)
+        self.emit("changed", state)
+
+
+_power_service = None
+
+
+def get_power_service():
+    """Return the PowerService shared by every bar in the process."""
+    global _power_service
+    if _power_service is None:
+        _power_service = PowerService()
+    return _power_service
+
+
+def has_battery(root="/"):
+    """Whether any battery is present, checked once at startup."""
+    supply_dir = os.path.join(root, "sys", "class", "power_supply")
+    try:
+        names = os.listdir(supply_dir)
+    except OSError:
+        return False
+    for name in names:
+        try:
+            with open(os.path.join(supply_dir, name, "type"), "r") as f:
+                if f.read().strip() == "Battery":
+                    return True
+        except OSError:
+            pass
+    return False
@@ -0,0 +1,263 @@
+import os
+import time
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib, GObject
+
+from services.trace import get_replayer, record
+
+PRESSURE_RESOURCES = ("cpu", "memory", "io")
+
+# A trigger fires once `some` tasks stalled this long (us) within a window
+TRIGGER_STALL_US = 150000
+TRIGGER_WINDOW_US = 1000000
+# Unprivileged triggers need a window that is a multiple of 2 s; the stall
+# threshold is scaled to keep the same share
+UNPRIVILEGED_WINDOW_US = 2000000
+
+# avg10 (percent) at or above which polling counts a resource as stalled,
+# and below which it counts as recovered
+STALL_PERCENT = 15.0
+RECOVERED_PERCENT = 5.0
+# While something is stalled its avg10 is re-read this often until it is
+# back to normal; nothing runs periodically while nothing is stalled
+RECOVERY_CHECK_SECONDS = 2
+# Read interval when triggers cannot be registered
+FALLBACK_POLL_SECONDS = 2
+
+
+def parse_pressure(text):
+    """Parse a /proc/pressure file into {"some": {...}, "full": {...}}.
+
+    Lines look like "some avg10=0.12 avg60=0.05 avg300=0.01 total=12345".
+    """
+    result = {}
+    for line in text.splitlines():
+        kind, *fields = line.split()
+        values = {}
+        for field in fields:
+            key, _, value = field.partition("=")
+            try:
+                values[key] = int(value) if key == "total" else float(value)
+            except ValueError:
+                continue
+        result[kind] = values
+    return result
+
+
+def has_pressure(root="/"):
+    """True if the kernel exposes pressure stall information (PSI)."""
+    return os.path.exists(os.path.join(root, "proc", "pressure", "cpu"))
+
+
+def open_trigger(path):
+    """Open a pressure file with a `some` threshold trigger registered on it.
+
+    Returns (fd, window in seconds); the fd becomes POLLPRI-readable each
+    time the threshold is crossed. Tries the 1 s window first, then the 2 s
+    window unprivileged processes are limited to.
+    """
+    error = None
+    for window in (TRIGGER_WINDOW_US, UNPRIVILEGED_WINDOW_US):
+        stall = TRIGGER_STALL_US * window // TRIGGER_WINDOW_US
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK | os.O_CLOEXEC)
+        try:
+            # The kernel expects the terminating NUL
+            os.write(fd, f"some {stall} {window}\0".encode())
+            return fd, window / 1e6
+        except OSError as e:
+            os.close(fd)
+            error = e
+    raise error
+
+
+class PressureService(GObject.Object):
+    """CPU, memory and I/O stall state from PSI threshold triggers.
+
+    A `some` trigger is registered on each /proc/pressure file and its fd
+    watched for POLLPRI on the GLib loop, so crossing the threshold is
+    reported as soon as the kernel sees it. While nothing is stalled there
+    are no timers; a stalled resource is re-read every few seconds until
+    it recovers. Where triggers cannot be registered (older kernels, a
+    fake `root`, or `triggers=False`) the files are polled instead.
+    """
+
+    __gsignals__ = {
+        "changed": (GObject.SignalFlags.RUN_FIRST, None, (object,)),
+    }
+
+    def __init__(self, root="/", triggers=None):
+        super().__init__()
+        self.pressure_dir = os.path.join(root, "proc", "pressure")
+        self.resources = [
+            name
+            for name in PRESSURE_RESOURCES
+            if os.path.exists(os.path.join(self.pressure_dir, name))
+        ]
+        self.state = {}
+        self.mode = None
+        # Trigger events handled and files read, for benchmarks
+        self.events = 0
+        self.reads = 0
+        self._fds = {}
+        self._watch_ids = {}
+        # Trigger window in seconds
+        self.window = 0.0
+        self._last_event = {}
+        self._timer_id = None
+
+        replayer = get_replayer()
+        if replayer is not None:
+            replayer.attach("pressure", self.set_state)
+            return
+
+        # Triggers only exist on the kernel's own files
+        if triggers is None:
+            triggers = root == "/"
+        if triggers and self._register_triggers():
+            self.mode = "triggers"
+        else:
+            self._start_polling()
+        self.poll()
+
+    def _register_triggers(self):
+        try:
+            for name in self.resources:
+                path = os.path.join(self.pressure_dir, name)
+                self._fds[name], self.window = open_trigger(path)
+        except OSError as e:
+            print(f"Error registering PSI triggers, polling pressure: {e}")
+            self._close_fds()
+            return False
+
+        for name, fd in self._fds.items():
+            self._watch_ids[name] = GLib.io_add_watch(
+                fd,
+                GLib.PRIORITY_DEFAULT,
+                GLib.IO_PRI | GLib.IO_ERR,
+                self.on_trigger,
+                name,
+            )
+        return True
+
+    def _close_fds(self):
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds = {}
+
+    def stop(self):
+        for source_id in list(self._watch_ids.values()) + [self._timer_id]:
+            if source_id is not None:
+                GLib.source_remove(source_id)
+        self._watch_ids = {}
+        self._timer_id = None
+        self._close_fds()
+
+    def read(self, name):
+        """Return the `some` averages of a resource."""
+        self.reads += 1
+        data = os.pread(self._fds[name], 4096, 0)
+        return parse_pressure(data.decode()).get("some", {})
+
+    def _entry(self, name, stalled):
+        try:
+            values = self.read(name)
+        except OSError as e:
+            print(f"Error reading pressure for {name}: {e}")
+            values = {}
+        avg10 = values.get("avg10", 0.0)
+        if stalled is None:
+            # Polling: threshold with hysteresis on the 10 s average
+            was_stalled = self.state.get(name, {}).get("stalled", False)
+            limit = RECOVERED_PERCENT if was_stalled else STALL_PERCENT
+            stalled = avg10 >= limit
+        return {
+            "stalled": stalled,
+            "avg10": avg10,
+            "avg60": values.get("avg60", 0.0),
+            "avg300": values.get("avg300", 0.0),
+        }
+
+    def poll(self):
+        """Re-read every resource; the fallback timer and startup use this."""
+        state = {name: self._entry(name, None) for name in self.resources}
+        self.set_state(state)
+        if self.mode == "triggers":
+            self._check_recovery_later()
+        return True  # keep the fallback timer running
+
+    def on_trigger(self, _fd, condition, name):
+        if condition & GLib.IO_ERR:
+            print(f"PSI trigger for {name} failed, polling pressure")
+            self._watch_ids.pop(name, None)
+            self.stop()
+            self._start_polling()
+            return False
+
+        self.events += 1
+        self._last_event[name] = time.monotonic()
+        state = dict(self.state)
+        state[name] = self._entry(name, True)
+        self.set_state(state)
+        self._check_recovery_later()
+        return True  # keep watching
+
+    def _check_recovery_later(self):
+        stalled = any(entry["stalled"] for entry in self.state.values())
+        if stalled and self._timer_id is None:
+            self._timer_id = GLib.timeout_add_seconds(
+                RECOVERY_CHECK_SECONDS, self.check_recovery
+            )
+
+    def check_recovery(self):
+        """Clear a stall once its trigger has been quiet for two windows.
+
+        avg10 lags several seconds behind, so it only decides for stalls
+        seen at startup, before any trigger fired.
+        """
+        now = time.monotonic()
+        state = dict(self.state)
+        for name, entry in self.state.items():
+            if not entry["stalled"]:
+                continue
+            entry = self._entry(name, True)
+            last_event = self._last_event.get(name)
+            if last_event is None:
+                entry["stalled"] = entry["avg10"] >= RECOVERED_PERCENT
+            else:
+                entry["stalled"] = now - last_event < 2 * self.window
+            state[name] = entry
+        self.set_state(state)
+
+        if any(entry["stalled"] for entry in state.values()):
+            return True
+        self._timer_id = None
+        return False
+
+    def _start_polling(self):
+        self.mode = "polling"
+        # Kept open and re-read with pread, like the other procfs readers
+        for name in self.resources:
+            path = os.path.join(self.pressure_dir, name)
+            self._fds[name] = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        self._timer_id = GLib.timeout_add_seconds(FALLBACK_POLL_SECONDS, self.poll)
+
+    def set_state(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        record("pressure", state)
+        self.emit("changed", state)
+
+
+_pressure_service = None
+
+
+def get_pressure_service():
+    """Return the PressureService shared by every bar in the process."""
+    global _pressure_service
+    if _pressure_service is None:
+        _pressure_service = PressureService()
+    return _pressure_service
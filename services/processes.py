@@ -0,0 +1,83 @@
+import threading
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib, GObject
+
+from services.procfs import ProcessScanner
+
+
+class ProcessMonitor(GObject.Object):
+    """Runs a ProcessScanner on a worker thread while anyone is watching.
+
+    `acquire()`/`release()` count the open views; scanning only happens
+    while the count is above zero. Snapshots are immutable tuples handed to
+    the main loop with GLib.idle_add and emitted as "updated".
+    """
+
+    __gsignals__ = {
+        "updated": (GObject.SignalFlags.RUN_FIRST, None, (object,)),
+    }
+
+    def __init__(self, interval=1.0, scanner=None):
+        super().__init__()
+        self.interval = interval
+        self.scanner = scanner or ProcessScanner()
+        self.snapshot = None
+        self._users = 0
+        self._stop = None
+        self._thread = None
+
+    def acquire(self):
+        self._users += 1
+        if self._users == 1:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run,
+                args=(self._stop, self._thread),
+                name="process-scan",
+                daemon=True,
+            )
+            self._thread.start()
+        elif self.snapshot is not None:
+            self.emit("updated", self.snapshot)
+
+    def release(self):
+        if self._users == 0:
+            return
+        self._users -= 1
+        if self._users == 0:
+            self._stop.set()
+
+    def _run(self, stop, previous):
+        # A re-acquire can start this thread while the previous one is still
+        # inside scanner.scan(); wait for it here rather than on the main
+        # loop, so the two never touch the scanner's state at once
+        if previous is not None:
+            previous.join()
+        while not stop.is_set():
+            try:
+                snapshot = self.scanner.scan()
+            except Exception as e:
+                print(f"Error scanning processes: {e}")
+            else:
+                GLib.idle_add(self._publish, snapshot, stop)
+            stop.wait(self.interval)
+
+    def _publish(self, snapshot, stop):
+        if not stop.is_set():
+            self.snapshot = snapshot
+            self.emit("updated", snapshot)
+        return False
+
+
+_process_monitor = None
+
+
+def get_process_monitor():
+    """Return the ProcessMonitor shared by every bar in the process."""
+    global _process_monitor
+    if _process_monitor is None:
+        _process_monitor = ProcessMonitor()
+    return _process_monitor
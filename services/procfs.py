@@ -0,0 +1,692 @@
+import glob
+import heapq
+import os
+import re
+import time
+from collections import namedtuple
+from fnmatch import fnmatch
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# /proc/stat columns that count as idle time: idle and iowait
+IDLE_COLUMNS = (3, 4)
+# /proc/stat columns for guest time, already included in user/nice
+GUEST_COLUMNS = (8, 9)
+idle_columns = itemgetter(*IDLE_COLUMNS)
+# End of the per-core block in /proc/stat
+NOT_CPU_LINE = re.compile(rb"\n(?!cpu)")
+# scaling_cur_freq files read per CpuCoreReader tick; with more cores than
+# this, each core's frequency is refreshed every cores / FREQ_READS_PER_TICK
+# ticks instead of every tick
+FREQ_READS_PER_TICK = 16
+# Per-core /proc/stat rows parsed per CpuCoreReader tick; with more cores
+# than this, each core's utilization is refreshed every cores /
+# CORES_PER_TICK ticks, measured over the whole time since its last refresh
+CORES_PER_TICK = 64
+
+
+class ProcFile:
+    """A procfs/sysfs file kept open and re-read in place.
+
+    Every `read()` is a `preadv` into the same bytearray, so polling costs
+    no open/close or buffer allocation. seq_file-backed files such as
+    /proc/net/dev return at most about a page per call, so reads continue
+    at increasing offsets until one returns nothing.
+    """
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        self.buffer = bytearray(size)
+        self.length = 0
+
+    def read(self):
+        """Refresh the buffer and return the number of valid bytes."""
+        length = 0
+        while True:
+            if length == len(self.buffer):
+                # File outgrew the buffer; grow and keep the larger size
+                self.buffer.extend(bytes(len(self.buffer)))
+            count = os.preadv(self.fd, [memoryview(self.buffer)[length:]], length)
+            if count == 0:
+                break
+            length += count
+        self.length = length
+        return length
+
+    def read_int(self):
+        # Single-value sysfs attributes are generated whole on the first
+        # read, so the end-of-file read that read() adds is skipped
+        length = self.length = os.preadv(self.fd, [self.buffer], 0)
+        return int(self.buffer[:length])
+
+    def find_int(self, key, start=0):
+        """Return the first integer after `key` (e.g. b"MemTotal:"), or None."""
+        pos = self.buffer.find(key, start, self.length)
+        if pos < 0:
+            return None
+        start = pos + len(key)
+        end = self.buffer.find(b"\n", start, self.length)
+        if end < 0:
+            end = self.length
+        return int(self.buffer[start:end].split()[0])
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+def open_proc_file(path):
+    """Open a ProcFile, or return None if the file does not exist."""
+    try:
+        return ProcFile(path)
+    except OSError:
+        return None
+
+
+class ProcReader:
+    """CPU, RAM and uptime readings straight from persistent procfs handles.
+
+    Replaces `psutil.cpu_percent()`, `psutil.virtual_memory().percent` and
+    `psutil.boot_time()` on the hot path: /proc/stat and /proc/meminfo stay
+    open, only the needed fields are parsed, and boot time is read once.
+    """
+
+    def __init__(self, root="/"):
+        self.stat = ProcFile(os.path.join(root, "proc", "stat"))
+        self.meminfo = ProcFile(os.path.join(root, "proc", "meminfo"))
+        self.stat.read()
+        self.boot_time = self.stat.find_int(b"\nbtime ")
+        self._last_busy, self._last_total = self._read_cpu_times()
+
+    def _read_cpu_times(self):
+        # The aggregate "cpu  ..." line is always first
+        self.stat.read()
+        end = self.stat.buffer.find(b"\n", 0, self.stat.length)
+        fields = [int(v) for v in self.stat.buffer[4:end].split()]
+        guest = sum(fields[i] for i in GUEST_COLUMNS if i < len(fields))
+        total = sum(fields) - guest
+        idle = sum(fields[i] for i in IDLE_COLUMNS)
+        return total - idle, total
+
+    def cpu_percent(self):
+        """CPU utilization since the previous call, like psutil.cpu_percent()."""
+        busy, total = self._read_cpu_times()
+        busy_delta = busy - self._last_busy
+        total_delta = total - self._last_total
+        self._last_busy, self._last_total = busy, total
+        if total_delta <= 0:
+            return 0.0
+        return round(min(max(busy_delta / total_delta, 0.0), 1.0) * 100, 1)
+
+    def ram_percent(self):
+        """Used RAM percent, like psutil.virtual_memory().percent."""
+        self.meminfo.read()
+        total = self.meminfo.find_int(b"MemTotal:")
+        available = self.meminfo.find_int(b"MemAvailable:")
+        if not total or available is None:
+            return 0.0
+        return round((total - available) / total * 100, 1)
+
+    def uptime(self):
+        """System uptime in seconds, from the boot time read at startup."""
+        return time.time() - self.boot_time
+
+
+class CpuCoreReader:
+    """Per-core CPU utilization and frequency from procfs/sysfs.
+
+    Each call to `read()` re-reads /proc/stat through a persistent handle
+    and parses the next CORES_PER_TICK per-core rows, round-robin, into the
+    (total, idle) jiffies kept per core from earlier calls; utilization of
+    those rows comes from a single vector operation over their deltas.
+    Frequencies are read the same way, at most FREQ_READS_PER_TICK files
+    per call, so past those limits the parsing cost per call does not grow
+    with the core count. `root` can point at a fake filesystem tree for
+    testing.
+    """
+
+    def __init__(self, root="/"):
+        self.root = root
+        self.stat = ProcFile(os.path.join(root, "proc", "stat"))
+        self.freq_paths = self._find_freq_paths()
+        self.freq_files = [open_proc_file(path) for path in self.freq_paths]
+        self.max_freq = self._read_max_freq()
+        # Core numbers, (total, idle) jiffies and utilization of every
+        # core, a CORES_PER_TICK window of which is refreshed per read()
+        self._cores = None
+        self._times = None
+        self._usage = None
+        self._next_core = 0
+        # Offset in the stat buffer where the last parsed window ended
+        self._window_end = 0
+        if np is not None:
+            self._freqs = np.zeros(len(self.freq_files), dtype=np.float32)
+        else:
+            self._freqs = [0] * len(self.freq_files)
+        self._next_freq = 0
+        self.read_freqs(limit=len(self.freq_files))
+
+    def _find_freq_paths(self):
+        pattern = os.path.join(
+            self.root, "sys", "devices", "system", "cpu", "cpu*", "cpufreq"
+        )
+        paths = []
+        for path in glob.glob(pattern):
+            match = re.search(r"cpu(\d+)", os.path.basename(os.path.dirname(path)))
+            if match:
+                paths.append((int(match.group(1)), path))
+        return [os.path.join(path, "scaling_cur_freq") for _, path in sorted(paths)]
+
+    def _read_max_freq(self):
+        highest = 0
+        for path in self.freq_paths:
+            max_path = os.path.join(os.path.dirname(path), "cpuinfo_max_freq")
+            try:
+                with open(max_path, "r") as f:
+                    highest = max(highest, int(f.read()))
+            except (OSError, ValueError):
+                pass
+        return highest or None
+
+    def read_jiffies(self, cores=None):
+        """Return (core numbers, jiffy counters) of the per-core rows.
+
+        The counters are a (rows x columns) matrix. `cores` limits parsing
+        to a run of consecutive rows, given by their core numbers; then the
+        result is None if the per-core rows changed since the last full
+        parse, as after CPU hotplug.
+        """
+        length = self.stat.read()
+        buffer = self.stat.buffer
+
+        # Per-core lines "cpuN ..." directly follow the aggregate "cpu ..."
+        # line, the only one not preceded by a newline
+        start = buffer.find(b"\ncpu", 0, length) + 1
+        if start == 0:
+            return self._parse_rows(b"", 0)
+        if cores is None:
+            # The block ends at the first line that is not a cpu line
+            end = NOT_CPU_LINE.search(buffer, start, length)
+            end = end.start() if end else length
+            block = bytes(buffer[start:end]).rstrip(b"\n")
+            return self._parse_rows(block, block.count(b"\n") + 1)
+
+        # Jump to the requested rows instead of splitting the whole block.
+        # Counters only grow, so rows never move back from where the
+        # previous window ended; after hotplug a row is missing, out of
+        # place, or follows the last one, and the window is rejected.
+        hint = self._window_end if cores[0] != self._cores[0] else start - 1
+        first = buffer.find(b"\ncpu%d " % cores[0], hint, length) + 1
+        last = buffer.find(b"\ncpu%d " % cores[-1], first - 1, length) + 1
+        if first == 0 or last == 0:
+            return None
+        end = buffer.find(b"\n", last, length)
+        end = length if end == -1 else end
+        if cores[-1] == self._cores[-1] and buffer.startswith(b"\ncpu", end):
+            return None
+        block = bytes(buffer[first:end])
+        if block.count(b"\n") + 1 != len(cores):
+            return None
+        numbers, jiffies = self._parse_rows(block, len(cores))
+        if list(numbers) != list(cores):
+            return None
+        self._window_end = end
+        return numbers, jiffies
+
+    @staticmethod
+    def _parse_rows(block, rows):
+        if not rows or not block:
+            if np is not None:
+                return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.int64)
+            return [], []
+        # Dropping the letters of "cpu" leaves the core number as column 0
+        numbers = block.translate(None, b"cpu")
+        if np is not None:
+            flat = np.fromstring(numbers, dtype=np.int64, sep=" ")
+            matrix = flat.reshape(rows, -1)
+            return matrix[:, 0], matrix[:, 1:]
+        flat = list(map(int, numbers.split()))
+        width = len(flat) // rows
+        return flat[::width], [flat[i + 1 : i + width] for i in range(0, len(flat), width)]
+
+    def read_freqs(self, limit=FREQ_READS_PER_TICK):
+        """Return per-core frequencies in kHz (0 where unavailable).
+
+        Only the next `limit` cores, round-robin, are re-read; the rest keep
+        their last reading, so the cost per call does not grow with the core
+        count past `limit`.
+        """
+        count = len(self.freq_files)
+        for _ in range(min(count, limit)):
+            index = self._next_freq
+            self._next_freq = (index + 1) % count
+            freq_file = self.freq_files[index]
+            try:
+                self._freqs[index] = freq_file.read_int() if freq_file else 0
+            except (OSError, ValueError):
+                self._freqs[index] = 0
+        return self._freqs.copy() if np is not None else list(self._freqs)
+
+    def read(self):
+        """Return (utilization, frequency) per core, each scaled to 0..1.
+
+        The first call, and the first after the core count changes (CPU
+        hotplug), parses every core and reports zero utilization, having no
+        previous counters to diff against. Frequency is relative to the
+        highest cpuinfo_max_freq, or empty when cpufreq is not available.
+        """
+        first = self._next_core
+        window = None
+        if self._cores is not None:
+            window = self.read_jiffies(self._cores[first : first + CORES_PER_TICK])
+
+        if window is None:
+            # First call or CPU hotplug: start over from every core
+            cores, jiffies = self.read_jiffies()
+            self._times = self._row_times(jiffies)
+            self._cores = list(cores)
+            self._next_core = 0
+            if np is not None:
+                self._usage = np.zeros(len(self._cores), dtype=np.float32)
+            else:
+                self._usage = [0.0] * len(self._cores)
+        else:
+            current = window[1]
+            self._update_usage(first, current)
+            self._next_core = first + len(current)
+            if self._next_core >= len(self._cores):
+                self._next_core = 0
+
+        if np is not None:
+            freqs = self.read_freqs()
+            if self.max_freq:
+                freqs /= self.max_freq
+            return self._usage.copy(), freqs
+
+        freqs = self.read_freqs()
+        if self.max_freq:
+            freqs = [freq / self.max_freq for freq in freqs]
+        return list(self._usage), freqs
+
+    @staticmethod
+    def _row_times(jiffies):
+        """Return (total, idle) jiffies per row of a jiffy matrix.
+
+        With NumPy these are two vectors, a total and an idle column.
+        """
+        if np is not None:
+            return jiffies.sum(axis=1), jiffies[:, IDLE_COLUMNS].sum(axis=1)
+        return [(sum(row), sum(idle_columns(row))) for row in jiffies]
+
+    def _update_usage(self, first, current):
+        times = self._row_times(current)
+        if np is not None:
+            last = first + len(current)
+            totals, idles = self._times
+            total = times[0] - totals[first:last]
+            idle = times[1] - idles[first:last]
+            totals[first:last], idles[first:last] = times
+            np.divide(
+                total - idle,
+                total,
+                out=self._usage[first:last],
+                where=total > 0,
+                casting="unsafe",
+            )
+            return
+
+        for index, (total, idle) in enumerate(times, first):
+            last_total, last_idle = self._times[index]
+            self._times[index] = (total, idle)
+            total -= last_total
+            if total > 0:
+                self._usage[index] = (total - idle + last_idle) / total
+
+
+# /proc/diskstats always counts in 512-byte sectors, whatever the device
+SECTOR_SIZE = 512
+
+# Default fnmatch patterns for IoReader. Container, bridge and VPN interfaces
+# mirror traffic the physical interfaces already count, and only whole
+# disks are summed so partitions are not counted twice.
+IO_INTERFACES = ("*",)
+IO_EXCLUDE_INTERFACES = ("lo", "veth*", "docker*", "br-*", "virbr*", "tun*", "wg*")
+IO_DEVICES = ("sd[a-z]", "vd[a-z]", "xvd[a-z]", "nvme[0-9]*n[0-9]", "mmcblk[0-9]")
+IO_EXCLUDE_DEVICES = ()
+# Interfaces whose drivers keep 32-bit statistics, so their /proc/net/dev
+# counters wrap at 2**32 instead of growing to 64 bits
+IO_WRAP32_INTERFACES = ()
+
+
+def counter_delta(current, previous, width=None):
+    """Difference between two counter readings.
+
+    A counter below its previous value either wrapped or was reset, because
+    the interface or device was re-created. The width of a counter cannot
+    be told from its value, so a wrap is only assumed when `width` (in bits)
+    is known and the wrapped difference is plausible: at most half the
+    counter's range. Otherwise the counter is counted from zero; assuming a
+    wrap would report a reset 64-bit counter as a spike of up to 4 GiB,
+    while assuming a reset only under-reports the one tick a wrap lands in.
+    """
+    if current >= previous:
+        return current - previous
+    if width is not None and previous < 1 << width:
+        wrapped = current + (1 << width) - previous
+        if wrapped <= 1 << (width - 1):
+            return wrapped
+    return current
+
+
+class NameFilter:
+    """fnmatch include/exclude patterns with a per-name result cache.
+
+    Names are matched once and remembered, so hundreds of container or VPN
+    interfaces cost a dict lookup per tick instead of a pattern match.
+    """
+
+    def __init__(self, include=("*",), exclude=()):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self._cache = {}
+
+    def __call__(self, name):
+        """Match a str or raw procfs bytes name."""
+        matched = self._cache.get(name)
+        if matched is None:
+            text = name.decode() if isinstance(name, bytes) else name
+            matched = any(fnmatch(text, p) for p in self.include) and not any(
+                fnmatch(text, p) for p in self.exclude
+            )
+            self._cache[name] = matched
+        return matched
+
+
+class IoReader:
+    """Network and disk throughput from /proc/net/dev and /proc/diskstats.
+
+    Each `read()` re-reads both files through persistent handles and turns
+    the byte, sector and I/O counters of the matching interfaces and devices
+    into per-second rates since the previous call.
+
+    Filtering happens in a full scan that builds a search key for each
+    matching entry. Later ticks jump straight to those entries with `find`
+    on the read buffer and never parse the lines of filtered-out entries,
+    so hundreds of veth or loop entries add almost nothing per tick. A
+    rescan runs when a tracked entry disappears and every RESCAN_EVERY ticks
+    to pick up new ones. Counters of interfaces matching `wrap32_interfaces`
+    are diffed as 32-bit counters that wrap. `root` can point at a fake
+    filesystem tree for testing.
+    """
+
+    RESCAN_EVERY = 30
+
+    def __init__(
+        self,
+        root="/",
+        interfaces=IO_INTERFACES,
+        exclude_interfaces=IO_EXCLUDE_INTERFACES,
+        devices=IO_DEVICES,
+        exclude_devices=IO_EXCLUDE_DEVICES,
+        wrap32_interfaces=IO_WRAP32_INTERFACES,
+    ):
+        self.net_dev = ProcFile(os.path.join(root, "proc", "net", "dev"))
+        self.diskstats = ProcFile(os.path.join(root, "proc", "diskstats"))
+        self.interface_filter = NameFilter(interfaces, exclude_interfaces)
+        self.device_filter = NameFilter(devices, exclude_devices)
+        self.wrap32_filter = NameFilter(wrap32_interfaces)
+        # {name: search key} of the matching entries, per file
+        self._net_index = {}
+        self._disk_index = {}
+        self._ticks = 0
+        self._previous_net = {}
+        self._previous_disk = {}
+        self._previous_time = None
+
+    @staticmethod
+    def _parse_net(fields):
+        # rx_bytes ... (8 rx fields) tx_bytes ...
+        values = fields.split()
+        return int(values[0]), int(values[8])
+
+    @staticmethod
+    def _parse_disk(fields):
+        # reads merged sectors ms writes merged sectors ...
+        values = fields.split()
+        return (
+            int(values[2]) * SECTOR_SIZE,
+            int(values[6]) * SECTOR_SIZE,
+            int(values[0]),
+            int(values[4]),
+        )
+
+    def _lookup(self, data, length, keys, parse):
+        """Parse only the indexed entries, or return None if one is gone."""
+        counters = {}
+        # Keys are in file order, so each search continues where the last
+        # one ended and the whole lookup is a single pass over the data
+        end = 0
+        for name, key in keys.items():
+            pos = data.find(key, end, length)
+            if pos < 0:
+                pos = data.find(key, 0, length)
+                if pos < 0:
+                    return None
+            start = pos + len(key)
+            end = data.find(b"\n", start, length)
+            if end < 0:
+                end = length
+            counters[name] = parse(data[start:end])
+        return counters
+
+    def _read_indexed(self, proc_file, index, scan, parse):
+        length = proc_file.read()
+        # Searched in place in the file's buffer; no per-tick copy
+        data = proc_file.buffer
+        if index and self._ticks % self.RESCAN_EVERY:
+            counters = self._lookup(data, length, index, parse)
+            if counters is not None:
+                return counters
+        index.clear()
+        index.update(scan(bytes(data[:length])))
+        return self._lookup(data, length, index, parse) or {}
+
+    def _scan_net(self, data):
+        keys = {}
+        # Two header lines, then "%6s:" names, right-aligned
+        for line in data.split(b"\n")[2:]:
+            name, _, fields = line.partition(b":")
+            name = name.strip()
+            if fields and self.interface_filter(name):
+                prefix = b" " if len(name) < 6 else b"\n"
+                keys[name.decode()] = prefix + name + b":"
+        return keys
+
+    def _scan_disk(self, data):
+        keys = {}
+        # "major minor name reads merged sectors ms writes merged sectors ..."
+        for line in data.split(b"\n"):
+            values = line.split(None, 3)
+            if len(values) == 4 and self.device_filter(values[2]):
+                keys[values[2].decode()] = b" " + values[2] + b" "
+        return keys
+
+    def read_net(self):
+        """Return {interface: (rx bytes, tx bytes)} for matching interfaces."""
+        return self._read_indexed(
+            self.net_dev, self._net_index, self._scan_net, self._parse_net
+        )
+
+    def read_disk(self):
+        """Return {device: (read bytes, written bytes, reads, writes)}."""
+        return self._read_indexed(
+            self.diskstats, self._disk_index, self._scan_disk, self._parse_disk
+        )
+
+    def read(self):
+        """Return per-second rates since the previous call.
+
+        The result holds totals ("rx", "tx", "read", "write", "read_iops",
+        "write_iops") plus "interfaces" {name: (rx, tx)} and "devices"
+        {name: (read, write, read_iops, write_iops)}. The first call has no
+        previous counters and reports zero rates.
+        """
+        now = time.monotonic()
+        net = self.read_net()
+        disk = self.read_disk()
+        self._ticks += 1
+        elapsed = now - self._previous_time if self._previous_time else 0.0
+        self._previous_time = now
+
+        interfaces = {
+            name: self._rates(
+                current,
+                self._previous_net.get(name),
+                elapsed,
+                32 if self.wrap32_filter(name) else None,
+            )
+            for name, current in net.items()
+        }
+        devices = {
+            name: self._rates(current, self._previous_disk.get(name), elapsed)
+            for name, current in disk.items()
+        }
+        self._previous_net = net
+        self._previous_disk = disk
+
+        return {
+            "rx": sum(rates[0] for rates in interfaces.values()),
+            "tx": sum(rates[1] for rates in interfaces.values()),
+            "read": sum(rates[0] for rates in devices.values()),
+            "write": sum(rates[1] for rates in devices.values()),
+            "read_iops": sum(rates[2] for rates in devices.values()),
+            "write_iops": sum(rates[3] for rates in devices.values()),
+            "interfaces": interfaces,
+            "devices": devices,
+        }
+
+    @staticmethod
+    def _rates(current, previous, elapsed, width=None):
+        if previous is None or elapsed <= 0:
+            return (0.0,) * len(current)
+        return tuple(
+            counter_delta(cur, prev, width) / elapsed
+            for cur, prev in zip(current, previous)
+        )
+
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+# Fields of /proc/<pid>/stat after the ")" that closes the command name
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_STARTTIME = 19
+STAT_RSS = 21
+
+ProcessInfo = namedtuple("ProcessInfo", "pid name cmdline cpu rss")
+ProcessSnapshot = namedtuple("ProcessSnapshot", "by_cpu by_rss count")
+
+
+def read_small_file(path):
+    # Cheaper than open() for thousands of tiny procfs files per scan
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        return os.read(fd, 4096)
+    finally:
+        os.close(fd)
+
+
+class ProcessScanner:
+    """Incremental /proc walk for the top processes by CPU and memory.
+
+    Each scan reads only /proc/<pid>/stat; name and command line never
+    change for a process, so they are read once, and only for processes
+    that make it into a top-N list. A PID is keyed together with its start
+    time so a reused PID is treated as a new process. `root` can point at a
+    fake filesystem tree for testing.
+    """
+
+    def __init__(self, root="/", limit=8):
+        self.proc_dir = os.path.join(root, "proc")
+        self.limit = limit
+        # pid -> (start time, cpu ticks at the last scan)
+        self._times = {}
+        # (pid, start time) -> (name, cmdline)
+        self._static = {}
+        self._last_scan = None
+
+    def scan(self):
+        """Return a ProcessSnapshot with CPU usage since the previous scan."""
+        now = time.monotonic()
+        elapsed = now - self._last_scan if self._last_scan else 0.0
+        self._last_scan = now
+        # CPU percent of one core per tick, like top
+        scale = 100 / (elapsed * CLOCK_TICKS) if elapsed else 0.0
+
+        previous = self._times
+        current = {}
+        rows = []
+        with os.scandir(self.proc_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.isdigit():
+                    continue
+                try:
+                    stat = read_small_file(f"{self.proc_dir}/{name}/stat")
+                except OSError:
+                    continue  # exited while we were scanning
+                fields = stat.rsplit(b")", 1)[1].split()
+                pid = int(name)
+                start = int(fields[STAT_STARTTIME])
+                ticks = int(fields[STAT_UTIME]) + int(fields[STAT_STIME])
+                current[pid] = (start, ticks)
+
+                last = previous.get(pid)
+                cpu = (ticks - last[1]) * scale if last and last[0] == start else 0.0
+                rows.append((pid, start, cpu, int(fields[STAT_RSS]) * PAGE_SIZE))
+        self._times = current
+
+        by_cpu = heapq.nlargest(self.limit, rows, key=lambda row: row[2])
+        by_rss = heapq.nlargest(self.limit, rows, key=lambda row: row[3])
+        snapshot = ProcessSnapshot(
+            tuple(self._info(row) for row in by_cpu),
+            tuple(self._info(row) for row in by_rss),
+            len(rows),
+        )
+
+        # Forget static data of processes that have exited
+        if len(self._static) > 4 * self.limit:
+            self._static = {
+                key: value
+                for key, value in self._static.items()
+                if current.get(key[0], (None,))[0] == key[1]
+            }
+        return snapshot
+
+    def _info(self, row):
+        pid, start, cpu, rss = row
+        static = self._static.get((pid, start))
+        if static is None:
+            static = self._read_static(pid)
+            self._static[(pid, start)] = static
+        return ProcessInfo(pid, static[0], static[1], cpu, rss)
+
+    def _read_static(self, pid):
+        base = f"{self.proc_dir}/{pid}"
+        try:
+            name = read_small_file(f"{base}/comm").decode(errors="replace").strip()
+        except OSError:
+            name = str(pid)
+        try:
+            cmdline = read_small_file(f"{base}/cmdline").replace(b"\0", b" ").strip()
+            cmdline = cmdline.decode(errors="replace")
+        except OSError:
+            cmdline = ""
+        return name, cmdline or name
@@ -0,0 +1,221 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib, GObject
+
+from services.trace import record
+
+# Worker threads shared by every threaded sampler. A stalled source holds on
+# to one of them, so keep a few spare for the rest.
+POOL_SIZE = 4
+
+_pool = None
+
+
+def get_sampling_pool():
+    """Return the thread pool that runs blocking sampler reads."""
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=POOL_SIZE, thread_name_prefix="sampler"
+        )
+    return _pool
+
+
+def freeze(value):
+    """Make a reading safe to hand from a worker thread to the main loop.
+
+    Lists become tuples and NumPy arrays are marked read-only, so nothing a
+    subscriber receives can be changed behind its back. Readers already
+    build a fresh object per reading; dicts are frozen value by value.
+    """
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            value[key] = freeze(item)
+        return value
+    if hasattr(value, "setflags"):
+        value.setflags(write=False)
+    return value
+
+
+class Sampler(GObject.Object):
+    """Polls a data source on a timer and shares each reading with all subscribers.
+
+    Polling only runs while at least one subscriber is attached, so a source
+    shared by several bars (or by none) is sampled at most once per interval.
+    With `poll_from=None` nothing is polled and readings arrive via `push()`
+    (e.g. from a trace replay).
+
+    With an `executor` the read itself runs on a worker thread and only the
+    frozen result is delivered on the main loop, so a slow sensor or driver
+    never stalls drawing. At most one read per source is in flight: while a
+    read is outstanding ticks are skipped, and one that takes longer than
+    `timeout` ms is reported as stalled.
+    """
+
+    __gsignals__ = {
+        "changed": (GObject.SignalFlags.RUN_FIRST, None, (object,)),
+    }
+
+    def __init__(
+        self, poll_from, interval=1000, name=None, executor=None, timeout=None
+    ):
+        super().__init__()
+        self.poll_from = poll_from
+        self.interval = interval
+        self.name = name or getattr(poll_from, "__name__", "sampler")
+        self.executor = executor
+        self.timeout = timeout or interval
+        self.value = None
+        self.stalls = 0  # reads that exceeded the timeout
+        self._source_id = None
+        self._handlers = set()
+        # monotonic time the in-flight read was submitted
+        self._pending_since = None
+        self._stalled = False
+
+    def subscribe(self, callback, widget=None):
+        """Call `callback(value)` on every reading.
+
+        When `widget` is given the subscription is dropped automatically once
+        the widget is destroyed (e.g. its bar's monitor was unplugged).
+        """
+        handler_id = self.connect("changed", lambda _, value: callback(value))
+        self._handlers.add(handler_id)
+
+        if self._source_id is None and self.poll_from is not None:
+            self.start()
+        elif self.value is not None:
+            callback(self.value)
+
+        if widget is not None:
+            widget.connect("destroy", lambda *_: self.unsubscribe(handler_id))
+        return handler_id
+
+    def unsubscribe(self, handler_id):
+        if handler_id not in self._handlers:
+            return
+        self._handlers.discard(handler_id)
+        self.disconnect(handler_id)
+        if not self._handlers:
+            self.stop()
+
+    def start(self):
+        if self._source_id is not None or self.poll_from is None:
+            return
+        self.poll()
+        self._source_id = GLib.timeout_add(self.interval, self.poll)
+
+    def stop(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def poll(self):
+        if self.executor is not None:
+            self.poll_in_worker()
+            return True
+
+        try:
+            value = self.poll_from()
+        except Exception as e:
+            print(f"Error polling {self.name}: {e}")
+            return True
+
+        record(f"sampler:{self.name}", value)
+        self.push(value)
+        return True  # continue polling
+
+    def poll_in_worker(self):
+        if self._pending_since is not None:
+            waited = (time.monotonic() - self._pending_since) * 1000
+            if waited > self.timeout and not self._stalled:
+                self._stalled = True
+                self.stalls += 1
+                print(f"Error polling {self.name}: no reading after {waited:.0f} ms")
+            return
+        self._pending_since = time.monotonic()
+        self.executor.submit(self._read)
+
+    def _read(self):
+        # Runs on a worker thread; only the result crosses to the main loop
+        try:
+            value = freeze(self.poll_from())
+        except Exception as e:
+            print(f"Error polling {self.name}: {e}")
+            GLib.idle_add(self._deliver, None, False)
+            return
+        GLib.idle_add(self._deliver, value, True)
+
+    def _deliver(self, value, ok):
+        self._pending_since = None
+        self._stalled = False
+        if ok and self._source_id is not None:
+            record(f"sampler:{self.name}", value)
+            self.push(value)
+        return False
+
+    def push(self, value):
+        """Publish a reading to every subscriber."""
+        self.value = value
+        self.emit("changed", value)
+
+
+def connect_while_alive(widget, source, signal, callback):
+    """Connect `callback` to a shared object's signal for the widget's lifetime.
+
+    Shared services outlive any one bar, so handlers must be removed when the
+    widget goes away or they keep the destroyed widget tree alive.
+    """
+    handler_id = source.connect(signal, callback)
+    widget.connect("destroy", lambda *_: source.disconnect(handler_id))
+    return handler_id
+
+
+class Throttle:
+    """Rate-limits a callback while always delivering the latest arguments.
+
+    The first call runs immediately; further calls within `interval_ms` are
+    coalesced into a single trailing call with the most recent arguments.
+    """
+
+    def __init__(self, callback, interval_ms):
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.calls = 0  # number of times the callback actually ran
+        self._args = None
+        self._dirty = False
+        self._source_id = None
+
+    def __call__(self, *args):
+        self._args = args
+        if self._source_id is None:
+            self._fire()
+            self._source_id = GLib.timeout_add(self.interval_ms, self._on_timeout)
+        else:
+            self._dirty = True
+
+    def _fire(self):
+        self.calls += 1
+        self.callback(*self._args)
+
+    def _on_timeout(self):
+        if self._dirty:
+            self._dirty = False
+            self._fire()
+            return True  # keep the window open for further bursts
+        self._source_id = None
+        return False
+
+    def cancel(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+        self._dirty = False
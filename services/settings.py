@@ -0,0 +1,39 @@
+import json
+import os
+
+# XDG config directory
+CONFIG_HOME = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
+CONFIG_DIR = os.path.join(CONFIG_HOME, "mangobar")
+CONFIG_PATH = os.path.join(CONFIG_DIR, "config.json")
+
+DEFAULT_CONFIG = {"theme": "tokyo-night-storm"}
+
+
+def load_config(path=CONFIG_PATH):
+    """Load config.json, falling back to the defaults for anything missing."""
+    config = dict(DEFAULT_CONFIG)
+    if not os.path.exists(path):
+        return config
+
+    try:
+        with open(path, "r") as f:
+            config.update(json.load(f))
+    except Exception as e:
+        print(f"Error loading config: {e}")
+    return config
+
+
+def update_config(values, path=CONFIG_PATH):
+    """Write `values` into config.json, keeping every other key in the file."""
+    config = {}
+    if os.path.exists(path):
+        try:
+            with open(path, "r") as f:
+                config = json.load(f)
+        except Exception as e:
+            print(f"Error loading config: {e}")
+    config.update(values)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2)
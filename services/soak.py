@@ -0,0 +1,309 @@
+import gc
+import math
+import os
+import statistics
+import sys
+import time
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+from services.memory import gobject_counts, open_fds, read_rss_kb, temp_usage
+from services.system import get_cpu_cores, get_io_rates
+from services.trace import EventSource
+
+# Default acceleration: one real second stands for ten simulated minutes
+SOAK_SPEED = 600
+# Events due within one tick are delivered once, as a frame only shows the last
+TICK_MS = 16
+
+# event -> simulated seconds between occurrences
+SOAK_EVENTS = {
+    "sampler": 1,
+    "media": 1,
+    "client": 2,
+    "tags": 5,
+    "power": 60,
+    "pressure": 300,
+    "track": 180,
+    "theme": 600,
+    "hotplug": 1800,
+}
+
+SOAK_OUTPUTS = ("SOAK-1",)
+SOAK_SAMPLERS = ("cpu", "ram", "cpu-temp", "cpu-cores", "uptime", "io", "gpu")
+SOAK_LAYOUTS = ("t", "s", "m", "g", "d", "ct", "vt", "rt", "vs", "vg")
+SOAK_APPS = (
+    "firefox",
+    "org.gnome.Nautilus",
+    "kitty",
+    "code",
+    "spotify",
+    "org.telegram.desktop",
+    "steam",
+    "thunderbird",
+)
+# Stand-in album art: the layout icons are valid images on every install
+ART_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "layouts"
+)
+# Every this many tracks the player goes away for one track
+PLAYER_GAP_EVERY = 10
+
+# metric -> growth allowed between the start and end of the measured window
+GROWTH_LIMITS = {
+    "rss_kb": 8192,
+    "gobjects": 50,
+    "fds": 2,
+    "temp_entries": 0,
+    "temp_kb": 64,
+}
+# Share of the samples treated as warm-up and left out of the verdict
+WARMUP = 0.25
+# Samples per end of the measured window; medians absorb GC and heap noise
+WINDOW = 3
+
+
+class SoakDriver(EventSource):
+    """Drives the bar from fake backends at an accelerated event rate.
+
+    Tag switches, focus changes, track changes, player gaps, power and
+    pressure changes and sampler readings are generated on the channels the services attach
+    to in replay mode, `speed` simulated seconds per real second. Theme
+    cycles and monitor hotplug are published on the "soak:theme" and
+    "soak:hotplug" channels for the application to act on.
+    """
+
+    def __init__(self, speed=SOAK_SPEED, outputs=SOAK_OUTPUTS):
+        self.speed = speed
+        self.outputs = outputs
+        channels = [f"mango:{output}" for output in outputs]
+        channels += [f"sampler:{name}" for name in SOAK_SAMPLERS]
+        channels += ["media", "power", "pressure"]
+        channels += ["soak:theme", "soak:hotplug"]
+        super().__init__(channels)
+        self.art = sorted(
+            os.path.join(ART_DIR, f) for f in os.listdir(ART_DIR) if f.endswith(".svg")
+        )
+        # event -> simulated occurrences so far (including coalesced ones)
+        self.simulated = dict.fromkeys(SOAK_EVENTS, 0)
+        self._track = 0
+        self._start = None
+        self._source_id = None
+
+    def simulated_seconds(self):
+        if self._start is None:
+            return 0.0
+        return (time.monotonic() - self._start) * self.speed
+
+    def start(self):
+        self._start = time.monotonic()
+        self._source_id = GLib.timeout_add(TICK_MS, self._tick)
+
+    def stop(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def _tick(self):
+        now = self.simulated_seconds()
+        for event, period in SOAK_EVENTS.items():
+            due = int(now // period)
+            if due > self.simulated[event]:
+                self.simulated[event] = due
+                getattr(self, f"_emit_{event}")(due)
+        return True
+
+    def _emit_sampler(self, n):
+        phase = n / 60
+        self.deliver("sampler:cpu", 50 + 45 * math.sin(phase))
+        self.deliver("sampler:ram", 40 + 20 * math.sin(phase / 7))
+        self.deliver("sampler:cpu-temp", int(55 + 20 * math.sin(phase / 3)))
+        self.deliver("sampler:uptime", float(n))
+        self.deliver(
+            "sampler:gpu",
+            {
+                "usage": int(50 + 50 * math.sin(phase / 2)),
+                "vram": int(30 + 10 * math.sin(phase / 5)),
+                "temp": int(50 + 15 * math.sin(phase / 4)),
+            },
+        )
+        # The procfs readers need no hardware; read them at the faster pace
+        self.deliver("sampler:cpu-cores", get_cpu_cores())
+        self.deliver("sampler:io", get_io_rates())
+
+    def _mango_state(self, n):
+        tag = n % 9 + 1
+        app = SOAK_APPS[n % len(SOAK_APPS)]
+        return {
+            "tags": 9,
+            "active": [tag],
+            "occupied": sorted({tag, (n * 7) % 9 + 1, (n * 5) % 9 + 1}),
+            "layout": SOAK_LAYOUTS[(n // 3) % len(SOAK_LAYOUTS)],
+            # A fresh title every time, as with a terminal or browser tab
+            "client": {"title": f"{app} - window {n}", "appid": app},
+        }
+
+    def _emit_tags(self, n):
+        for output in self.outputs:
+            self.deliver(f"mango:{output}", self._mango_state(n))
+
+    def _emit_client(self, n):
+        # Focus moves between windows on the current tag
+        tags = self.simulated["tags"]
+        for output in self.outputs:
+            state = self._mango_state(tags)
+            app = SOAK_APPS[n % len(SOAK_APPS)]
+            state["client"] = {"title": f"{app} - window {n}", "appid": app}
+            self.deliver(f"mango:{output}", state)
+
+    def _media_state(self, progress):
+        track = self._track
+        playing = track % PLAYER_GAP_EVERY != PLAYER_GAP_EVERY - 1
+        art = self.art[track % len(self.art)] if self.art else None
+        return {
+            "player": playing,
+            "status": "Playing" if track % 3 else "Paused",
+            "progress": progress,
+            "art": f"file://{art}" if playing and art else None,
+        }
+
+    def _emit_track(self, n):
+        self._track = n
+        self.deliver("media", self._media_state(0.0))
+
+    def _emit_media(self, n):
+        period = SOAK_EVENTS["track"]
+        self.deliver("media", self._media_state((n % period) / period))
+
+    def _emit_power(self, n):
+        # Discharge from 100% to 5% over 95 changes, then charge back up
+        step = n % 190
+        charging = step >= 95
+        capacity = 5 + (step - 95) if charging else 100 - step
+        self.deliver(
+            "power",
+            {
+                "present": True,
+                "ac": charging,
+                "status": "Charging" if charging else "Discharging",
+                "capacity": capacity,
+                "seconds": 60 * (95 - (step % 95)),
+            },
+        )
+
+    def _emit_pressure(self, n):
+        # Every other occurrence one resource starts stalling, then recovers
+        stalled = ("cpu", "memory", "io")[(n // 2) % 3] if n % 2 else None
+        self.deliver(
+            "pressure",
+            {
+                name: {
+                    "stalled": name == stalled,
+                    "avg10": 40.0 if name == stalled else 0.5,
+                    "avg60": 10.0 if name == stalled else 0.4,
+                    "avg300": 2.0 if name == stalled else 0.3,
+                }
+                for name in ("cpu", "memory", "io")
+            },
+        )
+
+    def _emit_theme(self, n):
+        self.deliver("soak:theme", n)
+
+    def _emit_hotplug(self, n):
+        self.deliver("soak:hotplug", n)
+
+
+def sample_metrics():
+    """Read the soak metrics after a full collection, so garbage is not counted."""
+    gc.collect()
+    entries, size = temp_usage()
+    return {
+        "rss_kb": read_rss_kb(),
+        "gobjects": sum(count for _, count in gobject_counts(None)),
+        "fds": sum(open_fds().values()),
+        "temp_entries": entries,
+        "temp_kb": size // 1024,
+    }
+
+
+class SoakMonitor:
+    """Samples RSS, live GObjects, open fds and temp files during a soak.
+
+    A metric fails when the median of its last samples exceeds the median
+    of its first samples after warm-up by more than its GROWTH_LIMITS entry.
+    Bounded caches fill up during warm-up; only growth that continues for
+    the whole run is reported.
+    """
+
+    def __init__(self, driver, interval=10):
+        self.driver = driver
+        self.interval = interval
+        self.samples = []
+        # Set by report(): None until the soak has finished
+        self.passed = None
+        self._start = time.monotonic()
+        self._source_id = None
+
+    def start(self):
+        self.sample()
+        self._source_id = GLib.timeout_add_seconds(self.interval, self.sample)
+
+    def stop(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def sample(self):
+        metrics = sample_metrics()
+        elapsed = time.monotonic() - self._start
+        self.samples.append((elapsed, metrics))
+        days = self.driver.simulated_seconds() / 86400
+        print(
+            f"soak {elapsed:7.0f}s ({days:5.2f} simulated days): "
+            + ", ".join(f"{name} {value}" for name, value in metrics.items()),
+            file=sys.stderr,
+        )
+        return True
+
+    def verdict(self):
+        """Return [(metric, start, end, growth, ok)] over the measured window."""
+        measured = [m for _, m in self.samples[int(len(self.samples) * WARMUP) :]]
+        if len(measured) < 2 * WINDOW:
+            return []
+        results = []
+        for name, limit in GROWTH_LIMITS.items():
+            start = statistics.median(m[name] for m in measured[:WINDOW])
+            end = statistics.median(m[name] for m in measured[-WINDOW:])
+            growth = end - start
+            results.append((name, start, end, growth, growth <= limit))
+        return results
+
+    def report(self):
+        """Print the verdict and return True if nothing grew past its limit."""
+        lines = ["MangoBar soak report"]
+        days = self.driver.simulated_seconds() / 86400
+        lines.append(
+            f"  {len(self.samples)} samples, {days:.2f} simulated days, "
+            f"{self.driver.delivered} events delivered"
+        )
+        for event, count in self.driver.simulated.items():
+            lines.append(f"    {event:36s} {count:10d}")
+
+        results = self.verdict()
+        if not results:
+            lines.append(
+                f"  too few samples for a verdict (need {2 * WINDOW} after warm-up)"
+            )
+        for name, start, end, growth, ok in results:
+            lines.append(
+                f"  {name:14s} {start:10.0f} -> {end:10.0f} ({growth:+.0f}, "
+                f"limit +{GROWTH_LIMITS[name]}) {'ok' if ok else 'GROWING'}"
+            )
+        self.passed = bool(results) and all(ok for *_, ok in results)
+        lines.append(f"  result: {'pass' if self.passed else 'FAIL'}")
+        print("\n".join(lines), file=sys.stderr)
+        return self.passed
@@ -0,0 +1,173 @@
+import psutil
+
+from services.capabilities import probe
+from services.history import MetricHistory
+from services.procfs import CpuCoreReader, IoReader, ProcReader
+from services.sampler import Sampler, freeze, get_sampling_pool
+from services.trace import get_replayer
+
+if probe("nvml").available:
+    from pynvml import (
+        nvmlDeviceGetHandleByIndex,
+        nvmlDeviceGetUtilizationRates,
+        nvmlDeviceGetTemperature,
+        nvmlInit,
+        nvmlShutdown,
+    )
+
+
+_proc = None
+
+
+def get_proc():
+    """Return the shared persistent-handle procfs reader."""
+    global _proc
+    if _proc is None:
+        _proc = ProcReader()
+    return _proc
+
+
+def get_cpu_percent():
+    return get_proc().cpu_percent()
+
+
+def get_ram_percent():
+    return get_proc().ram_percent()
+
+
+def get_cpu_temp():
+    sensors = psutil.sensors_temperatures()
+    temp = sensors["k10temp"][0][1]
+
+    return int(temp)
+
+
+_core_reader = None
+
+
+def get_cpu_cores():
+    """Per-core (utilization, frequency) vectors, each scaled to 0..1."""
+    global _core_reader
+    if _core_reader is None:
+        _core_reader = CpuCoreReader()
+    return _core_reader.read()
+
+
+_io_reader = None
+
+
+def get_io_rates():
+    """Network and disk byte/IOPS rates since the previous reading."""
+    global _io_reader
+    if _io_reader is None:
+        _io_reader = IoReader()
+    return _io_reader.read()
+
+
+def get_uptime():
+    """Get system uptime in seconds"""
+    return get_proc().uptime()
+
+
+def get_gpu_stats():
+    """Read GPU usage, VRAM usage and temperature in one NVML session."""
+    nvmlInit()
+    try:
+        handle = nvmlDeviceGetHandleByIndex(0)
+        usage = nvmlDeviceGetUtilizationRates(handle)
+        temp = nvmlDeviceGetTemperature(handle, 0)
+    finally:
+        nvmlShutdown()
+
+    return {"usage": usage.gpu, "vram": usage.memory, "temp": temp}
+
+
+# name -> (poll function, interval in ms, timeout in ms). Every source is
+# read on the sampling pool; a read slower than its timeout is reported as
+# stalled and the source skips ticks until it returns.
+SOURCES = {
+    "cpu": (get_cpu_percent, 1000, 500),
+    "ram": (get_ram_percent, 1000, 500),
+    "cpu-cores": (get_cpu_cores, 1000, 500),
+    "uptime": (get_uptime, 1000, 500),
+    "io": (get_io_rates, 1000, 500),
+}
+
+# Sources for hardware that may be missing are only registered once a
+# startup probe has found it, so nothing samples what cannot be read
+if probe("cpu-temp").available:
+    SOURCES["cpu-temp"] = (get_cpu_temp, 1000, 1000)
+
+if probe("nvml").available:
+    # NVML init can take a while when the GPU is waking up
+    SOURCES["gpu"] = (get_gpu_stats, 1000, 3000)
+
+# history name -> (source name, key into the reading or None)
+HISTORIES = {
+    "cpu": ("cpu", None),
+    "ram": ("ram", None),
+    "gpu": ("gpu", "usage"),
+    "vram": ("gpu", "vram"),
+}
+
+_samplers = {}
+_histories = {}
+
+
+def has_source(name):
+    """True if a source can be sampled here, or is replayed from a trace."""
+    if name in SOURCES:
+        return True
+    replayer = get_replayer()
+    return replayer is not None and replayer.has_channel(f"sampler:{name}")
+
+
+def get_sampler(name):
+    """Return the process-wide sampler for a source, creating it on first use."""
+    sampler = _samplers.get(name)
+    if sampler is None:
+        replayer = get_replayer()
+        if replayer is not None:
+            # Readings come from the trace, even for sources absent here.
+            # JSON turns tuples and arrays into lists; freezing gives
+            # subscribers the read-only tuples a live reading would be
+            sampler = Sampler(None, name=name)
+            replayer.attach(
+                f"sampler:{name}", lambda value, sampler=sampler: sampler.push(freeze(value))
+            )
+        else:
+            poll_from, interval, timeout = SOURCES[name]
+            sampler = Sampler(
+                poll_from,
+                interval=interval,
+                name=name,
+                executor=get_sampling_pool(),
+                timeout=timeout,
+            )
+        _samplers[name] = sampler
+    return sampler
+
+
+def get_history(name):
+    """Return the process-wide history for a metric, recording from first use.
+
+    Once requested, a history keeps its sampler running for the rest of the
+    process so the record has no gaps.
+    """
+    history = _histories.get(name)
+    if history is None:
+        source, key = HISTORIES[name]
+        history = MetricHistory()
+        _histories[name] = history
+        get_sampler(source).subscribe(
+            lambda value: history.append(value if key is None else value[key])
+        )
+    return history
+
+
+def subscribe_history(name, callback, widget=None):
+    """Call `callback(history)` after each new sample is recorded."""
+    history = get_history(name)
+    source, _ = HISTORIES[name]
+    get_sampler(source).subscribe(lambda _: callback(history), widget)
+    return history
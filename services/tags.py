@@ -0,0 +1,29 @@
+# What the Tags and Layout modules display for a Mango state, kept free of
+# GTK and gi so the update logic can be checked headlessly.
+
+
+def tag_states(tags, active_tags, occupied_tags):
+    """Return (active, occupied) per tag, in button order."""
+    return [(tag in active_tags, tag in occupied_tags) for tag in tags]
+
+
+def changed_tags(previous, current):
+    """Return the indices whose (active, occupied) state differs."""
+    return [
+        index
+        for index, (before, after) in enumerate(zip(previous, current))
+        if before != after
+    ]
+
+
+def layout_name(layout):
+    """Layout abbreviation from mmsg output, which may be "<output> <layout>"."""
+    if not layout:
+        return None
+    return layout.split()[-1] if " " in layout else layout
+
+
+def layout_label(layout):
+    """Two-letter label shown when layout icons are off."""
+    name = layout_name(layout) or "Unknown"
+    return name[:2].upper() if name != "Unknown" else "UN"
@@ -1,14 +1,24 @@
 import os
-import json
 import gi
 
 gi.require_version("GLib", "2.0")
 gi.require_version("Gio", "2.0")
-from gi.repository import GLib, GObject, Gio
+gi.require_version("Gdk", "3.0")
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gdk, GLib, GObject, Gio, Gtk
+
+from services.assets import get_asset_store
+from services.settings import CONFIG_DIR, CONFIG_PATH, load_config, update_config
 
 
 class ThemeManager(GObject.Object):
-    """Manages theme switching for MangoBar with persistence and keybind support."""
+    """Manages theme switching for MangoBar with persistence and keybind support.
+
+    Styles come in two layers: style.css holds every rule and is applied
+    once, while each theme is a palette of @define-color names it refers
+    to. Switching themes reloads only the small palette provider; the
+    structural rules are never parsed again.
+    """
 
     __gsignals__ = {
         "theme-changed": (GObject.SignalFlags.RUN_FIRST, None, (str,)),
@@ -23,11 +33,12 @@ class ThemeManager(GObject.Object):
         # Get base directory (parent of services/)
         self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.themes_dir = os.path.join(self.base_dir, "themes")
+        self.assets = get_asset_store()
+        self.base_provider = None
+        self.palette_provider = None
 
-        # XDG config directory
-        config_home = os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
-        self.config_dir = os.path.join(config_home, "mangobar")
-        self.config_path = os.path.join(self.config_dir, "config.json")
+        self.config_dir = CONFIG_DIR
+        self.config_path = CONFIG_PATH
 
         # Ensure directories exist
         self._ensure_directories()
@@ -68,8 +79,25 @@ class ThemeManager(GObject.Object):
 
         return themes
 
+    def _add_provider(self, priority):
+        provider = Gtk.CssProvider()
+        Gtk.StyleContext.add_provider_for_screen(
+            Gdk.Screen.get_default(), provider, priority
+        )
+        return provider
+
+    def load_base(self):
+        """Apply the structural stylesheet; done once, before any palette."""
+        if self.base_provider is not None:
+            return
+        self.base_provider = self._add_provider(Gtk.STYLE_PROVIDER_PRIORITY_USER)
+        try:
+            self.base_provider.load_from_data(self.assets.base_css().encode())
+        except Exception as e:
+            print(f"Error loading style.css: {e}")
+
     def load_theme(self, theme_name):
-        """Load and apply a theme by name."""
+        """Load and apply a theme's palette by name."""
         if theme_name not in self.available_themes:
             print(
                 f"Warning: Theme '{theme_name}' not found. Using first available theme."
@@ -79,14 +107,16 @@ class ThemeManager(GObject.Object):
                 return False
             theme_name = self.available_themes[0]
 
-        theme_path = os.path.join(self.themes_dir, f"{theme_name}.css")
-
         try:
-            with open(theme_path, "r") as f:
-                css_content = f.read()
+            css_content = self.assets.theme_css(theme_name)
 
-            # Apply theme using Fabric's set_stylesheet_from_string
-            self.app.set_stylesheet_from_string(css_content)
+            # Only the palette is swapped; style.css stays parsed
+            self.load_base()
+            if self.palette_provider is None:
+                self.palette_provider = self._add_provider(
+                    Gtk.STYLE_PROVIDER_PRIORITY_USER + 1
+                )
+            self.palette_provider.load_from_data(css_content.encode())
 
             # Update current theme
             old_theme = self.current_theme
@@ -131,25 +161,12 @@ class ThemeManager(GObject.Object):
 
     def _load_config(self):
         """Load configuration from config.json."""
-        if not os.path.exists(self.config_path):
-            # Return default config
-            return {"theme": "tokyo-night-storm"}
-
-        try:
-            with open(self.config_path, "r") as f:
-                config = json.load(f)
-                return config
-        except Exception as e:
-            print(f"Error loading config: {e}")
-            return {"theme": "tokyo-night-storm"}
+        return load_config(self.config_path)
 
     def _save_config(self):
-        """Save current theme to config.json."""
-        config = {"theme": self.current_theme}
-
+        """Save current theme to config.json, keeping the other settings."""
         try:
-            with open(self.config_path, "w") as f:
-                json.dump(config, f, indent=2)
+            update_config({"theme": self.current_theme}, self.config_path)
             print(f"Saved theme preference: {self.current_theme}")
         except Exception as e:
             print(f"Error saving config: {e}")
@@ -0,0 +1,253 @@
+import abc
+import atexit
+import json
+import struct
+import time
+
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+# File layout: MAGIC, then records of RECORD header + payload. The header is
+# (microseconds since recording started, channel id, payload kind, length).
+MAGIC = b"MBTRACE1"
+RECORD = struct.Struct("<QHBI")
+FLOAT = struct.Struct("<d")
+
+KIND_JSON = 0
+KIND_FLOAT = 1
+# Assigns the record's channel id to the UTF-8 channel name in the payload
+KIND_CHANNEL = 2
+
+# Records buffered before hitting the disk; a killed bar loses at most these
+FLUSH_EVERY = 64
+
+
+def _json_default(value):
+    # NumPy vectors (per-core readings) are stored as plain lists
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not traceable")
+
+
+def encode_value(value):
+    if type(value) is float:
+        return KIND_FLOAT, FLOAT.pack(value)
+    payload = json.dumps(value, separators=(",", ":"), default=_json_default)
+    return KIND_JSON, payload.encode()
+
+
+def decode_value(kind, payload):
+    if kind == KIND_FLOAT:
+        return FLOAT.unpack(payload)[0]
+    return json.loads(payload)
+
+
+class TraceRecorder:
+    """Appends every value a data source produces to a compact binary trace.
+
+    A value identical to the previous one on the same channel is not
+    written again, so idle sources cost nothing after their first reading.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._start = time.monotonic_ns()
+        self._channels = {}
+        self._last = {}
+
+    def record(self, channel, value):
+        kind, payload = encode_value(value)
+        if self._last.get(channel) == payload:
+            return
+        self._last[channel] = payload
+
+        channel_id = self._channels.get(channel)
+        if channel_id is None:
+            channel_id = len(self._channels)
+            self._channels[channel] = channel_id
+            name = channel.encode()
+            self._file.write(RECORD.pack(0, channel_id, KIND_CHANNEL, len(name)))
+            self._file.write(name)
+
+        elapsed_us = (time.monotonic_ns() - self._start) // 1000
+        self._file.write(RECORD.pack(elapsed_us, channel_id, kind, len(payload)))
+        self._file.write(payload)
+        self.records += 1
+        if self.records % FLUSH_EVERY == 0:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def read_trace(path):
+    """Yield (microseconds, channel, value) for every record in a trace."""
+    channels = {}
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a mangobar trace")
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return  # a truncated tail is expected if the bar was killed
+            elapsed_us, channel_id, kind, length = RECORD.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            if kind == KIND_CHANNEL:
+                channels[channel_id] = payload.decode()
+                continue
+            yield elapsed_us, channels[channel_id], decode_value(kind, payload)
+
+
+class EventSource(abc.ABC):
+    """Stands in for the live data sources while the bar is replayed.
+
+    Services attach a callback per channel instead of starting their live
+    pollers, and the source delivers values to them on the GLib loop.
+    """
+
+    def __init__(self, channels=()):
+        self.channels = set(channels)
+        self.delivered = 0
+        self._targets = {}
+
+    def has_channel(self, channel):
+        return channel in self.channels
+
+    def resolve(self, channel):
+        """Map a channel to one this source delivers.
+
+        A trace recorded on another machine has other output names, so a
+        Mango service with no exact match follows the first recorded output.
+        """
+        if channel in self.channels:
+            return channel
+        prefix = channel.split(":", 1)[0] + ":"
+        matches = sorted(c for c in self.channels if c.startswith(prefix))
+        return matches[0] if matches else channel
+
+    def attach(self, channel, callback):
+        self._targets.setdefault(self.resolve(channel), []).append(callback)
+
+    def detach(self, channel, callback):
+        """Remove a callback added with attach(), e.g. for a destroyed bar."""
+        targets = self._targets.get(self.resolve(channel), [])
+        if callback in targets:
+            targets.remove(callback)
+
+    @abc.abstractmethod
+    def start(self):
+        """Begin delivering values on the GLib loop."""
+
+    @abc.abstractmethod
+    def stop(self):
+        """Stop delivering; attached callbacks are kept."""
+
+    def deliver(self, channel, value):
+        for callback in self._targets.get(channel, ()):
+            try:
+                callback(value)
+            except Exception as e:
+                print(f"Error replaying {channel}: {e}")
+        self.delivered += 1
+
+
+class TraceReplayer(EventSource):
+    """Feeds a recorded trace into the running services.
+
+    Events are delivered at their recorded offsets, divided by `speed`.
+    """
+
+    def __init__(self, path, speed=1.0, repeat=False):
+        self.path = path
+        self.speed = speed
+        self.repeat = repeat
+        self.events = list(read_trace(path))
+        super().__init__(channel for _, channel, _ in self.events)
+        self._index = 0
+        self._start = None
+        self._source_id = None
+
+    def start(self):
+        self._index = 0
+        self._start = time.monotonic()
+        self._schedule()
+
+    def stop(self):
+        if self._source_id is not None:
+            GLib.source_remove(self._source_id)
+            self._source_id = None
+
+    def _schedule(self):
+        if self._index >= len(self.events):
+            self._source_id = None
+            if self.repeat and self.events:
+                self.start()
+            return
+
+        due = self.events[self._index][0] / 1e6 / self.speed
+        delay_ms = max(0, int((due - (time.monotonic() - self._start)) * 1000))
+        self._source_id = GLib.timeout_add(delay_ms, self._on_timeout)
+
+    def _on_timeout(self):
+        now = time.monotonic() - self._start
+        # Deliver everything that is due, so a slow frame never drifts the clock
+        while self._index < len(self.events):
+            elapsed_us, channel, value = self.events[self._index]
+            if elapsed_us / 1e6 / self.speed > now:
+                break
+            self._index += 1
+            self.deliver(channel, value)
+        self._schedule()
+        return False
+
+
+_recorder = None
+_replayer = None
+
+
+def start_recording(path):
+    global _recorder
+    _recorder = TraceRecorder(path)
+    atexit.register(stop_recording)
+    return _recorder
+
+
+def stop_recording():
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def record(channel, value):
+    """Log a data source reading if a recording is running."""
+    if _recorder is not None:
+        try:
+            _recorder.record(channel, value)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error recording {channel}: {e}")
+
+
+def start_replay(path, speed=1.0, repeat=False):
+    """Switch services to replay mode; must run before any service is built."""
+    return install_replayer(TraceReplayer(path, speed=speed, repeat=repeat))
+
+
+def install_replayer(replayer):
+    """Drive services from any EventSource; must run before any service is built."""
+    global _replayer
+    _replayer = replayer
+    return _replayer
+
+
+def get_replayer():
+    """Return the active replayer, or None when running on live sources."""
+    return _replayer
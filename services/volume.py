@@ -0,0 +1,114 @@
+import gi
+
+gi.require_version("GLib", "2.0")
+from gi.repository import GLib
+
+# Volume change per wheel notch (smooth-scroll deltas are scaled to match)
+SCROLL_STEP = 8
+# How long an optimistic value is shown if the server never confirms it
+CONFIRM_TIMEOUT_MS = 500
+
+
+class VolumeControl:
+    """Scroll-to-volume logic behind VolumeWidget, kept free of GTK.
+
+    Wheel deltas are summed and written to the speaker at most once per
+    frame: `schedule(callback)` must run `callback` on the next frame (the
+    widget passes its add_tick_callback). The written value is shown
+    straight away through `show(volume)` and kept until the server reports
+    it back. Exactly one notify::volume handler is held, on the current
+    default speaker.
+    """
+
+    def __init__(self, audio, schedule, show):
+        self.audio = audio
+        self.schedule = schedule
+        self.show = show
+
+        # Wheel deltas collected since the last frame
+        self._pending_delta = 0.0
+        self._apply_tick = None
+        # Volume shown before the server has confirmed it
+        self._optimistic_volume = None
+        self._confirm_timeout = None
+        # (speaker, handler id) of the current volume subscription
+        self._speaker_handler = None
+
+    def scroll(self, delta):
+        """Add a scroll of `delta` wheel notches (up is positive)."""
+        self._pending_delta += delta * SCROLL_STEP
+        # Apply everything accumulated at most once per frame
+        if self._apply_tick is None and self._pending_delta:
+            self._apply_tick = self.schedule(self.apply_scroll)
+
+    def apply_scroll(self, *_):
+        self._apply_tick = None
+        delta, self._pending_delta = self._pending_delta, 0.0
+        speaker = self.audio.speaker
+        if not speaker or not delta:
+            return False
+
+        # Build on the value the user sees, not on a stale server value
+        current = (
+            self._optimistic_volume
+            if self._optimistic_volume is not None
+            else speaker.volume
+        )
+        target = min(max(current + delta, 0), 100)
+        if target == current:
+            return False
+
+        self._optimistic_volume = target
+        self.show(target)
+        if self._confirm_timeout is not None:
+            GLib.source_remove(self._confirm_timeout)
+        self._confirm_timeout = GLib.timeout_add(
+            CONFIRM_TIMEOUT_MS, self.on_confirm_timeout
+        )
+        speaker.volume = target
+        return False
+
+    def on_confirm_timeout(self):
+        # Server never reported our value; fall back to what it says
+        self._confirm_timeout = None
+        self._optimistic_volume = None
+        if self.audio.speaker:
+            self.show(self.audio.speaker.volume)
+        return False
+
+    def on_volume_changed(self, speaker, *_):
+        volume = speaker.volume
+        if self._optimistic_volume is not None:
+            if abs(volume - self._optimistic_volume) >= 0.5:
+                return  # an older value still in flight; keep showing ours
+            self._optimistic_volume = None
+            if self._confirm_timeout is not None:
+                GLib.source_remove(self._confirm_timeout)
+                self._confirm_timeout = None
+        self.show(volume)
+
+    def destroy(self):
+        self.disconnect_speaker()
+        if self._confirm_timeout is not None:
+            GLib.source_remove(self._confirm_timeout)
+            self._confirm_timeout = None
+
+    def disconnect_speaker(self):
+        if self._speaker_handler is not None:
+            speaker, handler_id = self._speaker_handler
+            speaker.disconnect(handler_id)
+            self._speaker_handler = None
+
+    def on_speaker_changed(self, *_):
+        # Drop the handler on the previous default speaker before adding one
+        self.disconnect_speaker()
+        self._optimistic_volume = None
+        if not self.audio.speaker:
+            return
+
+        speaker = self.audio.speaker
+        self.show(speaker.volume)
+        self._speaker_handler = (
+            speaker,
+            speaker.connect("notify::volume", self.on_volume_changed),
+        )
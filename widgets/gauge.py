@@ -0,0 +1,187 @@
+import math
+
+import cairo
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("PangoCairo", "1.0")
+from gi.repository import Gtk, PangoCairo
+from fabric.widgets.widget import Widget
+
+from services.animator import Animator
+from services.arc import START_ANGLE, redraw_area, value_angle
+from services.motion import (
+    LINEAR_CURVE,
+    LINEAR_DURATION,
+    MOTION_JUMP,
+    MOTION_LINEAR,
+    get_motion_settings,
+)
+
+
+class Gauge(Gtk.DrawingArea, Widget):
+    """Circular progress gauge drawn as a single widget.
+
+    Replaces an Overlay of a background CircularProgressBar, an animated
+    CircularProgressBar and a Label. Track, arc and text are drawn in one
+    draw handler; the static track is rendered once into a cached surface
+    (keyed by size, scale factor and track color, so theme changes rebuild
+    it) and animation frames only invalidate the part of the arc that moved.
+
+    Colors come from CSS: `border-color` for the arc, `background-color` for
+    the track and `color`/`font` for the text.
+
+    Animation follows the "animations" settings in config.json (frame-rate
+    cap, motion mode, per-gauge opt-out) and GTK's gtk-enable-animations;
+    `animate=False` always jumps straight to the new value.
+    """
+
+    # Eased animation used in the "full" motion mode
+    BEZIER_CURVE = (0.34, 1.56, 0.64, 1.0)
+    DURATION = 0.8
+
+    def __init__(
+        self, value=0.0, label="", size=34, line_width=4, animate=True, **kwargs
+    ):
+        Gtk.DrawingArea.__init__(self)  # type: ignore
+        Widget.__init__(self, size=size, **kwargs)
+        self.line_width = line_width
+        self.animate = animate
+        self.motion = get_motion_settings()
+        self._value = value
+        self._label = label
+
+        self._track_surface = None
+        self._track_key = None
+        self._layout = None
+
+        self.animator = (
+            Animator(
+                # edit BEZIER_CURVE and DURATION to customize the animation
+                bezier_curve=self.BEZIER_CURVE,
+                duration=self.DURATION,
+                min_value=value,
+                max_value=value,
+                tick_widget=self,
+                max_fps=self.motion.max_fps,
+                notify_value=lambda p, *_: self.set_value(p.value),
+            )
+            .build()
+            .unwrap()
+        )
+
+        self.connect("draw", self.on_draw)
+        self.connect("style-updated", self.on_style_updated)
+
+    @property
+    def value(self):
+        return self._value
+
+    def _geometry(self):
+        width = self.get_allocated_width()
+        height = self.get_allocated_height()
+        radius = (min(width, height) - self.line_width) / 2
+        return width / 2, height / 2, radius
+
+    def set_value(self, value):
+        old = self._value
+        self._value = value
+        if old == value or not self.get_realized():
+            return
+
+        cx, cy, radius = self._geometry()
+        self.queue_draw_area(*redraw_area(cx, cy, radius, self.line_width, old, value))
+
+    def set_label(self, label):
+        if label == self._label:
+            return
+        self._label = label
+        self._layout = None
+        self.queue_draw()
+
+    def on_style_updated(self, *_):
+        # Font may have changed with the theme
+        self._layout = None
+        self.queue_draw()
+
+    def animate_value(self, value: float):
+        self.animator.pause()
+        mode = self.motion.mode_for(self.get_name()) if self.animate else MOTION_JUMP
+        # Hidden gauges are never drawn, so there is nothing to animate
+        if mode == MOTION_JUMP or not self.get_realized():
+            self.set_value(value)
+            return
+        if mode == MOTION_LINEAR:
+            self.animator.bezier_curve = LINEAR_CURVE
+            self.animator.duration = LINEAR_DURATION
+        else:
+            self.animator.bezier_curve = self.BEZIER_CURVE
+            self.animator.duration = self.DURATION
+        self.animator.min_value = self._value
+        self.animator.max_value = value
+        self.animator.play()
+        return
+
+    def _get_track(self, target, width, height, color):
+        scale = self.get_scale_factor()
+        key = (width, height, scale, self.line_width, color.to_string())
+        if key == self._track_key:
+            return self._track_surface
+
+        surface = target.create_similar_image(
+            cairo.FORMAT_ARGB32, width * scale, height * scale
+        )
+        surface.set_device_scale(scale, scale)
+        cr = cairo.Context(surface)
+        cx, cy, radius = self._geometry()
+        cr.set_line_width(self.line_width)
+        cr.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+        cr.arc(cx, cy, radius, 0, 2 * math.pi)
+        cr.stroke()
+
+        self._track_surface = surface
+        self._track_key = key
+        return surface
+
+    def on_draw(self, widget, cr):
+        width = self.get_allocated_width()
+        height = self.get_allocated_height()
+        state = self.get_state_flags()
+        style = self.get_style_context()
+
+        cr.set_source_surface(
+            self._get_track(
+                cr.get_target(),
+                width,
+                height,
+                style.get_property("background-color", state),
+            ),
+            0,
+            0,
+        )
+        cr.paint()
+
+        if self._value > 0:
+            arc_color = style.get_property("border-color", state)
+            cx, cy, radius = self._geometry()
+            cr.set_line_width(self.line_width)
+            cr.set_line_cap(cairo.LINE_CAP_ROUND)
+            cr.set_source_rgba(
+                arc_color.red, arc_color.green, arc_color.blue, arc_color.alpha
+            )
+            cr.arc(cx, cy, radius, START_ANGLE, value_angle(self._value))
+            cr.stroke()
+
+        if self._label:
+            text_color = style.get_color(state)
+            if self._layout is None:
+                self._layout = self.create_pango_layout(self._label)
+            layout = self._layout
+            text_width, text_height = layout.get_pixel_size()
+            cr.move_to((width - text_width) / 2, (height - text_height) / 2)
+            cr.set_source_rgba(
+                text_color.red, text_color.green, text_color.blue, text_color.alpha
+            )
+            PangoCairo.show_layout(cr, layout)
+
+        return False
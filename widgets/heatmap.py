@@ -0,0 +1,65 @@
+import cairo
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+from fabric.widgets.widget import Widget
+
+from services.cells import pack_cells
+
+
+class Heatmap(Gtk.DrawingArea, Widget):
+    """Grid of cells shaded by value, drawn with a single scaled paint.
+
+    Cells are packed into a tiny image (one pixel per cell) that is painted
+    scaled up with nearest-neighbour filtering, so the drawing cost does not
+    depend on the number of cells. The cell color is the CSS `color`.
+    """
+
+    def __init__(self, columns=4, cell_size=8, **kwargs):
+        Gtk.DrawingArea.__init__(self)  # type: ignore
+        Widget.__init__(self, **kwargs)
+        self.columns = columns
+        self.cell_size = cell_size
+        self.values = []
+
+        self._pixels = None
+        self._rows = 0
+
+        self.connect("draw", self.on_draw)
+
+    def set_values(self, values):
+        rows = max(1, -(-len(values) // self.columns))
+        self.values = values
+        self._pixels = None
+        if rows != self._rows:
+            self._rows = rows
+            self.set_size_request(
+                self.columns * self.cell_size, rows * self.cell_size
+            )
+        self.queue_draw()
+
+    def on_draw(self, widget, cr):
+        if not len(self.values):
+            return False
+
+        if self._pixels is None:
+            color = self.get_style_context().get_color(self.get_state_flags())
+            self._pixels, self._rows = pack_cells(
+                self.values, (color.red, color.green, color.blue), self.columns
+            )
+
+        surface = cairo.ImageSurface.create_for_data(
+            self._pixels,
+            cairo.FORMAT_ARGB32,
+            self.columns,
+            self._rows,
+            self.columns * 4,
+        )
+        width = self.get_allocated_width()
+        height = self.get_allocated_height()
+        cr.scale(width / self.columns, height / self._rows)
+        cr.set_source_surface(surface, 0, 0)
+        cr.get_source().set_filter(cairo.FILTER_NEAREST)
+        cr.paint()
+        return False
@@ -0,0 +1,85 @@
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gdk, Gtk
+from fabric.widgets.label import Label
+
+from services.filters import rate_label
+from services.processes import get_process_monitor
+
+# Longest command line shown before it is cut off with an ellipsis
+CMDLINE_CHARS = 48
+
+
+def format_process_list(snapshot, sort):
+    """Render the top processes by "cpu" or "rss" as monospace text."""
+    if snapshot is None:
+        return "Scanning processes..."
+    if sort == "cpu":
+        title, rows = "CPU", snapshot.by_cpu
+        values = [f"{info.cpu:.1f}%" for info in rows]
+    else:
+        title, rows = "Memory", snapshot.by_rss
+        values = [rate_label(info.rss) for info in rows]
+
+    lines = [f"Top {title} ({snapshot.count} processes)"]
+    for info, value in zip(rows, values):
+        cmdline = info.cmdline
+        if len(cmdline) > CMDLINE_CHARS:
+            cmdline = cmdline[: CMDLINE_CHARS - 1] + "…"
+        lines.append(f"{info.pid:>7} {value:>6}  {cmdline}")
+    return "\n".join(lines)
+
+
+class ProcessPopover(Gtk.Popover):
+    """Top processes by CPU or memory, scanned only while the popover is open."""
+
+    def __init__(self, relative_to, sort="cpu", monitor=None):
+        super().__init__(relative_to=relative_to, name="process-popover")
+        self.sort = sort
+        self.monitor = monitor or get_process_monitor()
+        self._handler = None
+
+        self.label = Label(name="process-list", h_align="start")
+        self.label.set_label(format_process_list(self.monitor.snapshot, sort))
+        self.label.show()
+        self.add(self.label)
+
+        self.connect("show", self.on_show)
+        self.connect("closed", self.on_closed)
+        relative_to.connect("destroy", self.on_closed)
+
+    def toggle(self):
+        if self.get_visible():
+            self.popdown()
+        else:
+            self.popup()
+
+    def on_show(self, *_):
+        if self._handler is None:
+            self._handler = self.monitor.connect("updated", self.on_updated)
+            self.monitor.acquire()
+
+    def on_closed(self, *_):
+        if self._handler is not None:
+            self.monitor.disconnect(self._handler)
+            self._handler = None
+            self.monitor.release()
+
+    def on_updated(self, _monitor, snapshot):
+        self.label.set_label(format_process_list(snapshot, self.sort))
+
+
+def attach_process_popover(widget, sort):
+    """Open a ProcessPopover when `widget` is clicked."""
+    popover = ProcessPopover(widget, sort)
+    widget.add_events(Gdk.EventMask.BUTTON_PRESS_MASK)
+
+    def on_button_press(_widget, event):
+        if event.button != Gdk.BUTTON_PRIMARY:
+            return False
+        popover.toggle()
+        return True
+
+    widget.connect("button-press-event", on_button_press)
+    return popover
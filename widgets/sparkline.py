@@ -0,0 +1,95 @@
+import gi
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+from fabric.widgets.widget import Widget
+
+
+class Sparkline(Gtk.DrawingArea, Widget):
+    """Line chart of the most recent samples in a MetricHistory.
+
+    The cairo path is cached and only rebuilt when the history has new
+    samples or the widget is resized; plain redraws just replay it. The line
+    color is taken from the CSS `color` property.
+    """
+
+    def __init__(
+        self, history, max_value=100.0, samples=60, line_width=1.5, **kwargs
+    ):
+        Gtk.DrawingArea.__init__(self)  # type: ignore
+        Widget.__init__(self, **kwargs)
+        self.history = history
+        self.max_value = max_value
+        self.samples = samples
+        self.line_width = line_width
+
+        self._path = None
+        self._path_key = None
+
+        self.connect("draw", self.on_draw)
+
+    def _build_path(self, cr, width, height):
+        cr.new_path()
+        values = self.history.window(self.samples)
+        if len(values) < 2:
+            return
+
+        inset = self.line_width / 2
+        step = (width - self.line_width) / (self.samples - 1)
+        # Right-align so the newest sample is always at the right edge
+        x = width - inset - step * (len(values) - 1)
+        usable = height - self.line_width
+        for i, value in enumerate(values):
+            ratio = min(max(value / self.max_value, 0.0), 1.0)
+            y = height - inset - ratio * usable
+            if i == 0:
+                cr.move_to(x, y)
+            else:
+                cr.line_to(x, y)
+            x += step
+
+    def on_draw(self, widget, cr):
+        width = self.get_allocated_width()
+        height = self.get_allocated_height()
+
+        key = (self.history.version, width, height)
+        if key != self._path_key:
+            self._build_path(cr, width, height)
+            self._path = cr.copy_path()
+            self._path_key = key
+        else:
+            cr.new_path()
+            cr.append_path(self._path)
+
+        color = self.get_style_context().get_color(self.get_state_flags())
+        cr.set_source_rgba(color.red, color.green, color.blue, color.alpha)
+        cr.set_line_width(self.line_width)
+        cr.stroke()
+        return False
+
+
+def format_history_tooltip(title, history, seconds=60):
+    """Summarize the last `seconds` samples of a percent metric."""
+    stats = history.stats(seconds)
+    if stats is None:
+        return f"{title}: no data yet"
+    low, high, mean = stats
+    p95 = history.percentile(95, seconds)
+    return (
+        f"{title}, last {min(seconds, len(history))}s\n"
+        f"min {low:.0f}%  avg {mean:.0f}%  max {high:.0f}%  p95 {p95:.0f}%"
+    )
+
+
+def attach_history_tooltip(widget, title, history):
+    """Show history statistics when hovering `widget`.
+
+    Statistics are only computed when the tooltip is actually shown.
+    """
+
+    def on_query_tooltip(_widget, _x, _y, _keyboard, tooltip):
+        tooltip.set_text(format_history_tooltip(title, history))
+        return True
+
+    widget.set_has_tooltip(True)
+    widget.connect("query-tooltip", on_query_tooltip)